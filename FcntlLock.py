@@ -0,0 +1,187 @@
+"""
+FcntlLock.py
+
+Provides a blocking, file-based lock using flock(2) on one file per lock name.
+Waiters sleep in the kernel until the holder releases, instead of polling a
+database, and the kernel drops the lock automatically if the holding process dies,
+so a lock can never be lost to expiry while its holder is still working.
+"""
+
+# =============================================================================
+# STANDARD LIBRARY IMPORTS
+# =============================================================================
+import fcntl
+import hashlib
+import os
+import re
+import threading
+import time
+import uuid
+
+# =============================================================================
+# LOCAL IMPORTS
+# =============================================================================
+from models import g_logger, LockBase
+
+# =============================================================================
+# FLOCK-BASED LOCK IMPLEMENTATION
+# =============================================================================
+
+class FcntlLock(LockBase):
+    """
+    A host-wide lock using flock(2) on a file in a shared directory.
+
+    flock locks belong to the open file description, so two instances conflict
+    even inside one process, which makes the lock safe across both threads and
+    processes. `timeout_seconds` only bounds how long acquire() waits: the lock
+    is held until release() or process exit, and renew() just records a heartbeat
+    in the lock file for anyone inspecting it.
+    """
+    def __init__(self, lock_name, lock_dir, owner_prefix=None):
+        """
+        Initializes the lock instance.
+
+        Args:
+            lock_name (str): A unique name for the lock.
+            lock_dir (str): Directory holding the lock files, shared by all processes.
+            owner_prefix (str, optional): A prefix for the owner ID. If None, it is
+                                          auto-generated from the process and thread IDs.
+        """
+        os.makedirs(lock_dir, exist_ok=True)
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", lock_name)[:80]
+        digest = hashlib.sha1(lock_name.encode("utf-8")).hexdigest()[:12]
+        self.lock_path = os.path.join(lock_dir, f"{safe_name}-{digest}.lock")
+        if owner_prefix is None:
+            owner_prefix = f"pid{os.getpid()}_tid{threading.get_ident()}"
+        self.owner_id = f"{owner_prefix}_{uuid.uuid4()}"
+        self._fd = None
+
+    def acquire(self, timeout_seconds=60, wait=False):
+        """
+        Tries to acquire the lock, with an option to wait.
+
+        Args:
+            timeout_seconds (int): The maximum wait time if `wait` is True.
+            wait (bool): If True, the method blocks until the lock is acquired or the
+                         timeout is reached. If False, it returns immediately.
+
+        Returns:
+            bool: True if the lock was acquired, False otherwise.
+        """
+        if self._fd is not None:
+            return True  # Already hold the lock
+
+        try:
+            fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            g_logger.error(f"Could not open lock file '{self.lock_path}': {e}")
+            return False
+
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            if not wait:
+                os.close(fd)
+                return False
+            if not self._wait_for_lock(fd, timeout_seconds):
+                return False  # _wait_for_lock closed fd
+        except OSError as e:
+            g_logger.error(f"Unexpected I/O error acquiring lock '{self.lock_path}': {e}")
+            os.close(fd)
+            return False
+
+        self._fd = fd
+        self._write_owner()
+        return True
+
+    def _wait_for_lock(self, fd, timeout_seconds):
+        """
+        Blocks in flock() on a helper thread so the wait can time out.
+
+        The helper sleeps in the kernel until the lock is free. If we stop waiting
+        first, the helper takes ownership of fd and closes it as soon as its flock()
+        returns, which releases the lock again. On failure fd is always closed,
+        either here or by the helper.
+        """
+        done = threading.Event()
+        guard = threading.Lock()
+        state = {"acquired": False, "abandoned": False}
+
+        def waiter():
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                acquired = True
+            except OSError as e:
+                g_logger.error(f"Unexpected I/O error waiting for lock '{self.lock_path}': {e}")
+                acquired = False
+            with guard:
+                if state["abandoned"] or not acquired:
+                    os.close(fd)
+                    return
+                state["acquired"] = True
+                done.set()
+
+        threading.Thread(target=waiter, name=f"flock-{os.path.basename(self.lock_path)}", daemon=True).start()
+        done.wait(timeout_seconds)
+        with guard:
+            if not state["acquired"]:
+                state["abandoned"] = True
+            return state["acquired"]
+
+    def _write_owner(self):
+        """Records the owner and heartbeat time in the lock file for debugging."""
+        try:
+            os.ftruncate(self._fd, 0)
+            os.pwrite(self._fd, f"{self.owner_id} {time.time():.0f}\n".encode("utf-8"), 0)
+        except OSError as e:
+            g_logger.warning(f"Could not record owner in lock file '{self.lock_path}': {e}")
+
+    def release(self) -> bool:
+        """
+        Releases the lock if it is currently held by this instance.
+
+        Returns:
+            bool: True if the lock was released, False if it was not held.
+        """
+        if self._fd is None:
+            return False
+
+        fd, self._fd = self._fd, None
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        except OSError as e:
+            g_logger.error(f"I/O error releasing lock '{self.lock_path}': {e}")
+        finally:
+            # Closing the descriptor releases the lock even if LOCK_UN failed
+            os.close(fd)
+        return True
+
+    def __enter__(self):
+        """Acquires the lock when entering a `with` block."""
+        if not self.acquire(wait=True):
+            raise TimeoutError(f"Could not acquire lock '{self.lock_path}' within the timeout period.")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Releases the lock when exiting a `with` block."""
+        self.release()
+
+    def locked(self) -> bool:
+        """Checks if the lock is currently held by this instance."""
+        return self._fd is not None
+
+    def renew(self, timeout_seconds):
+        """
+        Records a heartbeat for a held lock. flock locks do not expire, so this
+        only confirms the lock is still held.
+
+        Args:
+            timeout_seconds (int): Unused; kept for the LockBase interface.
+
+        Returns:
+            bool: True if the lock is held by this instance.
+        """
+        if self._fd is None:
+            return False
+        self._write_owner()
+        return True
@@ -9,13 +9,20 @@ success rates, and time-based patterns.
 # =============================================================================
 # STANDARD LIBRARY IMPORTS
 # =============================================================================
+import atexit
 import json
+import os
 import pickle
 import threading
 import zoneinfo
 from datetime import datetime, timedelta
 from pathlib import Path
 
+# =============================================================================
+# LOCAL IMPORTS
+# =============================================================================
+import publish_rate_model
+
 # =============================================================================
 # CONFIGURATION CLASSES
 # =============================================================================
@@ -41,6 +48,17 @@ class FeedConfig:
     HISTORY_WINDOW = 5                    # Track last 5 fetches
     SMOOTHING_FACTOR = 0.7                # Weight for exponential smoothing (0-1)
 
+    # Persistence settings
+    FLUSH_DELAY_SECONDS = 5               # Batch journal appends made within this window
+    COMPACT_THRESHOLD = 500               # Rewrite the JSON snapshot after this many journal records
+    EVENTS_MAX_BYTES = 64 * 1024 * 1024   # Rotate the fetch event log to .events.1 past this size
+
+    # Publish-rate model settings (see publish_rate_model.py)
+    USE_RATE_MODEL = False                # Schedule refreshes from predicted publish rates
+    RATE_MODEL_MIN_WEEKS = 1.0            # Observation a feed needs before the model schedules it
+    FETCH_BUDGET_PER_DAY = 240            # Total refreshes per day across all feeds of a report
+    RATE_THRESHOLD_TTL = 3600             # Seconds between recomputations of the budget threshold
+
 # =============================================================================
 # MAIN FEED HISTORY CLASS
 # =============================================================================
@@ -53,26 +71,60 @@ class FeedHistory:
     activity to optimize refresh intervals. It uses exponential smoothing and
     bucket-based analysis to determine optimal fetch timing.
     
+    Updates are persisted as append-only records in a journal file next to the
+    JSON snapshot. Appends are debounced onto a timer thread so fetch threads never
+    wait on disk I/O, and the journal is periodically compacted into the snapshot
+    with an atomic rename. Fetches are also appended to an event log that
+    compaction never truncates, so offline tools can replay weeks of publish
+    times (see read_events).
+    
     Attributes:
         data_file (Path): Path to the JSON data file storing feed history
+        journal_file (Path): Path to the append-only journal of updates since the last snapshot
+        events_file (Path): Path to the append-only log of every fetch and its publish times
         lock (threading.RLock): Thread-safe lock for data access
         data (Dict[str, dict]): In-memory feed history data
     """
     
-    def __init__(self, data_file):
+    def __init__(self, data_file, read_only=False):
         """
         Initialize the FeedHistory instance.
         
         Args:
-            data_file (str): Path to the data file for storing feed history
+            data_file (Optional[str]): Path to the data file for storing feed history.
+                                       If None, history is kept in memory only (used
+                                       by offline evaluation tools).
+            read_only (bool): Load the snapshot and journal but never write them, so
+                              offline tools can read the files of a running site.
         """
+        self.read_only = read_only
+        self.lock = threading.RLock()
+        self._io_lock = threading.Lock()
+        self._pending = []
+        self._flush_timer = None
+        self._journal_records = 0
+        self._rate_threshold = None
+        self._rate_threshold_time = 0
+
+        if data_file is None:
+            self.data_file = None
+            self.journal_file = None
+            self.events_file = None
+            self.data = {}
+            return
+
         self.data_file = Path(data_file)
         # Ensure the data file has a .json extension
         if not self.data_file.suffix == '.json':
             self.data_file = self.data_file.with_suffix('.json')
         
-        self.lock = threading.RLock()
+        self.journal_file = self.data_file.with_suffix('.journal')
+        self.events_file = self.data_file.with_suffix('.events')
+
         self.data = self._load_data()
+        self._replay_journal()
+        if not read_only:
+            atexit.register(self.flush)
 
     # =============================================================================
     # DATA LOADING AND VALIDATION METHODS
@@ -103,8 +155,9 @@ class FeedHistory:
             data = self._load_pickle(pickle_file)
             if data is not None:
                 # Convert pickle data to JSON for future use
-                self.data = data
-                self._save_data()
+                if not self.read_only:
+                    self.data = data
+                    self._save_data(self._serialize())
                 return data
         
         print("[FeedHistory] No valid data file found, returning empty dictionary")
@@ -200,25 +253,165 @@ class FeedHistory:
     # DATA PERSISTENCE METHODS
     # =============================================================================
 
-    def _save_data(self):
+    def _replay_journal(self):
         """
-        Save history to JSON file, converting datetime objects to strings and sets to lists.
+        Apply journal records written since the last snapshot.
         
-        Serializes the in-memory feed history data to JSON format, converting
-        Python objects that are not JSON-serializable to appropriate formats.
+        Replay is idempotent, and a partially written last line (e.g. from a
+        crash mid-append) is ignored.
         """
-        # Convert datetime objects to strings and sets to lists
-        serializable_data = {
+        if not self.journal_file.exists():
+            return
+
+        try:
+            with open(self.journal_file, "r") as f:
+                lines = f.readlines()
+        except IOError as e:
+            print(f"[FeedHistory] Failed to read journal: {str(e)}")
+            return
+
+        for line in lines:
+            try:
+                record = json.loads(line)
+                url = record["url"]
+                if record.get("reset"):
+                    self.data.pop(url, None)
+                else:
+                    fetch_time = datetime.fromisoformat(record["time"])
+                    # Skip records already in the snapshot (crash between compaction and truncation)
+                    recent = self.data.get(url, {}).get("recent")
+                    if not recent or recent[-1][0] < fetch_time:
+                        self._apply_fetch(url, fetch_time, record["new"], record.get("published"))
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                print("[FeedHistory] Skipping corrupt journal record")
+                continue
+            self._journal_records += 1
+
+        print(f"[FeedHistory] Replayed {self._journal_records} journal records")
+
+    def _serialize(self):
+        """
+        Convert the in-memory data into a JSON-serializable dictionary.
+        
+        Returns:
+            Dict[str, dict]: Feed data with datetimes as strings and sets as lists
+        """
+        return {
             url: {
                 **feed_data,
+                "buckets": dict(feed_data.get("buckets", {})),
                 "recent": [(dt.isoformat(), n) for dt, n in feed_data.get("recent", [])],
                 "weekday_buckets": list(feed_data.get("weekday_buckets", [])),
                 "weekend_buckets": list(feed_data.get("weekend_buckets", []))
             }
             for url, feed_data in self.data.items()
         }
-        with open(self.data_file, "w") as f:
+
+    def _save_data(self, serializable_data):
+        """
+        Atomically write a snapshot to the JSON file.
+        
+        Writes to a temporary file and renames it over the data file so readers
+        and crashes never observe a partially written snapshot.
+        
+        Args:
+            serializable_data (Dict[str, dict]): Output of _serialize()
+        """
+        tmp_file = self.data_file.with_suffix('.json.tmp')
+        with open(tmp_file, "w") as f:
             json.dump(serializable_data, f, indent=4, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.data_file)
+
+    def _append_record(self, record):
+        """
+        Queue a journal record and schedule a debounced flush.
+        
+        Must be called with self.lock held.
+        
+        Args:
+            record (dict): JSON-serializable journal record
+        """
+        if self.data_file is None or self.read_only:
+            return
+
+        self._pending.append(record)
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(FeedConfig.FLUSH_DELAY_SECONDS, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self):
+        """
+        Write queued records to the journal, compacting it into the snapshot when it grows large.
+        
+        Runs on the debounce timer thread and at interpreter exit. Only one flush
+        writes at a time; the data lock is held just long enough to swap out the
+        queued records or take a snapshot.
+        """
+        if self.data_file is None or self.read_only:
+            return
+
+        with self._io_lock:
+            with self.lock:
+                self._flush_timer = None
+                records, self._pending = self._pending, []
+                compact = self._journal_records + len(records) >= FeedConfig.COMPACT_THRESHOLD
+                # Queued records are already applied to self.data, so the snapshot covers them
+                snapshot = self._serialize() if compact else None
+
+            try:
+                if compact:
+                    self._save_data(snapshot)
+                    with open(self.journal_file, "w"):
+                        pass
+                    self._journal_records = 0
+                elif records:
+                    with open(self.journal_file, "a") as f:
+                        f.write("".join(json.dumps(record) + "\n" for record in records))
+                    self._journal_records += len(records)
+                self._append_events(records)
+            except (IOError, OSError, TypeError) as e:
+                print(f"[FeedHistory] Failed to persist history: {str(e)}")
+
+    def _append_events(self, records):
+        """
+        Append fetch records to the event log, rotating it when it grows too large.
+        
+        Must be called with self._io_lock held.
+        
+        Args:
+            records (list): Journal records just flushed
+        """
+        events = [record for record in records if not record.get("reset")]
+        if not events:
+            return
+        if self.events_file.exists() and self.events_file.stat().st_size >= FeedConfig.EVENTS_MAX_BYTES:
+            os.replace(self.events_file, self.events_file.with_suffix('.events.1'))
+        with open(self.events_file, "a") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in events))
+
+    def read_events(self):
+        """
+        Read the fetch event log, oldest first, including the rotated previous log.
+        
+        Yields:
+            dict: Fetch records with url, time (ISO format), new, and optionally published
+        """
+        if self.events_file is None:
+            return
+        for path in (self.events_file.with_suffix('.events.1'), self.events_file):
+            if not path.exists():
+                continue
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Partially written last line
+                    if "url" in record and "time" in record:
+                        yield record
 
     def reset_history(self, url):
         """
@@ -230,13 +423,13 @@ class FeedHistory:
         with self.lock:
             if url in self.data:
                 del self.data[url]
-                self._save_data()
+                self._append_record({"url": url, "reset": True})
 
     # =============================================================================
     # FEED UPDATE AND TRACKING METHODS
     # =============================================================================
 
-    def update_fetch(self, url, new_articles):
+    def update_fetch(self, url, new_articles, published=None):
         """
         Update the fetch history for a given URL.
         
@@ -246,36 +439,63 @@ class FeedHistory:
         Args:
             url (str): The RSS feed URL that was fetched
             new_articles (int): Number of new articles found in the fetch
+            published (Optional[List[float]]): Unix publish timestamps of the new
+                                               articles, used by the publish-rate model
+
+        Returns:
+            datetime: When the feed is next due for a refresh, so callers can store it
+                      alongside the last fetch time and avoid recomputing the interval
         """
         fetch_time = datetime.now(FeedConfig.TZ)
         with self.lock:
-            feed_data = self.data.setdefault(url, {
-                "buckets": {},           # Frequency per time bucket
-                "recent": [],            # Last HISTORY_WINDOW fetches: (time, new_articles)
-                "weekday_buckets": set(), # Track fetched weekday bucket numbers
-                "weekend_buckets": set(), # Track fetched weekend bucket numbers
-            })
-
-            # Update recent fetches
-            fetch_entry = (fetch_time, new_articles)
-            feed_data["recent"] = (feed_data["recent"][-FeedConfig.HISTORY_WINDOW + 1:] + [fetch_entry])[-FeedConfig.HISTORY_WINDOW:]
-
-            # Update bucket frequency
-            bucket = self._get_bucket(fetch_time)
-            old_freq = feed_data["buckets"].get(bucket, 0)
-            new_freq = 1 if new_articles > 0 else 0
-            feed_data["buckets"][bucket] = (FeedConfig.SMOOTHING_FACTOR * new_freq +
-                                           (1 - FeedConfig.SMOOTHING_FACTOR) * old_freq)
-
-            # Update bucket coverage
-            is_weekday = fetch_time.weekday() < 5
-            bucket_num = fetch_time.hour // FeedConfig.BUCKET_SIZE_HOURS
-            if is_weekday:
-                feed_data["weekday_buckets"].add(bucket_num)
-            else:
-                feed_data["weekend_buckets"].add(bucket_num)
+            self._apply_fetch(url, fetch_time, new_articles, published)
+            record = {"url": url, "time": fetch_time.isoformat(), "new": new_articles}
+            if published:
+                record["published"] = published
+            self._append_record(record)
+
+            return self.get_next_due(url, fetch_time)
 
-            self._save_data()
+    def _apply_fetch(self, url, fetch_time, new_articles, published=None):
+        """
+        Apply a single fetch result to the in-memory history.
+        
+        Shared by live updates and journal replay so both produce identical state.
+        
+        Args:
+            url (str): The RSS feed URL that was fetched
+            fetch_time (datetime): When the fetch happened
+            new_articles (int): Number of new articles found in the fetch
+            published (Optional[List[float]]): Unix publish timestamps of the new articles
+        """
+        feed_data = self.data.setdefault(url, {
+            "buckets": {},           # Frequency per time bucket
+            "recent": [],            # Last HISTORY_WINDOW fetches: (time, new_articles)
+            "weekday_buckets": set(), # Track fetched weekday bucket numbers
+            "weekend_buckets": set(), # Track fetched weekend bucket numbers
+        })
+
+        # Update recent fetches
+        fetch_entry = (fetch_time, new_articles)
+        feed_data["recent"] = (feed_data["recent"][-FeedConfig.HISTORY_WINDOW + 1:] + [fetch_entry])[-FeedConfig.HISTORY_WINDOW:]
+
+        # Update bucket frequency
+        bucket = self._get_bucket(fetch_time)
+        old_freq = feed_data["buckets"].get(bucket, 0)
+        new_freq = 1 if new_articles > 0 else 0
+        feed_data["buckets"][bucket] = (FeedConfig.SMOOTHING_FACTOR * new_freq +
+                                       (1 - FeedConfig.SMOOTHING_FACTOR) * old_freq)
+
+        # Update bucket coverage
+        is_weekday = fetch_time.weekday() < 5
+        bucket_num = fetch_time.hour // FeedConfig.BUCKET_SIZE_HOURS
+        if is_weekday:
+            feed_data["weekday_buckets"].add(bucket_num)
+        else:
+            feed_data["weekend_buckets"].add(bucket_num)
+
+        # Update the publish-rate model
+        publish_rate_model.observe(feed_data, fetch_time.timestamp(), published or [], FeedConfig.TZ)
 
     # =============================================================================
     # UTILITY AND ANALYSIS METHODS
@@ -298,7 +518,7 @@ class FeedHistory:
         bucket = dt.hour // FeedConfig.BUCKET_SIZE_HOURS
         return f"{'weekday' if is_weekday else 'weekend'}-{bucket}"
 
-    def get_interval(self, url):
+    def get_interval(self, url, now=None):
         """
         Get the current refresh interval for a URL based on historical data.
         
@@ -309,13 +529,14 @@ class FeedHistory:
         
         Args:
             url (str): The RSS feed URL to calculate interval for
+            now (Optional[datetime]): Time whose bucket is used, defaults to the current time
             
         Returns:
             timedelta: Recommended refresh interval between MIN_INTERVAL and MAX_INTERVAL
         """
         feed_data = self.data.get(url, {})
 
-        current_bucket = self._get_bucket(datetime.now(FeedConfig.TZ))
+        current_bucket = self._get_bucket(now or datetime.now(FeedConfig.TZ))
         recent = feed_data.get("recent", [])
 
         if not recent:
@@ -335,6 +556,92 @@ class FeedHistory:
 
         return timedelta(seconds=interval)
 
+    def get_next_due(self, url, last_fetch):
+        """
+        Compute when a feed is next due for a refresh.
+        
+        Args:
+            url (str): The RSS feed URL to check
+            last_fetch (datetime): Timestamp of the last fetch attempt
+            
+        Returns:
+            datetime: Timezone-aware time after which the feed should be refreshed
+        """
+        # Ensure last_fetch is timezone-aware using the configured timezone
+        if last_fetch.tzinfo is None:
+            last_fetch = last_fetch.replace(tzinfo=FeedConfig.TZ)
+
+        feed_data = self.data.get(url, {})
+        if FeedConfig.USE_RATE_MODEL and feed_data.get("observed_weeks", 0) >= FeedConfig.RATE_MODEL_MIN_WEEKS:
+            rates = publish_rate_model.rate_matrix([feed_data])
+            due = publish_rate_model.next_due(rates, [last_fetch.timestamp()], self._get_rate_threshold(),
+                                              FeedConfig.MIN_INTERVAL.total_seconds(),
+                                              FeedConfig.MAX_INTERVAL.total_seconds(), FeedConfig.TZ)
+            return datetime.fromtimestamp(due[0], FeedConfig.TZ)
+
+        # Clamp the interval to the current MAX_INTERVAL
+        interval = min(self.get_interval(url), FeedConfig.MAX_INTERVAL)
+        return last_fetch + interval
+
+    def _get_rate_threshold(self):
+        """
+        Get the expected-articles threshold that spends FETCH_BUDGET_PER_DAY across all feeds.
+        
+        Recomputed at most every RATE_THRESHOLD_TTL seconds over every feed at once.
+        
+        Returns:
+            float: Expected new articles a feed should accumulate before it is refreshed
+        """
+        now = datetime.now(FeedConfig.TZ).timestamp()
+        with self.lock:
+            if self._rate_threshold is None or now - self._rate_threshold_time > FeedConfig.RATE_THRESHOLD_TTL:
+                rates = publish_rate_model.rate_matrix(list(self.data.values()))
+                self._rate_threshold = publish_rate_model.budget_threshold(rates, FeedConfig.FETCH_BUDGET_PER_DAY)
+                self._rate_threshold_time = now
+            return self._rate_threshold
+
+    def get_expected_new(self, urls, last_fetches, now=None):
+        """
+        Estimate how many new articles each feed has published since its last fetch.
+        
+        Feeds with publish-rate observations use the model. Others fall back to
+        their recent success rate, scaled by how many MIN_INTERVALs have passed.
+        Feeds that were never fetched get an infinite estimate.
+        
+        Args:
+            urls (List[str]): Feed URLs to estimate
+            last_fetches (Dict[str, Optional[datetime]]): Last fetch time per URL
+            now (Optional[float]): Current Unix timestamp
+            
+        Returns:
+            List[float]: Expected new articles, in the same order as urls
+        """
+        if now is None:
+            now = datetime.now(FeedConfig.TZ).timestamp()
+
+        with self.lock:
+            feeds = [self.data.get(url, {}) for url in urls]
+        stamps = []
+        for url in urls:
+            last_fetch = last_fetches.get(url)
+            if last_fetch is not None and last_fetch.tzinfo is None:
+                last_fetch = last_fetch.replace(tzinfo=FeedConfig.TZ)
+            stamps.append(last_fetch.timestamp() if last_fetch is not None else now)
+
+        modeled = publish_rate_model.expected_new(publish_rate_model.rate_matrix(feeds), stamps, now, FeedConfig.TZ)
+
+        expected = []
+        for url, feed_data, stamp, estimate in zip(urls, feeds, stamps, modeled):
+            if last_fetches.get(url) is None:
+                expected.append(float("inf"))
+            elif feed_data.get("observed_weeks", 0) > 0:
+                expected.append(float(estimate))
+            else:
+                recent = feed_data.get("recent", [])
+                success_rate = sum(1 for _, n in recent if n > 0) / len(recent) if recent else 0.5
+                expected.append(success_rate * (now - stamp) / FeedConfig.MIN_INTERVAL.total_seconds())
+        return expected
+
     def has_expired(self, url, last_fetch):
         """
         Check if the feed should be refreshed based on current interval and last fetch time.
@@ -349,11 +656,4 @@ class FeedHistory:
         Returns:
             bool: True if the feed should be refreshed, False otherwise
         """
-        # Ensure last_fetch is timezone-aware using the configured timezone
-        if last_fetch.tzinfo is None:
-            last_fetch = last_fetch.replace(tzinfo=FeedConfig.TZ)
-
-        interval = self.get_interval(url)
-        # Clamp the interval to the current MAX_INTERVAL
-        clamped_interval = min(interval, FeedConfig.MAX_INTERVAL)
-        return datetime.now(FeedConfig.TZ) > last_fetch + clamped_interval
+        return datetime.now(FeedConfig.TZ) > self.get_next_due(url, last_fetch)
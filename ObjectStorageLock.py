@@ -15,12 +15,14 @@ Key Features:
 - Supports thread-local reentrant locking with lock depth tracking.
 - Includes retry logic for transient S3 errors.
 - Allows custom metadata for debugging and integration.
+- Pluggable lock stores: the configured bucket, or a local directory stand-in.
 - Supports lock renewal for long-running tasks.
 
 Edge Cases Handled:
 - **Eventual Consistency**: Ownership checks and fencing tokens mitigate S3 consistency issues.
 - **Network Failures**: Retries with exponential backoff handle transient errors.
-- **Clock Skew**: Expiry times are based on monotonic clocks to avoid skew.
+- **Clock Skew**: Expiry times are wall-clock times, so they mean the same thing on every
+  server; callers relying on expiry (e.g. leader election) must allow a skew margin.
 - **Stale Locks**: Automatic cleanup of expired locks prevents deadlocks.
 - **Concurrent Access**: Fencing tokens ensure only one instance holds the lock.
 
@@ -61,7 +63,9 @@ Optimizations for Linode Object Storage:
 - The design includes reentrant locking and automatic stale lock cleanup to handle common distributed system challenges on Linode.
 """
 
+import fcntl
 import os
+import re
 import threading
 import time
 import uuid
@@ -73,12 +77,6 @@ import pickle
 import object_storage_config as oss_config
 import object_storage_sync
 from shared import g_logger
-from object_storage_sync import (
-    publish_file, 
-    fetch_file,
-    publish_bytes,
-    smart_fetch
-)
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 from models import LockBase
 
@@ -88,6 +86,175 @@ MAX_RETRY_INTERVAL = oss_config.MAX_RETRY_INTERVAL
 MAX_RETRY_ATTEMPTS = oss_config.MAX_RETRY_ATTEMPTS
 RETRY_MULTIPLIER = oss_config.RETRY_MULTIPLIER
 
+# =============================================================================
+# LOCK STORES
+# =============================================================================
+#
+# A store reads objects with their version (ETag) and writes them either
+# unconditionally or, if it supports conditional writes, only if the object is
+# still at the version read (If-Match) or does not exist yet (If-None-Match: *).
+# Conditional writes let acquisition be a single read plus a single write that
+# fails cleanly for every contender but one.
+
+# Status codes a provider returns when a conditional write loses a race
+_PRECONDITION_FAILED = (409, 412)
+# Status codes meaning the provider does not understand the conditional headers
+_CONDITIONS_UNSUPPORTED = (400, 501)
+
+
+def _http_status(error):
+    """Extract the HTTP status from a libcloud error, if it carries one."""
+    status = getattr(error, 'http_code', None) or getattr(error, 'code', None)
+    if isinstance(status, int):
+        return status
+    match = re.search(r"status_code=(\d{3})", str(error))
+    return int(match.group(1)) if match else None
+
+
+class LibcloudLockStore:
+    """Keeps lock objects in the configured object storage bucket."""
+
+    def __init__(self, conditional_writes=None):
+        """
+        Args:
+            conditional_writes (bool, optional): Use If-Match / If-None-Match on PUT.
+                Defaults to the storage.conditional_writes setting.
+        """
+        if conditional_writes is None:
+            conditional_writes = oss_config.STORAGE_CONDITIONAL_WRITES
+        self.supports_conditional_writes = conditional_writes
+
+    def read(self, name):
+        """Return the object's content and ETag, or (None, None) if it does not exist."""
+        obj = object_storage_sync._get_object(name)
+        if obj is None:
+            return None, None
+        buffer = BytesIO()
+        oss_config._storage_driver.download_object_as_stream(obj, buffer)
+        return buffer.getvalue(), obj.hash
+
+    def write(self, name, data):
+        """Create or overwrite the object."""
+        oss_config._storage_driver.upload_object_via_stream(
+            iterator=BytesIO(data),
+            container=oss_config._storage_container,
+            object_name=name
+        )
+
+    def write_if(self, name, data, etag):
+        """
+        Write the object only if it is unchanged since it was read.
+
+        Args:
+            name: Object name
+            data: New content
+            etag: ETag from read(), or None to require that the object not exist
+
+        Returns:
+            bool: True if written, False if another writer changed the object first
+
+        Raises:
+            NotImplementedError: If the provider rejects conditional writes; the
+                                 store then stops using them.
+        """
+        if not self.supports_conditional_writes:
+            raise NotImplementedError("Conditional writes are disabled for this store")
+        headers = {'If-Match': f'"{etag}"'} if etag else {'If-None-Match': '*'}
+        try:
+            oss_config._storage_driver.upload_object_via_stream(
+                iterator=BytesIO(data),
+                container=oss_config._storage_container,
+                object_name=name,
+                headers=headers
+            )
+            return True
+        except TypeError as e:
+            # Drivers whose upload does not take headers
+            self.supports_conditional_writes = False
+            raise NotImplementedError(f"Storage driver cannot send conditional headers: {e}") from e
+        except oss_config.LibcloudError as e:
+            status = _http_status(e)
+            if status in _PRECONDITION_FAILED:
+                return False
+            if status in _CONDITIONS_UNSUPPORTED:
+                self.supports_conditional_writes = False
+                raise NotImplementedError(f"Provider rejected a conditional write: {e}") from e
+            raise
+
+
+class LocalLockStore:
+    """
+    Keeps lock objects as files in a directory, standing in for object storage.
+
+    Used by tests, and by deployments whose servers share a filesystem (e.g. NFS)
+    instead of a bucket. Writes replace the file atomically, so readers never see
+    a partial object, matching object storage semantics. ETags are content MD5s,
+    like S3's for single-part uploads, and conditional writes compare them under
+    a flock on a sidecar file.
+    """
+
+    def __init__(self, root, conditional_writes=True):
+        """
+        Args:
+            root (str): Directory holding the objects
+            conditional_writes (bool): Whether to offer write_if(), e.g. to compare
+                                       against the unconditional fallback
+        """
+        self.root = root
+        self.supports_conditional_writes = conditional_writes
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.root, hashlib.md5(name.encode()).hexdigest())
+
+    def read(self, name):
+        """Return the object's content and ETag, or (None, None) if it does not exist."""
+        try:
+            with open(self._path(name), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None, None
+        return data, hashlib.md5(data).hexdigest()
+
+    def write(self, name, data):
+        """Create or overwrite the object."""
+        path = self._path(name)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def write_if(self, name, data, etag):
+        """
+        Write the object only if it is unchanged since it was read.
+
+        Args:
+            name: Object name
+            data: New content
+            etag: ETag from read(), or None to require that the object not exist
+
+        Returns:
+            bool: True if written, False if another writer changed the object first
+
+        Raises:
+            NotImplementedError: If this store was created without conditional writes
+        """
+        if not self.supports_conditional_writes:
+            raise NotImplementedError("Conditional writes are disabled for this store")
+        fd = os.open(f"{self._path(name)}.cond", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            if self.read(name)[1] != etag:
+                return False
+            self.write(name, data)
+            return True
+        finally:
+            os.close(fd)  # Closing the descriptor releases the flock
+
+# =============================================================================
+# OBJECT STORAGE LOCK
+# =============================================================================
+
 class ObjectStorageLock(LockBase):
     """
     A distributed lock implementation using S3-compatible object storage (via libcloud).
@@ -98,6 +265,9 @@ class ObjectStorageLock(LockBase):
         owner_prefix: Optional prefix for the owner ID (default: pid + thread ID).
         metadata: Optional dictionary of custom metadata (e.g., {"app": "my-app"}).
         retry_interval: Base interval (seconds) for acquisition retries.
+        store: Where lock objects live (default: the configured bucket).
+        owner_id: Fixed owner identity. A new instance with the same owner_id can
+                  take over a lock left by a previous one, e.g. after a restart.
 
     Raises:
         ConfigurationError: If object storage is not available or misconfigured.
@@ -107,24 +277,30 @@ class ObjectStorageLock(LockBase):
         lock_name,
         owner_prefix=None,
         metadata=None,
-        retry_interval=DEFAULT_RETRY_INTERVAL
+        retry_interval=DEFAULT_RETRY_INTERVAL,
+        store=None,
+        owner_id=None
     ):
-        if not oss_config.LIBCLOUD_AVAILABLE or not oss_config.STORAGE_ENABLED:
-            raise oss_config.ConfigurationError("Object storage is not available or not enabled")
-        
-        if not oss_config.init_storage():
-            raise oss_config.ConfigurationError("Failed to initialize object storage")
-        
+        if store is None:
+            if not oss_config.LIBCLOUD_AVAILABLE or not oss_config.STORAGE_ENABLED:
+                raise oss_config.ConfigurationError("Object storage is not available or not enabled")
+
+            if not oss_config.init_storage():
+                raise oss_config.ConfigurationError("Failed to initialize object storage")
+            store = LibcloudLockStore()
+        self._store = store
+
         self.lock_name = lock_name
         self.lock_key = f"lock::{lock_name}"
         self.lock_object_name = self._get_object_name(self.lock_key)
         
-        if owner_prefix is None:
-            owner_prefix = f"pid{os.getpid()}_tid{threading.get_ident()}"
-        self.owner_id = f"{owner_prefix}_{uuid.uuid4()}"
+        if owner_id is None:
+            if owner_prefix is None:
+                owner_prefix = f"pid{os.getpid()}_tid{threading.get_ident()}"
+            owner_id = f"{owner_prefix}_{uuid.uuid4()}"
+        self.owner_id = owner_id
         
         self._thread_local = threading.local()
-        self._thread_local.lock_count = 0
         self.retry_interval = max(MIN_RETRY_INTERVAL, retry_interval)
         self.metadata = metadata or {}
         
@@ -136,7 +312,21 @@ class ObjectStorageLock(LockBase):
         self._fencing_token = 0
 
     def _get_object_name(self, key):
-        return oss_config.generate_object_name(key, prefix="lock")
+        # Shared by all servers, so the lock coordinates across hosts
+        return oss_config.generate_lock_object_name(key)
+
+    @property
+    def _lock_count(self):
+        return getattr(self._thread_local, 'lock_count', 0)
+
+    @_lock_count.setter
+    def _lock_count(self, value):
+        self._thread_local.lock_count = value
+
+    @property
+    def fencing_token(self):
+        """Token of the current holding; it increases with every new acquisition."""
+        return self._fencing_token
         
     def acquire(self, timeout_seconds=60, wait=False):
         """
@@ -152,8 +342,8 @@ class ObjectStorageLock(LockBase):
         Raises:
             TimeoutError: If wait=True and lock cannot be acquired within timeout.
         """
-        if self._thread_local.lock_count > 0:
-            self._thread_local.lock_count += 1
+        if self._lock_count > 0:
+            self._lock_count += 1
             return True
             
         start_time = time.monotonic()
@@ -161,7 +351,7 @@ class ObjectStorageLock(LockBase):
         while True:
             acquired = self._attempt_acquire(timeout_seconds)
             if acquired:
-                self._thread_local.lock_count = 1
+                self._lock_count = 1
                 return True
             if not wait:
                 return False
@@ -181,37 +371,53 @@ class ObjectStorageLock(LockBase):
         reraise=True
     )
     def _attempt_acquire(self, timeout_seconds):
-        """Attempt to acquire the lock once with fencing token."""
+        """
+        Attempt to acquire the lock once with fencing token.
+
+        With a store that supports conditional writes this is one read and one
+        conditional write, which fails for every contender but one. Otherwise the
+        lock is written unconditionally and read back to detect lost races.
+        """
         try:
-            now = time.monotonic()
-            current_lock = self._get_lock_info()
+            # Wall-clock time: expiry must mean the same thing on every server
+            now = time.time()
+            current_lock, etag = self._read_lock_info()
             
-            # Check for valid existing lock
+            # Check for valid existing lock; our own identity may take it over
             if current_lock is not None:
                 expiry = current_lock.get('expiry')
-                if expiry is not None and now < expiry:
+                if (expiry is not None and now < expiry and
+                        current_lock.get('owner_id') != self.owner_id):
                     return False  # Lock is still valid
             
-            # Increment fencing token
-            self._fencing_token += 1
-            expiry = now + timeout_seconds
+            # Each acquisition gets a token greater than any earlier holder's
+            previous_token = current_lock.get('fencing_token', 0) if current_lock else 0
+            fencing_token = max(previous_token, self._fencing_token) + 1
             lock_data = {
                 'owner_id': self.owner_id,
-                'expiry': expiry,
+                'expiry': now + timeout_seconds,
                 'created': now,
                 'lock_name': self.lock_name,
-                'fencing_token': self._fencing_token
+                'fencing_token': fencing_token,
+                'metadata': self.metadata
             }
+
+            written = self._put_lock_info_if(lock_data, etag)
+            if written is not None:
+                if written:
+                    self._fencing_token = fencing_token
+                return written
             
             self._put_lock_info(lock_data)
             
-            # Verify ownership
+            # Verify ownership: a concurrent writer may have overwritten us
             final_lock = self._get_lock_info()
             if (
                 final_lock is not None and
                 final_lock.get('owner_id') == self.owner_id and
-                final_lock.get('fencing_token') == self._fencing_token
+                final_lock.get('fencing_token') == fencing_token
             ):
+                self._fencing_token = fencing_token
                 return True
                 
             return False
@@ -219,22 +425,34 @@ class ObjectStorageLock(LockBase):
         except TypeError as e:
             g_logger.error(f"Error acquiring lock {self.lock_key} due to data issue: {e}")
             return False
-            
-    def _get_lock_info(self):
-        """Get current lock information from storage."""
+
+    def _holds(self, lock_info):
+        """Check whether lock data read from storage is this instance's holding."""
+        return (
+            lock_info is not None and
+            lock_info.get('owner_id') == self.owner_id and
+            lock_info.get('fencing_token') == self._fencing_token
+        )
+
+    def _read_lock_info(self):
+        """Get current lock information and its ETag from storage."""
         try:
-            content, metadata = smart_fetch(self.lock_object_name, cache_expiry=1)
+            content, etag = self._store.read(self.lock_object_name)
             if content:
-                return pickle.loads(content)
-            return None
-        except pickle.UnpicklingError as e:
+                return pickle.loads(content), etag
+            return None, etag
+        except (pickle.UnpicklingError, EOFError) as e:
             g_logger.error(f"Error unpickling lock data for {self.lock_key}: {e}")
-            return None
+            return None, None
         except oss_config.ObjectDoesNotExistError:
-            return None  # Lock does not exist, not an error
-        except (oss_config.StorageOperationError, oss_config.LibcloudError) as e:
+            return None, None  # Lock does not exist, not an error
+        except (oss_config.StorageOperationError, oss_config.LibcloudError, OSError) as e:
             g_logger.warning(f"Could not get lock info for {self.lock_key}: {e}")
-            return None
+            return None, None
+            
+    def _get_lock_info(self):
+        """Get current lock information from storage."""
+        return self._read_lock_info()[0]
 
     @retry(
         stop=stop_after_attempt(MAX_RETRY_ATTEMPTS),
@@ -246,14 +464,51 @@ class ObjectStorageLock(LockBase):
         """Put lock information to storage."""
         try:
             content = pickle.dumps(lock_data)
-            publish_bytes(content, self.lock_object_name)
+            self._store.write(self.lock_object_name, content)
             return True
         except pickle.PicklingError as e:
             g_logger.error(f"Error pickling lock data for {self.lock_key}: {e}")
             raise TypeError(f"Failed to serialize lock data for {self.lock_key}") from e
+        except OSError as e:
+            raise oss_config.StorageOperationError(f"Error writing lock {self.lock_key}: {e}") from e
         except (oss_config.StorageOperationError, oss_config.LibcloudError) as e:
             g_logger.warning(f"Storage error putting lock info for {self.lock_key}: {e}")
             raise
+
+    @retry(
+        stop=stop_after_attempt(MAX_RETRY_ATTEMPTS),
+        wait=wait_exponential(multiplier=RETRY_MULTIPLIER, max=MAX_RETRY_INTERVAL),
+        retry=retry_if_exception_type((oss_config.StorageOperationError, oss_config.LibcloudError)),
+        reraise=True
+    )
+    def _put_lock_info_if(self, lock_data, etag):
+        """
+        Put lock information only if the lock object is still at etag.
+
+        Returns:
+            True if written, False if another writer changed the lock first, or
+            None if the store cannot write conditionally and the caller must fall
+            back to an unconditional write.
+        """
+        if not getattr(self._store, 'supports_conditional_writes', False):
+            return None
+        try:
+            return self._store.write_if(self.lock_object_name, pickle.dumps(lock_data), etag)
+        except NotImplementedError as e:
+            g_logger.warning(f"Falling back to unconditional writes for lock {self.lock_key}: {e}")
+            return None
+        except pickle.PicklingError as e:
+            g_logger.error(f"Error pickling lock data for {self.lock_key}: {e}")
+            raise TypeError(f"Failed to serialize lock data for {self.lock_key}") from e
+        except OSError as e:
+            raise oss_config.StorageOperationError(f"Error writing lock {self.lock_key}: {e}") from e
+
+    def _replace_lock_info(self, lock_data, etag):
+        """Overwrite our own holding, conditionally when the store supports it."""
+        written = self._put_lock_info_if(lock_data, etag)
+        if written is None:
+            return self._put_lock_info(lock_data)
+        return written
     
     def release(self):
         """
@@ -262,32 +517,27 @@ class ObjectStorageLock(LockBase):
         Returns:
             True if lock was released, False otherwise.
         """
-        if self._thread_local.lock_count == 0:
+        if self._lock_count == 0:
             return False
             
-        self._thread_local.lock_count -= 1
-        if self._thread_local.lock_count > 0:
+        self._lock_count -= 1
+        if self._lock_count > 0:
             return True  # Still locked due to reentrancy
             
         success = False
         try:
-            current_lock = self._get_lock_info()
-            if (
-                current_lock is not None and
-                current_lock.get('owner_id') == self.owner_id and
-                current_lock.get('fencing_token') == self._fencing_token
-            ):
-                obj = oss_config._storage_container.get_object(object_name=self.lock_object_name)
-                oss_config._storage_container.delete_object(obj)
-                success = True
+            current_lock, etag = self._read_lock_info()
+            if self._holds(current_lock):
+                # Expire rather than delete, so the next holder's fencing token still increases
+                success = self._replace_lock_info(dict(current_lock, expiry=0), etag)
         except oss_config.ObjectDoesNotExistError:
             g_logger.warning(f"Lock {self.lock_key} was not found during release, assuming already released.")
             success = True  # If the object is already gone, it's released.
-        except (oss_config.StorageOperationError, oss_config.LibcloudError) as e:
+        except (oss_config.StorageOperationError, oss_config.LibcloudError, TypeError) as e:
             g_logger.error(f"Storage error releasing lock {self.lock_key}: {e}")
             success = False
             
-        self._thread_local.lock_count = 0
+        self._lock_count = 0
         return success
         
     def renew(self, timeout_seconds):
@@ -300,26 +550,14 @@ class ObjectStorageLock(LockBase):
         Returns:
             True if lock was renewed, False otherwise.
         """
-        if self._thread_local.lock_count == 0:
+        if self._lock_count == 0:
             return False
             
         try:
-            current_lock = self._get_lock_info()
-            if (
-                current_lock is not None and
-                current_lock.get('owner_id') == self.owner_id and
-                current_lock.get('fencing_token') == self._fencing_token
-            ):
-                now = time.monotonic()
-                lock_data = {
-                    'owner_id': self.owner_id,
-                    'expiry': now + timeout_seconds,
-                    'created': current_lock['created'],
-                    'lock_name': self.lock_name,
-                    'fencing_token': self._fencing_token
-                }
-                self._put_lock_info(lock_data)
-                return True
+            current_lock, etag = self._read_lock_info()
+            if self._holds(current_lock):
+                lock_data = dict(current_lock, expiry=time.time() + timeout_seconds)
+                return self._replace_lock_info(lock_data, etag)
             return False
         except (oss_config.StorageOperationError, oss_config.LibcloudError, TypeError) as e:
             g_logger.error(f"Error renewing lock {self.lock_key}: {e}")
@@ -335,7 +573,7 @@ class ObjectStorageLock(LockBase):
         
     def locked(self) -> bool:
         """Check if the lock is currently held by this instance."""
-        return self._thread_local.lock_count > 0
+        return self._lock_count > 0
 
 if __name__ == '__main__':
     import unittest
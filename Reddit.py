@@ -29,6 +29,9 @@ Runtime behavior:
 - At runtime, get_valid_reddit_client() creates a PRAW Reddit instance from reddit_token.json.
 - workers.py uses fetch_reddit_feed_as_feedparser() (when ENABLE_REDDIT_API_FETCH is True)
   to fetch Reddit data via PRAW using the stored credentials.
+- With ENABLE_REDDIT_BATCH_FETCH, workers.py first fetches the Reddit feeds due in a
+  refresh with one multireddit listing per sort (see fetch_reddit_batch()); only the
+  feeds a listing cannot serve are fetched one by one.
 - No secrets are loaded from config.yaml by default.
 - PRAW automatically handles authentication and token refresh.
 """
@@ -46,6 +49,7 @@ import json
 import os
 import re
 import time
+from array import array
 from urllib.parse import urlparse
 
 # Third-party imports
@@ -63,6 +67,11 @@ DEFAULT_FEED_LIMIT = 10
 FEED_TYPES = ['hot', 'new', 'rising', 'controversial', 'top']
 REQUIRED_CREDENTIAL_KEYS = ['client_id', 'client_secret', 'username', 'password']
 
+# Seen submissions are remembered per feed as the last SEEN_IDS_MAX decoded IDs;
+# early stop only needs the newest ones, since listings stop at the first seen post
+SUBMISSION_PREFIX = 't3_'
+SEEN_IDS_MAX = 20 * DEFAULT_FEED_LIMIT
+
 # Constants for magic numbers and strings
 CREDENTIALS_FILE_MODE = 0o600
 CONTENT_TYPE_HTML = 'text/html'
@@ -70,6 +79,10 @@ CONTENT_TYPE_PLAIN = 'text/plain'
 SUBREDDIT_NAME_MAX_LENGTH = 21  # Reddit's subreddit name limit
 REDDIT_BASE_URL = 'https://www.reddit.com'
 
+# Batched fetching: subreddits per multireddit listing, so one page of 100 (the
+# API maximum) holds DEFAULT_FEED_LIMIT posts for each
+MULTIREDDIT_MAX_SUBREDDITS = 100 // DEFAULT_FEED_LIMIT
+
 # Reddit-specific user agent combining official app user agent with Reddit username from config
 REDDIT_USER_AGENT = f"{USER_AGENT} (by /u/{get_reddit_username()})"
 
@@ -536,31 +549,70 @@ def _handle_praw_exception(e, subreddit, feed_type, praw_url, output):
     return False
 
 
+def _fullname_to_int(fullname):
+    """
+    Decodes a submission fullname ("t3_" plus a base36 ID) to an integer.
+
+    Returns:
+        int or None: The decoded ID, or None if it is not a submission fullname
+    """
+    if not fullname or not fullname.startswith(SUBMISSION_PREFIX):
+        return None
+    try:
+        value = int(fullname[len(SUBMISSION_PREFIX):], 36)
+    except ValueError:
+        return None
+    return value if value < 2 ** 64 else None
+
+
+def _load_seen_ring(feed_url):
+    """
+    Loads the ring of the last seen submission IDs for a feed, oldest first.
+
+    Rings are stored as the bytes of an array('Q'); sets of fullnames stored
+    by older versions are converted.
+
+    Returns:
+        array: Decoded submission IDs, at most SEEN_IDS_MAX of them
+    """
+    ring = array('Q')
+    stored = g_c.get(f"reddit_seen_ids:{feed_url}")
+    if isinstance(stored, bytes):
+        ring.frombytes(stored)
+    elif isinstance(stored, (set, list, tuple)):
+        ring.extend(i for i in map(_fullname_to_int, stored) if i is not None)
+        del ring[:-SEEN_IDS_MAX]
+    return ring
+
+
 def _get_seen_reddit_ids(feed_url):
     """
-    Retrieves the set of seen Reddit submission IDs for a given feed URL.
+    Retrieves the recently seen Reddit submission IDs for a given feed URL.
     
     Args:
         feed_url: The Reddit feed URL to get seen IDs for
         
     Returns:
-        set: Set of submission IDs (e.g., {"t3_xxxxx", "t3_yyyyy"}) or empty set if none found
+        set: Decoded submission IDs (see _is_seen()) or empty set if none found
     """
-    cache_key = f"reddit_seen_ids:{feed_url}"
     try:
-        seen_ids = g_c.get(cache_key)
-        if seen_ids is None:
-            return set()
-        # Ensure we return a set (cache might return a list or other iterable)
-        return set(seen_ids) if isinstance(seen_ids, (set, list, tuple)) else set()
+        return set(_load_seen_ring(feed_url))
     except Exception as e:
         g_logger.warning(f"Error retrieving seen Reddit IDs from cache for {feed_url}: {e}")
         return set()
 
 
+def _is_seen(fullname, seen_ids):
+    """Checks whether a submission fullname (e.g. "t3_xxxxx") is among the seen IDs."""
+    return _fullname_to_int(fullname) in seen_ids
+
+
 def _mark_reddit_ids_seen(feed_url, submission_ids):
     """
     Stores Reddit submission IDs in cache for a given feed URL.
+
+    Only the SEEN_IDS_MAX most recently marked IDs are kept, so the stored value
+    and the cache I/O per fetch stay the same size however long a feed runs.
     
     Args:
         feed_url: The Reddit feed URL these IDs belong to
@@ -571,17 +623,135 @@ def _mark_reddit_ids_seen(feed_url, submission_ids):
     
     cache_key = f"reddit_seen_ids:{feed_url}"
     try:
-        # Get existing seen IDs and merge with new ones
-        existing_ids = _get_seen_reddit_ids(feed_url)
-        all_ids = existing_ids | set(submission_ids)
+        # Append the new IDs to the ring and drop the oldest beyond the limit
+        ring = _load_seen_ring(feed_url)
+        known = set(ring)
+        for value in map(_fullname_to_int, submission_ids):
+            if value is not None and value not in known:
+                ring.append(value)
+                known.add(value)
+        del ring[:-SEEN_IDS_MAX]
         
         # Store in cache with expiration
-        g_c.put(cache_key, all_ids, timeout=EXPIRE_WEEK)
-        g_logger.debug(f"Marked {len(submission_ids)} Reddit IDs as seen for {feed_url} (total: {len(all_ids)})")
+        g_c.put(cache_key, ring.tobytes(), timeout=EXPIRE_WEEK)
+        g_logger.debug(f"Marked {len(submission_ids)} Reddit IDs as seen for {feed_url} (total: {len(ring)})")
     except Exception as e:
         g_logger.warning(f"Error storing seen Reddit IDs in cache for {feed_url}: {e}")
 
 
+# --- Batched Fetching ---
+
+
+def fetch_reddit_batch(feed_urls, reddit=None):
+    """
+    Fetches many due Reddit feeds with one multireddit listing per sort.
+
+    Subreddits with the same feed type are grouped, up to MULTIREDDIT_MAX_SUBREDDITS
+    per listing (e.g. r/linux+Python+Grok/rising), and the results are split back
+    per feed. A sort with a single due subreddit is left to its own listing, since
+    batching it saves nothing.
+
+    A combined listing can be dominated by busy subreddits, so a subreddit that got
+    fewer than DEFAULT_FEED_LIMIT posts serves a feed only when its posts reach one
+    the feed has already seen; the other feeds are left out of the result and
+    should be fetched with fetch_reddit_feed_as_feedparser(). Multireddit listings
+    also omit stickied posts.
+
+    Args:
+        feed_urls: Reddit feed URLs that are due for a refresh
+        reddit: PRAW Reddit instance, created from the stored credentials if None
+
+    Returns:
+        dict: Feed URL -> feedparser-like result, for the feeds the batch served
+    """
+    groups = {}
+    for url in feed_urls:
+        subreddit, feed_type = parse_reddit_url(url)
+        if subreddit and feed_type:
+            groups.setdefault(feed_type, {}).setdefault(subreddit.lower(), (subreddit, []))[1].append(url)
+    groups = {feed_type: subreddits for feed_type, subreddits in groups.items() if len(subreddits) > 1}
+    if not groups:
+        return {}
+
+    reddit = reddit or get_valid_reddit_client()
+    if not reddit:
+        g_logger.error("Could not obtain valid PRAW Reddit client for batched fetch")
+        return {}
+
+    results = {}
+    for feed_type, subreddits in groups.items():
+        names = [name for name, _ in subreddits.values()]
+        for start in range(0, len(names), MULTIREDDIT_MAX_SUBREDDITS):
+            chunk = names[start:start + MULTIREDDIT_MAX_SUBREDDITS]
+            if len(chunk) < 2:
+                continue  # A lone leftover subreddit gains nothing from a multireddit
+            listings = {name.lower(): [] for name in chunk}
+            multireddit = "+".join(chunk)
+            try:
+                submissions = _get_submissions(reddit.subreddit(multireddit), feed_type,
+                                               limit=DEFAULT_FEED_LIMIT * len(chunk))
+                for submission in submissions:
+                    subreddit_obj = getattr(submission, 'subreddit', None)
+                    entries = listings.get(getattr(subreddit_obj, 'display_name', '').lower())
+                    if entries is None or len(entries) >= DEFAULT_FEED_LIMIT or not submission.name:
+                        continue
+                    entry = format_reddit_entry(submission)
+                    if entry:
+                        entries.append(entry)
+            except Exception as e:
+                # What was read is still incomplete-but-usable; other feeds fall back
+                g_logger.error(f"Error fetching multireddit r/{multireddit}/{feed_type}: {e}")
+
+            for name in chunk:
+                entries = listings[name.lower()]
+                for url in subreddits[name.lower()][1]:
+                    output = _serve_from_listing(url, name, feed_type, entries,
+                                                 complete=len(entries) >= DEFAULT_FEED_LIMIT)
+                    if output is not None:
+                        results[url] = output
+            g_logger.info(f"Fetched r/{multireddit}/{feed_type} for {len(chunk)} subreddits in one listing call")
+    return results
+
+
+def _serve_from_listing(feed_url, subreddit, feed_type, entries, complete):
+    """
+    Builds a feed's result from its share of a multireddit listing.
+
+    Returns:
+        dict or None: Feedparser-like result, or None if the listing may be missing
+                      new posts of the feed (incomplete and no seen post reached)
+    """
+    new_entries, reached_seen = _take_unseen_entries(entries, _get_seen_reddit_ids(feed_url))
+    if not (complete or reached_seen):
+        return None
+
+    praw_url = f"{REDDIT_BASE_URL}/r/{subreddit}/{feed_type}"
+    output = _create_success_response(praw_url)
+    output['entries'] = new_entries
+    _mark_reddit_ids_seen(feed_url, [entry['id'] for entry in new_entries])
+    _populate_feed_metadata(output, subreddit, feed_type, praw_url, [])
+    if new_entries and new_entries[0].get('published_parsed'):
+        output['feed']['updated_parsed'] = new_entries[0]['published_parsed']
+        output['feed']['updated'] = new_entries[0]['published']
+    g_logger.debug(f"Served {len(new_entries)} new entries for r/{subreddit}/{feed_type} from a batched listing")
+    return output
+
+
+def _take_unseen_entries(entries, seen_ids):
+    """
+    Takes entries up to the first already-seen one, mirroring the early stop of a listing.
+
+    Returns:
+        tuple: (new entries, whether a seen entry was reached)
+    """
+    new_entries = []
+    for entry in entries:
+        if _is_seen(entry['id'], seen_ids):
+            return new_entries, True
+        new_entries.append(entry)
+    return new_entries, False
+
+
 def fetch_reddit_feed_as_feedparser(feed_url):
     """
     Fetches data from Reddit API based on an RSS-like URL
@@ -614,21 +784,21 @@ def fetch_reddit_feed_as_feedparser(feed_url):
         g_logger.error(f"Could not parse subreddit/feed type from URL: {feed_url}. Parsed subreddit: '{subreddit}', feed_type: '{feed_type}'")
         return _create_error_response(400, ValueError(f"Invalid Reddit URL format: {feed_url}"), feed_url)
 
+    praw_url = f"{REDDIT_BASE_URL}/r/{subreddit}/{feed_type}"
+    output = _create_success_response(praw_url)
+
+    # Get seen submission IDs before fetching to enable early-stop deduplication
+    seen_ids = _get_seen_reddit_ids(feed_url)
+    g_logger.debug(f"Found {len(seen_ids)} previously seen Reddit IDs for {feed_url}")
+
     # Get PRAW Reddit client
     reddit = get_valid_reddit_client()
     if not reddit:
         g_logger.error(f"Could not obtain valid PRAW Reddit client for URL: {feed_url}")
         return _create_error_response(401, ConnectionError("Failed to get PRAW Reddit client"), feed_url)
 
-    praw_url = f"{REDDIT_BASE_URL}/r/{subreddit}/{feed_type}"
     g_logger.info(f"Fetching {feed_type} feed for r/{subreddit} using PRAW")
     g_logger.debug(f"Reddit API URL: {praw_url}")
-    
-    output = _create_success_response(praw_url)
-
-    # Get seen submission IDs before fetching to enable early-stop deduplication
-    seen_ids = _get_seen_reddit_ids(feed_url)
-    g_logger.debug(f"Found {len(seen_ids)} previously seen Reddit IDs for {feed_url}")
 
     try:
         subreddit_obj = reddit.subreddit(subreddit)
@@ -647,7 +817,7 @@ def fetch_reddit_feed_as_feedparser(feed_url):
                 g_logger.debug(f"Skipping submission without ID in r/{subreddit}/{feed_type}")
                 continue
             
-            if submission_id in seen_ids:
+            if _is_seen(submission_id, seen_ids):
                 # Stop iterating immediately - all subsequent submissions are older/seen
                 stopped_early = True
                 g_logger.debug(f"Stopped early at seen submission {submission_id} in r/{subreddit}/{feed_type}")
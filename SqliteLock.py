@@ -160,7 +160,34 @@ class DiskcacheSqliteLock(LockBase):
             return False
 
         return True
+
     def renew(self, timeout_seconds):
-        """Renews the lock with a new timeout."""
-        pass
+        """
+        Extends a held lock so it expires `timeout_seconds` from now.
+
+        Args:
+            timeout_seconds (int): New lifetime of the lock in seconds.
+
+        Returns:
+            bool: True if the lock is still ours and was extended, False if it was lost.
+        """
+        if not self.locked():
+            return False
+
+        try:
+            with self.cache.transact():
+                current_value = self.cache.get(self.lock_key)
+                if not current_value or current_value[0] != self.owner_id:
+                    self._locked = False
+                    return False
+
+                expiry = time.monotonic() + timeout_seconds
+                self.cache.set(self.lock_key, (self.owner_id, expiry), expire=timeout_seconds + 5)
+                self._lock_expiry = expiry
+                return True
+        except (diskcache.Timeout, Timeout) as e:
+            g_logger.warning(f"Timeout error while renewing lock '{self.lock_key}': {e}")
+        except (sqlite3.Error, OSError) as e:
+            g_logger.error(f"Unexpected database or I/O error renewing lock '{self.lock_key}': {e}")
+        return False
 
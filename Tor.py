@@ -2,22 +2,22 @@
 Tor.py
 
 Tor network integration module for fetching Reddit RSS feeds through the Tor network.
-Provides functionality for fetching content via curl through Tor SOCKS proxy and
-managing Tor circuit renewal for IP rotation.
+Provides functionality for fetching content through the Tor SOCKS proxy, in process
+with a reused HTTP session or via curl when SOCKS support is missing, over a pool
+of isolated circuits so feeds are fetched concurrently and a failing circuit is
+rotated on its own, and managing Tor circuit renewal for IP rotation.
 """
 
 # =============================================================================
 # STANDARD LIBRARY IMPORTS
 # =============================================================================
-import traceback
-import io
-import random
-import socket
+import base64
 import sqlite3
 import subprocess
 import threading
 import time
 import traceback
+from contextlib import contextmanager
 from timeit import default_timer as timer
 from xml.parsers import expat
 
@@ -25,20 +25,34 @@ from xml.parsers import expat
 # THIRD-PARTY IMPORTS
 # =============================================================================
 import feedparser
+import requests
 from fake_useragent import UserAgent
 
+try:
+    import socks  # PySocks, which requests needs for socks5h:// proxies
+    SOCKS_AVAILABLE = True
+except ImportError:
+    SOCKS_AVAILABLE = False
+
 # =============================================================================
 # LOCAL IMPORTS
 # =============================================================================
 
 from shared import g_cs, g_logger, EXPIRE_YEARS, WORKER_PROXYING, PROXY_SERVER, PROXY_USERNAME, PROXY_PASSWORD
 from browser_fetch import fetch_site_posts
-from app_config import get_tor_password
+from app_config import get_tor_socks_ports, get_tor_circuits
 
 # =============================================================================
 # CONSTANTS AND CONFIGURATION
 # =============================================================================
 
+# SOCKS endpoint of the local Tor daemon; socks5h resolves hostnames through Tor
+TOR_SOCKS_PROXY = "socks5h://127.0.0.1:9050"
+TOR_FETCH_TIMEOUT = 30
+
+# Larger responses are not feeds; stop reading instead of buffering them
+MAX_FEED_BYTES = 5 * 1024 * 1024
+
 # =============================================================================
 # GLOBAL VARIABLES AND INITIALIZATION
 # =============================================================================
@@ -51,22 +65,142 @@ if not g_cs.has("REDDIT_USER_AGENT"):
 
 # Initialize Reddit method preference if not already set
 if not g_cs.has("REDDIT_METHOD"):
-    g_cs.put("REDDIT_METHOD", "curl", timeout=EXPIRE_YEARS)
+    g_cs.put("REDDIT_METHOD", "http", timeout=EXPIRE_YEARS)
 
-# Thread lock for Tor fetch operations
-tor_fetch_lock = threading.Lock()
+# One HTTP session per SOCKS proxy, so connections and TLS sessions through a
+# circuit are reused across fetches. Reset when the circuit is renewed.
+_tor_sessions = {}
+_tor_sessions_lock = threading.Lock()
 
 # =============================================================================
 # TOR NETWORK OPERATIONS
 # =============================================================================
 
-def fetch_via_curl(url, user_agent):
+def _proxy_headers():
+    """Extra request headers when requests are proxied through a worker."""
+    headers = {}
+    if WORKER_PROXYING and PROXY_SERVER:
+        headers["X-Forwarded-For"] = PROXY_SERVER.split(':')[0]
+        if PROXY_USERNAME and PROXY_PASSWORD:
+            auth_b64 = base64.b64encode(f"{PROXY_USERNAME}:{PROXY_PASSWORD}".encode('ascii')).decode('ascii')
+            headers["Proxy-Authorization"] = f"Basic {auth_b64}"
+    return headers
+
+
+def _cached_tor_result(url):
+    """Fall back to the last cached Tor result for url, if any."""
+    cached_feed = g_cs.get(f"tor_cache:{url}")
+    if cached_feed and cached_feed.get('entries'):
+        g_logger.info(f"Using cached TOR data for {url}: {len(cached_feed.get('entries', []))} entries")
+        return cached_feed
+    return None
+
+
+def parse_feed_bytes(content, content_type=None):
+    """
+    Parse a downloaded feed once, letting feedparser detect the encoding.
+
+    Args:
+        content (bytes): Raw response body
+        content_type (str, optional): Content-Type header, used for the charset
+
+    Returns:
+        feedparser.FeedParserDict or None: Parsed feed, or None if it has no entries
+    """
+    try:
+        response_headers = {'content-type': content_type} if content_type else None
+        result = feedparser.parse(content, response_headers=response_headers)
+    except (expat.ExpatError, TypeError) as parse_error:
+        g_logger.error(f"Error parsing Tor content: {parse_error}")
+        return None
+
+    if not result.get('entries'):
+        g_logger.debug(f"No entries in Tor content. First 200 bytes: {content[:200]!r}")
+        return None
+    return result
+
+
+def _get_tor_session(proxy=TOR_SOCKS_PROXY):
+    """Get the shared HTTP session that sends requests through the given SOCKS proxy."""
+    with _tor_sessions_lock:
+        session = _tor_sessions.get(proxy)
+        if session is None:
+            session = requests.Session()
+            session.proxies = {'http': proxy, 'https': proxy}
+            session.headers['Accept'] = '*/*'
+            _tor_sessions[proxy] = session
+        return session
+
+
+def _reset_tor_sessions(proxy=None):
+    """
+    Close pooled sessions so the next request opens a connection on a new circuit.
+
+    Args:
+        proxy (str, optional): Only reset this proxy's session; all if None
+    """
+    with _tor_sessions_lock:
+        proxies = [proxy] if proxy is not None else list(_tor_sessions)
+        sessions = [_tor_sessions.pop(p) for p in proxies if p in _tor_sessions]
+    for session in sessions:
+        session.close()
+
+
+def fetch_via_socks(url, user_agent, proxy=TOR_SOCKS_PROXY):
+    """
+    Fetch an RSS feed in process through the Tor SOCKS proxy.
+
+    Reuses one session per proxy, so repeated fetches skip the SOCKS and TLS
+    handshakes, streams the body with a size cap, and parses it once.
+
+    Args:
+        url (str): The URL to fetch via Tor network
+        user_agent (str): User agent string for the request
+        proxy (str): SOCKS proxy URL of the Tor circuit to use
+
+    Returns:
+        feedparser.FeedParserDict or None: Parsed RSS feed data or None if failed
+    """
+    headers = {'User-Agent': user_agent}
+    headers.update(_proxy_headers())
+    start_time = timer()
+    try:
+        with _get_tor_session(proxy).get(url, headers=headers, stream=True, timeout=TOR_FETCH_TIMEOUT) as response:
+            response.raise_for_status()
+            chunks = []
+            size = 0
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                size += len(chunk)
+                if size > MAX_FEED_BYTES:
+                    raise ValueError(f"response larger than {MAX_FEED_BYTES} bytes")
+                chunks.append(chunk)
+            content_type = response.headers.get('Content-Type')
+    except (requests.RequestException, ValueError) as e:
+        g_logger.warning(f"SOCKS TOR fetch failed for {url}: {e}, falling back to cached data")
+        return _cached_tor_result(url)
+
+    g_logger.info(f"SOCKS fetch succeeded in {timer() - start_time:.2f}s, content length: {size}")
+    return parse_feed_bytes(b"".join(chunks), content_type)
+
+
+def fetch_via_http(url, user_agent, proxy=TOR_SOCKS_PROXY):
+    """
+    Fetch an RSS feed through Tor without a browser: in process when SOCKS
+    support is installed, otherwise with a curl subprocess.
+    """
+    if SOCKS_AVAILABLE:
+        return fetch_via_socks(url, user_agent, proxy)
+    return fetch_via_curl(url, user_agent, proxy)
+
+
+def fetch_via_curl(url, user_agent, proxy=TOR_SOCKS_PROXY):
     """
     Fetch Reddit RSS feeds using curl subprocess through Tor SOCKS proxy.
 
     Args:
         url (str): The URL to fetch via Tor network
         user_agent (str): User agent string for the request
+        proxy (str): SOCKS proxy URL of the Tor circuit to use
 
     Returns:
         feedparser.FeedParserDict or None: Parsed RSS feed data or None if failed
@@ -80,20 +214,14 @@ def fetch_via_curl(url, user_agent):
     try:
         cmd = [
             "curl", "-s",
-            "--socks5-hostname", "127.0.0.1:9050",
+            "--proxy", proxy,
             "-A", user_agent,
             "-H", "Accept: */*",
         ]
         
         # Add proxy headers if proxying is enabled
-        if WORKER_PROXYING and PROXY_SERVER:
-            cmd.extend(["-H", f"X-Forwarded-For: {PROXY_SERVER.split(':')[0]}"])
-            if PROXY_USERNAME and PROXY_PASSWORD:
-                import base64
-                auth_string = f"{PROXY_USERNAME}:{PROXY_PASSWORD}"
-                auth_bytes = auth_string.encode('ascii')
-                auth_b64 = base64.b64encode(auth_bytes).decode('ascii')
-                cmd.extend(["-H", f"Proxy-Authorization: Basic {auth_b64}"])
+        for name, value in _proxy_headers().items():
+            cmd.extend(["-H", f"{name}: {value}"])
         
         cmd.append(url)
 
@@ -108,41 +236,7 @@ def fetch_via_curl(url, user_agent):
             content_bytes = process_result.stdout
             content_length = len(content_bytes)
             g_logger.info(f"Curl succeeded in {elapsed:.2f}s, content length: {content_length}")
-                        
-            try:
-                # First try parsing it as bytes directly
-                result = feedparser.parse(content_bytes)
-                entries_count = len(result.get('entries', [])) if hasattr(result, 'get') else 0
-                g_logger.debug(f"Parsed {entries_count} entries from curl result (bytes mode)")
-
-                # If no entries, try string conversion
-                if entries_count == 0:
-                    # Convert bytes to string with explicit UTF-8 decoding
-                    content_str = content_bytes.decode('utf-8', errors='replace')
-
-                    # Try parsing as string
-                    result = feedparser.parse(content_str)
-                    entries_count = len(result.get('entries', [])) if hasattr(result, 'get') else 0
-                    g_logger.debug(f"Parsed {entries_count} entries from curl result (string mode)")
-
-                    # If still no entries, save the first part of the content for debugging
-                    if entries_count == 0 and content_length > 1000:
-                        g_logger.debug(f"Failed to parse content. First 200 chars: {content_str[:200]}")
-                        g_logger.debug(f"Content appears to be XML/RSS: {'<?xml' in content_str[:10]}")
-
-                        # Last attempt: try using StringIO
-                        result = feedparser.parse(io.BytesIO(content_bytes))
-                        entries_count = len(result.get('entries', [])) if hasattr(result, 'get') else 0
-                        g_logger.debug(f"BytesIO parsing attempt: {entries_count} entries")
-
-                        if entries_count == 0:
-                            result = None
-            except (expat.ExpatError, TypeError) as parse_error:
-                g_logger.error(f"Error parsing curl content: {str(parse_error)}")
-                g_logger.error(f"Exception type: {type(parse_error).__name__}")
-                g_logger.error(f"Traceback: {traceback.format_exc()}")
-
-                result = None
+            result = parse_feed_bytes(content_bytes)
         else:
             stderr = process_result.stderr
             if isinstance(stderr, bytes):
@@ -153,63 +247,134 @@ def fetch_via_curl(url, user_agent):
     except (subprocess.TimeoutExpired, FileNotFoundError, OSError) as e:
         g_logger.warning(f"Curl TOR method failed: {str(e)}, falling back to cached data")
         # Fall back to cached data if proxying fails
-        cached_feed = g_cs.get(f"tor_cache:{url}")
-        if cached_feed and cached_feed.get('entries'):
-            result = cached_feed
-            g_logger.info(f"Using cached TOR data for {url}: {len(result.get('entries', []))} entries")
-        else:
-            result = None
+        result = _cached_tor_result(url)
         
     return result
 
-def renew_tor_ip():
-    """
-    Generate a new user agent and request a new Tor IP address.
-    
-    This function authenticates with the Tor control port and requests a new circuit
-    to obtain a fresh IP address. It also generates a new user agent for additional
-    anonymity. Waits 20-30 seconds for the new circuit to be established.
-    """
-    # Generate new user agent
-    g_cs.put("REDDIT_USER_AGENT", ua.random, timeout=EXPIRE_YEARS)
+# =============================================================================
+# CIRCUIT POOL
+# =============================================================================
 
-    g_logger.info("Requesting a new TOR IP address...")
+class TorCircuit:
+    """
+    One isolated Tor circuit, selected by the SOCKS credentials used to reach it.
 
-    host = "127.0.0.1"
-    port = 9051
+    Tor puts streams with different SOCKS usernames on different circuits
+    (IsolateSOCKSAuth, on by default), so changing the username moves just this
+    circuit to a new exit right away, without NEWNYM or waiting.
+    """
 
-    # Create socket and connect to Tor control port
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.connect((host, port))
-        s.send(f'AUTHENTICATE "{get_tor_password()}"\r\n'.encode())
+    def __init__(self, index, host, port):
+        """
+        Args:
+            index (int): Position of the circuit in its pool
+            host (str): Host of the Tor SOCKS listener
+            port (int): Tor SocksPort to connect through
+        """
+        self.index = index
+        self.host = host
+        self.port = port
+        self.generation = 0
+        self.user_agent = ua.random
+        self.failures = 0
+        self.fetches = 0
+        self.busy = False
+        self.last_used = 0.0
+
+    @property
+    def proxy(self):
+        """SOCKS proxy URL whose credentials select this circuit."""
+        return f"socks5h://circuit{self.index}-{self.generation}:linuxreport@{self.host}:{self.port}"
+
+    def record_success(self):
+        """Mark a fetch through this circuit as successful."""
+        self.fetches += 1
+        self.failures = 0
+
+    def record_failure(self):
+        """Mark a fetch as failed and rotate to a new circuit and user agent."""
+        self.fetches += 1
+        self.failures += 1
+        old_proxy = self.proxy
+        self.generation += 1
+        self.user_agent = ua.random
+        _reset_tor_sessions(old_proxy)
+        g_logger.info(f"Rotated TOR circuit {self.index} after {self.failures} consecutive failures.")
+
+
+class TorCircuitPool:
+    """
+    Fixed set of isolated circuits, each used by one fetch at a time.
 
-        response = s.recv(1024).decode()
-        if "250 OK" not in response:
-            g_logger.error(f"Authentication failed: {response}")
-            exit(1)
-        s.send(b"SIGNAL NEWNYM\r\n")
-        response = s.recv(1024).decode()
-        g_logger.info(f"New circuit requested: {response}")
+    Fetches on different circuits run concurrently; when every circuit is busy,
+    callers wait for one to free up. A fetch takes the idle circuit with the
+    fewest consecutive failures, least recently used first.
+    """
 
-    # Wait 20-30 seconds to give time for a circuit to be re-established
-    time.sleep(random.uniform(20, 30))
+    def __init__(self, size, ports, host="127.0.0.1"):
+        """
+        Args:
+            size (int): Number of circuits
+            ports (list): Tor SocksPorts to spread the circuits over
+            host (str): Host of the Tor SOCKS listeners
+        """
+        if size < 1 or not ports:
+            raise ValueError("A Tor circuit pool needs at least one circuit and one port")
+        self.circuits = [TorCircuit(i, host, ports[i % len(ports)]) for i in range(size)]
+        self._available = threading.Condition()
+
+    @contextmanager
+    def circuit(self):
+        """Check out a circuit for the duration of a fetch."""
+        with self._available:
+            idle = [c for c in self.circuits if not c.busy]
+            while not idle:
+                self._available.wait()
+                idle = [c for c in self.circuits if not c.busy]
+            circuit = min(idle, key=lambda c: (c.failures, c.last_used))
+            circuit.busy = True
+        try:
+            yield circuit
+        finally:
+            with self._available:
+                circuit.busy = False
+                circuit.last_used = time.monotonic()
+                self._available.notify()
+
+    def stats(self):
+        """
+        Describe the state of every circuit, for logging.
+
+        Returns:
+            list: One dict per circuit with its port, generation and health
+        """
+        with self._available:
+            return [{'circuit': c.index, 'port': c.port, 'generation': c.generation,
+                     'fetches': c.fetches, 'failures': c.failures, 'busy': c.busy}
+                    for c in self.circuits]
+
+
+tor_circuits = TorCircuitPool(get_tor_circuits(), get_tor_socks_ports())
 
 # =============================================================================
 # MAIN FETCH FUNCTION
 # =============================================================================
 
-def fetch_via_tor(url, site_url):
+def fetch_via_tor(url, site_url, pool=None):
     """
     Fetch content via Tor network with automatic fallback and retry logic.
 
     This function attempts to fetch content using the last successful method first,
-    then falls back to alternative methods. If all attempts fail, it renews the
-    Tor IP address and retries. Supports both curl and selenium methods.
-    User agent management is handled internally with smart rotation on failures.
+    then falls back to alternative methods. Each call checks out its own circuit
+    from the pool, so feeds are fetched concurrently. If all methods fail, only
+    that circuit is rotated to a new exit and user agent before retrying. Supports
+    both direct HTTP (see fetch_via_http) and selenium methods; the browser keeps
+    the shared REDDIT_USER_AGENT and the daemon's default circuit.
 
     Args:
         url (str): The RSS feed URL to fetch
         site_url (str): The site URL for selenium-based fetching
+        pool (TorCircuitPool, optional): Circuits to use, tor_circuits by default
 
     Returns:
         dict: Parsed feed data with entries, or empty result dict if all methods fail
@@ -217,13 +382,11 @@ def fetch_via_tor(url, site_url):
     g_logger.info(f"=== FETCH_VIA_TOR START ===")
     g_logger.info(f"Function called with URL: {url}, site_url: {site_url}")
 
-    # Get current user agent from cache
-    user_agent = g_cs.get("REDDIT_USER_AGENT")
-    g_logger.info(f"Using user agent: {user_agent[:50]}...")
-
     try:
-        last_success_method = g_cs.get("REDDIT_LAST_METHOD")
-        g_logger.info(f"Successfully got REDDIT_LAST_METHOD: {last_success_method}")
+        last_success_method = g_cs.get("REDDIT_METHOD")
+        if last_success_method == "curl":
+            last_success_method = "http"  # Preference saved before the in-process client existed
+        g_logger.info(f"Successfully got REDDIT_METHOD: {last_success_method}")
     except (sqlite3.Error, IOError) as e:
         g_logger.error(f"CRITICAL ERROR: Failed to access g_cs.get(): {e}")
         g_logger.error(f"Exception type: {type(e).__name__}")
@@ -235,41 +398,33 @@ def fetch_via_tor(url, site_url):
             'bozo_exception': f'g_cs access failed: {str(e)}'
         }
 
-    with tor_fetch_lock:
+    with (pool or tor_circuits).circuit() as circuit:
+        g_logger.info(f"Using TOR circuit {circuit.index}, user agent: {circuit.user_agent[:50]}...")
         max_attempts = 3  # Define how many attempts we try
         result = None
-        
+
         for attempt in range(max_attempts):
-            # On first try use last_success_method, otherwise start with selenium after renew_tor_ip
+            # On first try use last_success_method, otherwise start with selenium after a rotation
             default_method = last_success_method if (attempt == 0 and last_success_method) else "selenium"
-            
-            # Try default method
-            if default_method == "curl":
-                result_default = fetch_via_curl(url, user_agent)
-            else:
-                result_default = fetch_site_posts(site_url, user_agent)
-                
-            if result_default is not None and len(result_default.get("entries", [])) > 0:
-                g_cs.put("REDDIT_METHOD", default_method, EXPIRE_YEARS)
-                result = result_default
-                break
-            
-            # Try alternative method
-            alternative_method = "selenium" if default_method == "curl" else "curl"
-            if alternative_method == "curl":
-                result_alternative = fetch_via_curl(url, user_agent)
-            else:
-                result_alternative = fetch_site_posts(site_url, user_agent)
-                
-            if result_alternative is not None and len(result_alternative.get("entries", [])) > 0:
-                g_cs.put("REDDIT_METHOD", alternative_method, EXPIRE_YEARS)
-                result = result_alternative
+            alternative_method = "selenium" if default_method == "http" else "http"
+
+            for method in (default_method, alternative_method):
+                if method == "http":
+                    attempt_result = fetch_via_http(url, circuit.user_agent, circuit.proxy)
+                else:
+                    attempt_result = fetch_site_posts(site_url, g_cs.get("REDDIT_USER_AGENT"))
+
+                if attempt_result is not None and len(attempt_result.get("entries", [])) > 0:
+                    g_cs.put("REDDIT_METHOD", method, EXPIRE_YEARS)
+                    result = attempt_result
+                    break
+
+            if result is not None:
+                circuit.record_success()
                 break
-            
-            g_logger.info(f"Attempt {attempt + 1} failed, renewing TOR and trying again...")
-            renew_tor_ip()
-            # Update user_agent to use the newly generated one
-            user_agent = g_cs.get("REDDIT_USER_AGENT")
+
+            g_logger.info(f"Attempt {attempt + 1} failed, rotating TOR circuit {circuit.index} and trying again...")
+            circuit.record_failure()
 
         if result is None:
             g_logger.error("All TOR methods failed, returning empty result")
@@ -278,5 +433,5 @@ def fetch_via_tor(url, site_url):
                 'status': 'failed',
                 'bozo_exception': 'All TOR methods failed'
             }
-            
+
         return result
@@ -60,6 +60,10 @@ class FetchConfig:
     filter_pattern: str = None
     use_random_user_agent: bool = False
     published_selector: str = None
+    # Browser fetches only read the DOM, so subresources of these types are not
+    # loaded (see browser_fetch.should_block_request); use () to load everything
+    blocked_resource_types: tuple = ("image", "font", "media", "stylesheet")
+    block_trackers: bool = True  # Also abort requests to known ad and analytics hosts
 
 @dataclass(frozen=True)
 class RedditFetchConfig(FetchConfig):
@@ -380,6 +384,37 @@ def get_tor_password():
     """
     return config_manager.get('tor.password')
 
+def get_tor_socks_ports():
+    """
+    Get the Tor SOCKS ports that Reddit fetch circuits are spread over.
+
+    Returns:
+        List[int]: SocksPort numbers of the local Tor daemon
+    """
+    return config_manager.get('tor.socks_ports', [9050])
+
+def get_tor_circuits():
+    """
+    Get the number of isolated Tor circuits each process fetches through.
+
+    Returns:
+        int: Number of circuits, which is also the number of concurrent Tor fetches
+    """
+    return config_manager.get('tor.circuits', 4)
+
+def get_browser_limits():
+    """
+    Get the limits past which a pooled browser is recycled.
+
+    Returns:
+        Dict[str, int]: max_rss_mb, max_pages and max_age_seconds
+    """
+    return {
+        'max_rss_mb': config_manager.get('browser.max_rss_mb', 500),
+        'max_pages': config_manager.get('browser.max_pages', 50),
+        'max_age_seconds': config_manager.get('browser.max_age_seconds', 3600),
+    }
+
 def is_storage_enabled():
     """
     Check if object storage is enabled.
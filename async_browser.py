@@ -0,0 +1,241 @@
+"""
+async_browser.py
+
+Async Playwright engine for JavaScript-rendered sites.
+
+The sync engines need one browser per concurrent fetch (see browser_pool), since
+a sync browser drives one page at a time and sync Playwright objects are bound
+to their thread. This engine runs one asyncio event loop in a background thread
+with one Chromium browser, and renders several pages at once in it, each in its
+own isolated context, up to a parallelism limit.
+
+Fetches are submitted from any thread, such as the worker threads of
+workers.process_urls_in_parallel, and block only their caller: while one page
+waits on the network, the loop drives the others. The rendered HTML is parsed in
+the calling thread, so parsing never stalls the loop.
+"""
+
+# =============================================================================
+# STANDARD LIBRARY IMPORTS
+# =============================================================================
+import asyncio
+import concurrent.futures
+import random
+import threading
+
+# =============================================================================
+# LOCAL IMPORTS
+# =============================================================================
+from shared import g_logger
+from browser_fetch import (
+    BROWSER_TIMEOUT, BROWSER_WAIT_TIMEOUT,
+    get_common_browser_args, get_common_context_options, should_block_request,
+    extract_base_domain, _extract_posts_from_html
+)
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+# Pages rendered at once; each costs a renderer process but no extra browser
+ASYNC_MAX_PAGES = 4
+
+# Longest a caller waits for one page, including time queued behind the limit
+ASYNC_FETCH_TIMEOUT = 120
+
+# =============================================================================
+# BROWSER LAUNCH
+# =============================================================================
+
+async def launch_chromium():
+    """
+    Start async Playwright and launch headless Chromium with the shared options.
+
+    Returns:
+        tuple: (playwright, browser)
+    """
+    from playwright.async_api import async_playwright
+
+    playwright = await async_playwright().start()
+    try:
+        # Proxy and user agent are set per context, so one browser serves every site
+        args = get_common_browser_args(False, None)
+        browser = await playwright.chromium.launch(headless=True, args=args['anti_detection'] + args['performance'])
+    except Exception:
+        await playwright.stop()
+        raise
+    return playwright, browser
+
+# =============================================================================
+# ENGINE
+# =============================================================================
+
+class AsyncBrowserEngine:
+    """
+    One browser on one event loop, rendering up to max_pages pages concurrently.
+
+    The loop thread and the browser are started on the first fetch, and the
+    browser is relaunched if it disconnects.
+    """
+
+    def __init__(self, launcher=launch_chromium, max_pages=ASYNC_MAX_PAGES):
+        """
+        Args:
+            launcher (callable): Coroutine function returning (playwright, browser)
+            max_pages (int): Maximum number of pages rendered at once
+        """
+        self._launcher = launcher
+        self._max_pages = max_pages
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._playwright = None
+        self._browser = None
+        self._browser_lock = None   # asyncio.Lock, created on the loop
+        self._semaphore = None      # asyncio.Semaphore, created on the loop
+        self.pages_rendered = 0
+        self.active_pages = 0
+
+    def fetch(self, url, config, user_agent, timeout=ASYNC_FETCH_TIMEOUT):
+        """
+        Render a page and extract its posts with the site's selectors.
+
+        Safe to call from any number of threads at once.
+
+        Args:
+            url (str): URL to fetch
+            config: Configuration object
+            user_agent (str): User agent string
+            timeout (float): Seconds to wait for the page
+
+        Returns:
+            tuple: (entries, status) where entries is list of post entries and status is HTTP status
+        """
+        self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._render(url, config, user_agent), self._loop)
+        try:
+            html, status = future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            g_logger.error(f"Timed out after {timeout}s rendering {url}")
+            return [], 500
+        if status != 200:
+            return [], status
+
+        entries = _extract_posts_from_html(html, config, url)
+        if not entries:
+            g_logger.info(f"No posts found for {url}. Page content snippet: {html[:500]}")
+            return [], 204
+        return entries, 200
+
+    def close(self):
+        """Close the browser and stop the event loop thread."""
+        with self._start_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_browser(), loop).result(BROWSER_TIMEOUT)
+        except Exception as e:
+            g_logger.error(f"Error closing async browser: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(BROWSER_TIMEOUT)
+        if not thread.is_alive():
+            loop.close()
+
+    def stats(self):
+        """
+        Describe the engine, for logging.
+
+        Returns:
+            dict: Whether the browser is running, pages rendering now and rendered so far
+        """
+        return {'running': self._browser is not None, 'active_pages': self.active_pages,
+                'pages_rendered': self.pages_rendered}
+
+    # --- internals ---
+
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="async-browser", daemon=True)
+            thread.start()
+            # Loop-bound primitives must be created on the loop they are used from
+            asyncio.run_coroutine_threadsafe(self._init_primitives(), loop).result()
+            self._loop, self._thread = loop, thread
+
+    async def _init_primitives(self):
+        self._browser_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(self._max_pages)
+
+    async def _get_browser(self):
+        async with self._browser_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._browser is not None:
+                    g_logger.warning("Async browser disconnected, relaunching")
+                    await self._close_browser()
+                self._playwright, self._browser = await self._launcher()
+                g_logger.info(f"Launched async browser for up to {self._max_pages} concurrent pages")
+            return self._browser
+
+    async def _close_browser(self):
+        browser, playwright = self._browser, self._playwright
+        self._browser = self._playwright = None
+        for closer in (browser and browser.close, playwright and playwright.stop):
+            if closer:
+                try:
+                    await closer()
+                except Exception as e:
+                    g_logger.debug(f"Error shutting down async browser: {e}")
+
+    async def _render(self, url, config, user_agent):
+        """Load a page in a new context and return its rendered HTML and status."""
+        async with self._semaphore:
+            self.active_pages += 1
+            context = None
+            try:
+                browser = await self._get_browser()
+                context = await browser.new_context(**get_common_context_options(config.needs_tor, user_agent))
+                await context.route("**/*", _make_route_handler(config))
+                page = await context.new_page()
+                response = await page.goto(url, timeout=BROWSER_TIMEOUT * 1000)
+                if response is not None and response.status >= 400:
+                    return "", response.status
+
+                # Reddit has special handling and is not waited on (as in _fetch_with_browser)
+                if extract_base_domain(url) != "reddit.com":
+                    try:
+                        timeout = random.uniform(15, BROWSER_WAIT_TIMEOUT)
+                        await page.wait_for_selector(config.post_container, timeout=int(timeout * 1000))
+                    except Exception as wait_error:
+                        g_logger.warning(f"Timeout waiting for elements on {url}: {wait_error}")
+                return await page.content(), 200
+            except Exception as e:
+                g_logger.error(f"Error on {url}: {e}")
+                return "", 500
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        g_logger.debug(f"Error closing async context for {url}: {e}")
+                self.active_pages -= 1
+                self.pages_rendered += 1
+
+
+def _make_route_handler(config):
+    """Build a route handler aborting the requests config excludes (see should_block_request)."""
+    async def handle(route):
+        request = route.request
+        if should_block_request(config, request.resource_type, request.url):
+            await route.abort()
+        else:
+            await route.continue_()
+    return handle
+
+
+# Process-wide engine; nothing starts until the first fetch
+async_engine = AsyncBrowserEngine()
@@ -20,6 +20,8 @@ from embeddings_dedup import (
     fetch_recent_articles, get_embeddings, deduplicate_articles_with_exclusions,
     get_best_matching_article
 )
+from story_index import collapse_duplicates
+from leader_election import is_read_only
 from html_generation import (
     generate_headlines_html, refresh_images_only,
     append_to_archive, clean_excess_headlines
@@ -598,9 +600,13 @@ def _prepare_articles_for_ai(articles):
     articles_after_url_filter = [article for article in articles if article["url"] not in previous_urls]
     logger.info(f"After URL filtering: {len(articles)} -> {len(articles_after_url_filter)} articles")
 
+    # Collapse near-identical headlines from different feeds before computing embeddings
+    articles_after_title_filter = collapse_duplicates(articles_after_url_filter)
+    logger.info(f"After title fingerprint filtering: {len(articles_after_url_filter)} -> {len(articles_after_title_filter)} articles")
+
     # Apply embedding-based deduplication
-    filtered_articles = deduplicate_articles_with_exclusions(articles_after_url_filter, previous_embeddings)
-    logger.info(f"After embedding deduplication: {len(articles_after_url_filter)} -> {len(filtered_articles)} articles")
+    filtered_articles = deduplicate_articles_with_exclusions(articles_after_title_filter, previous_embeddings)
+    logger.info(f"After embedding deduplication: {len(articles_after_title_filter)} -> {len(filtered_articles)} articles")
 
     # Filter by title length (10-200 characters)
     filtered_articles = [
@@ -759,6 +765,10 @@ def should_run_update(args, settings_config):
     """Determine if the update should run based on schedule and arguments."""
     if args.force or args.dry_run:
         return True
+
+    if is_read_only():
+        logger.info("Skipping update: this node is read-only and serves headlines published by the fetch leader.")
+        return False
     
     current_hour = datetime.datetime.now(TZ).hour
     scheduled = settings_config.SCHEDULE and current_hour in settings_config.SCHEDULE
@@ -16,6 +16,7 @@ License: See LICENSE file
 # STANDARD LIBRARY IMPORTS
 # =============================================================================
 import time
+import json
 import threading
 import atexit
 import signal
@@ -35,7 +36,9 @@ from bs4 import BeautifulSoup
 # LOCAL IMPORTS
 # =============================================================================
 from shared import g_cs, CUSTOM_FETCH_CONFIG, g_logger, WORKER_PROXYING, PROXY_SERVER, PROXY_USERNAME, PROXY_PASSWORD, USE_PLAYWRIGHT
+from shared import ENABLE_BROWSER_FAST_PATH, EXPIRE_WEEK, USE_ASYNC_PLAYWRIGHT
 from app_config import FetchConfig
+from browser_pool import BrowserPool
 
 # =============================================================================
 # SHARED CONSTANTS
@@ -44,8 +47,73 @@ from app_config import FetchConfig
 # Network operation timeouts - for HTTP requests and element waiting
 NETWORK_TIMEOUT = 20  # 20 seconds for HTTP requests and browser operations
 
-# Thread synchronization timeout - for coordinating fetch operations
-FETCH_LOCK_TIMEOUT = 30  # 30 seconds for acquiring fetch lock (longer due to thread coordination)
+# How long a fetch waits for a pooled browser to become free before giving up
+BROWSER_CHECKOUT_TIMEOUT = 60
+
+# =============================================================================
+# RESOURCE BLOCKING
+# =============================================================================
+
+# URL patterns per resource type, for engines that can only block by URL
+# (Chrome's Network.setBlockedURLs); Playwright matches the real resource type
+RESOURCE_URL_PATTERNS = {
+    "image": ("*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*"),
+    "font": ("*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*"),
+    "media": ("*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*", "*.ogg*"),
+    "stylesheet": ("*.css*",),
+}
+
+# Ad and analytics hosts, blocked with all their subdomains
+TRACKER_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "googletagservices.com",
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com",
+    "adservice.google.com", "amazon-adsystem.com", "adnxs.com", "criteo.com",
+    "criteo.net", "taboola.com", "outbrain.com", "scorecardresearch.com",
+    "quantserve.com", "chartbeat.com", "chartbeat.net", "hotjar.com",
+    "facebook.net", "connect.facebook.net", "moatads.com", "pubmatic.com",
+    "rubiconproject.com", "openx.net", "casalemedia.com", "newrelic.com",
+    "nr-data.net", "segment.io", "optimizely.com",
+)
+
+def _is_tracker_host(host):
+    """Check whether host is a known tracker host or one of its subdomains."""
+    host = (host or "").lower()
+    return any(host == tracker or host.endswith("." + tracker) for tracker in TRACKER_HOSTS)
+
+def should_block_request(config, resource_type, url):
+    """
+    Decide whether a browser fetch should abort a subresource request.
+    
+    Args:
+        config: FetchConfig of the site being fetched
+        resource_type (str): Request type as reported by the browser ('image', 'script', ...)
+        url (str): Request URL
+        
+    Returns:
+        bool: True if the request should be aborted
+    """
+    if resource_type in getattr(config, 'blocked_resource_types', ()):
+        return True
+    return getattr(config, 'block_trackers', False) and _is_tracker_host(urlparse(url).hostname)
+
+def get_blocked_url_patterns(config):
+    """
+    Get Chrome URL patterns that block the resources config excludes.
+    
+    Args:
+        config: FetchConfig of the site being fetched
+        
+    Returns:
+        list: Wildcard patterns for Network.setBlockedURLs
+    """
+    patterns = []
+    for resource_type in getattr(config, 'blocked_resource_types', ()):
+        patterns.extend(RESOURCE_URL_PATTERNS.get(resource_type, ()))
+    if getattr(config, 'block_trackers', False):
+        # The host itself and its subdomains, matching _is_tracker_host
+        for host in TRACKER_HOSTS:
+            patterns.extend((f"*://{host}/*", f"*://*.{host}/*"))
+    return patterns
 
 # Unified browser operation timeouts
 BROWSER_TIMEOUT = 30  # 30 seconds for browser operations (page load, script execution)
@@ -65,7 +133,6 @@ class SharedBrowserManager:
     
     _instances = {}  # Will be overridden by subclasses
     _lock = threading.Lock()
-    _fetch_lock = threading.Lock()
     
     def __init__(self, use_tor, user_agent):
         """
@@ -79,37 +146,6 @@ class SharedBrowserManager:
         self.user_agent = user_agent
         self.last_used = time.time()
     
-    @classmethod
-    def acquire_fetch_lock(cls):
-        """
-        Acquire the fetch lock to synchronize fetch operations.
-        
-        Ensures only one fetch operation can run at a time to prevent
-        resource conflicts and rate limiting issues.
-        
-        Returns:
-            bool: True if lock was acquired successfully
-        """
-        try:
-            return cls._fetch_lock.acquire(timeout=FETCH_LOCK_TIMEOUT)
-        except Exception as e:
-            g_logger.error(f"Error acquiring fetch lock: {e}")
-            return False
-    
-    @classmethod
-    def release_fetch_lock(cls):
-        """
-        Release the fetch lock after fetch operation is complete.
-        
-        Safely releases the fetch lock, handling cases where the lock
-        may not have been acquired.
-        """
-        try:
-            cls._fetch_lock.release()
-        except RuntimeError:
-            # Lock was not acquired, ignore
-            pass
-    
     @classmethod
     def force_cleanup(cls):
         """
@@ -208,6 +244,33 @@ class BrowserInterface:
         """
         raise NotImplementedError("Subclasses must implement wait_for_elements")
     
+    def reset(self):
+        """
+        Clear state left by the previous fetch, so pooled browsers serve each
+        fetch in isolation.
+        """
+        pass
+    
+    def block_resources(self, config):
+        """
+        Abort subresource requests the site's config excludes (see
+        should_block_request) for the next navigation.
+        
+        Args:
+            config: FetchConfig of the site about to be fetched
+        """
+        pass
+    
+    def process_id(self):
+        """
+        Get the id of the process the browser's processes descend from, so the
+        pool watchdog can measure their memory (see browser_pool).
+        
+        Returns:
+            int or None: Process id, or None if the engine does not expose it
+        """
+        return None
+    
     def close(self):
         """Close the browser instance."""
         raise NotImplementedError("Subclasses must implement close")
@@ -266,6 +329,23 @@ class SeleniumBrowserWrapper(BrowserInterface):
             g_logger.debug(f"Selenium wait for elements timeout: {e}")
             return False
     
+    def block_resources(self, config):
+        """Block excluded resources by URL pattern through the Chrome DevTools Protocol."""
+        self.driver.execute_cdp_cmd("Network.enable", {})
+        self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": get_blocked_url_patterns(config)})
+    
+    def reset(self):
+        """Drop cookies and storage from the previous fetch and unload its page."""
+        self.driver.delete_all_cookies()
+        self.driver.get("about:blank")
+    
+    def process_id(self):
+        """Chromedriver's process, the parent of the Chrome processes."""
+        try:
+            return self.driver.service.process.pid
+        except AttributeError:
+            return None
+    
     def close(self):
         """Close Selenium driver."""
         try:
@@ -284,12 +364,19 @@ class SeleniumBrowserWrapper(BrowserInterface):
 class PlaywrightBrowserWrapper(BrowserInterface):
     """
     Wrapper for Playwright browser that implements the unified BrowserInterface.
+
+    When given the Playwright instance, the wrapper owns the browser process:
+    reset() gives each fetch a new isolated context and close() shuts it all down.
     """
     
-    def __init__(self, browser, context, use_tor, user_agent):
+    # Sync Playwright objects may only be used from the thread that created them
+    thread_bound = True
+    
+    def __init__(self, browser, context, use_tor, user_agent, playwright=None):
         super().__init__(use_tor, user_agent)
         self.browser = browser
         self.context = context
+        self.playwright = playwright
         self.page = None
     
     def get_page_content(self, url):
@@ -326,13 +413,47 @@ class PlaywrightBrowserWrapper(BrowserInterface):
             g_logger.debug(f"Playwright wait for elements timeout: {e}")
             return False
     
+    def block_resources(self, config):
+        """Abort excluded requests in this context by their real resource type."""
+        def handle(route):
+            request = route.request
+            if should_block_request(config, request.resource_type, request.url):
+                route.abort()
+            else:
+                route.continue_()
+        
+        self.context.unroute("**/*")
+        self.context.route("**/*", handle)
+    
+    def reset(self):
+        """Replace the context with a new one, so no state carries over between fetches."""
+        if self.page:
+            self.page.close()
+            self.page = None
+        if self.context:
+            self.context.close()
+        self.context = self.browser.new_context(**get_common_context_options(self.use_tor, self.user_agent))
+    
+    def process_id(self):
+        """The Playwright driver's process, when this wrapper started it; Chromium runs under it."""
+        if not self.playwright:
+            return None
+        try:
+            # Not part of Playwright's public API, so look it up defensively
+            return self.playwright._impl_obj._connection._transport._proc.pid
+        except AttributeError:
+            return None
+    
     def close(self):
-        """Close Playwright page and context."""
+        """Close Playwright page and context, and the browser if this wrapper owns it."""
         try:
             if self.page:
                 self.page.close()
             if self.context:
                 self.context.close()
+            if self.playwright:
+                self.browser.close()
+                self.playwright.stop()
         except Exception as e:
             g_logger.error(f"Error closing Playwright browser: {e}")
     
@@ -1369,7 +1490,7 @@ def safe_find_element(post, selector, use_browser, attr=None, find_func=None, ge
     try:
         if use_browser and find_func and get_attr_func and get_text_func:
             element = find_func(post, selector)
-            if not element:
+            if element is None:  # lxml elements without children are falsy
                 return None
             if attr:
                 return get_attr_func(element, attr)
@@ -1576,17 +1697,7 @@ def _fetch_with_requests(url, config, user_agent):
         request_headers = _prepare_request_headers(config, user_agent)
         response = requests.get(url, timeout=NETWORK_TIMEOUT, headers=request_headers)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        posts = soup.select(config.post_container)
-
-        # Extract post data with consolidated error handling
-        for post in posts:
-            try:
-                entry = extract_post_data(post, config, url, use_browser=False)
-                if entry:
-                    entries.append(entry)
-            except Exception as e:
-                g_logger.error(f"Error extracting post data: {e}")
+        entries = _extract_posts_from_html(response.text, config, url)
 
     except requests.exceptions.RequestException as e:
         g_logger.error(f"Request error for {url}: {e}")
@@ -1597,6 +1708,50 @@ def _fetch_with_requests(url, config, user_agent):
     
     return entries, status
 
+def _extract_posts_from_html(html, config, url):
+    """
+    Extract post entries from page source using the site's selectors.
+
+    Parses with the fastest installed backend (see html_parsing), and again
+    with BeautifulSoup if that finds no posts, in case the fast backend does
+    not support one of the site's selectors.
+
+    Args:
+        html (str): Page source
+        config: Configuration object
+        url (str): Page URL, for resolving relative links
+
+    Returns:
+        list: Post entries
+    """
+    # Import here to avoid circular imports
+    from html_parsing import get_html_parser, get_fallback_parser
+
+    parser = get_html_parser()
+    entries = _extract_posts_with_parser(parser, html, config, url)
+    fallback = get_fallback_parser()
+    if not entries and parser is not fallback:
+        entries = _extract_posts_with_parser(fallback, html, config, url)
+    return entries
+
+def _extract_posts_with_parser(parser, html, config, url):
+    """Parse a page with one html_parsing backend and extract its posts."""
+    entries = []
+    for post in parser.find_elements(parser.parse(html), config.post_container):
+        try:
+            # Parsed elements go through the same extractor functions as browser elements
+            entry = extract_post_data(post, config, url, use_browser=True,
+                                      get_text_func=parser.get_text,
+                                      find_func=parser.find_element,
+                                      get_attr_func=parser.get_attribute)
+            if isinstance(entry, list):
+                entries.extend(entry)
+            elif entry:
+                entries.append(entry)
+        except Exception as e:
+            g_logger.error(f"Error extracting post data: {e}")
+    return entries
+
 def _fetch_with_browser(url, config, user_agent, browser_instance):
     """
     Fetch content using browser automation for JavaScript sites.
@@ -1614,6 +1769,12 @@ def _fetch_with_browser(url, config, user_agent, browser_instance):
     status = 200
     
     try:
+        # Skip images, fonts, trackers, etc. since only the DOM is read
+        try:
+            browser_instance.block_resources(config)
+        except Exception as e:
+            g_logger.warning(f"Could not set up resource blocking for {url}: {e}")
+
         # Navigate to the page
         page_content, nav_status = browser_instance.get_page_content(url)
         if nav_status != 200:
@@ -1701,6 +1862,214 @@ def _extract_post_data_browser(post, config, url, browser_instance):
                            find_func=find_func, 
                            get_attr_func=get_attr_func)
 
+# =============================================================================
+# BROWSER-FREE FAST PATH
+# =============================================================================
+
+# Many sites marked needs_selenium also ship their posts in the initial HTML or
+# in embedded JSON (Next.js __NEXT_DATA__, JSON-LD). Such sites are probed now
+# and then: after a successful browser fetch, the page is also fetched with
+# requests and the posts are compared. The per-domain verdict is kept in g_cs,
+# and while it allows it the site is fetched without a browser.
+
+FAST_PATH_BROWSER = "browser"  # Posts only appear after rendering
+FAST_PATH_HTML = "html"        # The site's selectors match the plain HTML
+FAST_PATH_JSON = "json"        # Posts are in an embedded JSON blob
+
+# Seconds between probes; a fast-path verdict is also re-checked this often
+FAST_PATH_PROBE_INTERVAL = 86400
+
+# Share of the browser's post links the plain fetch must find, and share of the
+# plain fetch's links that must be posts the browser also found
+FAST_PATH_MIN_RECALL = 0.8
+FAST_PATH_MIN_PRECISION = 0.5
+
+# Keys holding a post's title and link in embedded JSON, in order of preference
+EMBEDDED_TITLE_KEYS = ("headline", "title", "name")
+EMBEDDED_LINK_KEYS = ("url", "link", "href", "permalink")
+
+def _fast_path_key(base_domain):
+    return f"fast_path:{base_domain}"
+
+def get_fast_path_verdict(base_domain):
+    """
+    Get the cached fast-path verdict and fetch costs for a domain.
+
+    Args:
+        base_domain (str): Site's base domain
+
+    Returns:
+        dict: mode (FAST_PATH_*), checked (time of the last probe, 0 if never),
+              recall, precision, and per-method 'fetches' and 'seconds' totals
+    """
+    verdict = g_cs.get(_fast_path_key(base_domain))
+    if not verdict:
+        verdict = {
+            'mode': FAST_PATH_BROWSER,
+            'checked': 0,
+            'recall': None,
+            'precision': None,
+            'browser': {'fetches': 0, 'seconds': 0.0},
+            'http': {'fetches': 0, 'seconds': 0.0},
+        }
+    return verdict
+
+def _probe_due(verdict):
+    return time.time() - verdict['checked'] >= FAST_PATH_PROBE_INTERVAL
+
+def _record_fetch_cost(base_domain, verdict, method, seconds):
+    """Add one fetch to a domain's cost totals and store the verdict."""
+    verdict[method]['fetches'] += 1
+    verdict[method]['seconds'] += seconds
+    g_cs.put(_fast_path_key(base_domain), verdict, timeout=EXPIRE_WEEK)
+
+def _iter_embedded_posts(data):
+    """
+    Yield (title, link) pairs from objects nested anywhere in embedded JSON.
+
+    Args:
+        data: Decoded JSON value
+
+    Yields:
+        tuple: (title, link) for each object carrying both
+    """
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, list):
+            stack.extend(reversed(value))
+            continue
+        if not isinstance(value, dict):
+            continue
+        title = next((value[k] for k in EMBEDDED_TITLE_KEYS if isinstance(value.get(k), str)), None)
+        link = next((value[k] for k in EMBEDDED_LINK_KEYS if isinstance(value.get(k), str)), None)
+        if title and link and link.startswith(("http", "/")):
+            yield title.strip(), link
+        stack.extend(reversed([v for v in value.values() if isinstance(v, (dict, list))]))
+
+def _extract_embedded_posts(html, config, url):
+    """
+    Extract post entries from the JSON-LD and __NEXT_DATA__ blobs of a page.
+
+    Applies the same rules as the selector-based extraction: titles need two
+    words and links must contain the site's filter_pattern.
+
+    Args:
+        html (str): Page source
+        config: Configuration object
+        url (str): Page URL, for resolving relative links
+
+    Returns:
+        list: Post entries in document order, without duplicate links
+    """
+    # Import here to avoid circular imports
+    from html_parsing import get_html_parser
+
+    parser = get_html_parser()
+    entries = []
+    seen = set()
+    for script in parser.find_elements(parser.parse(html), 'script[type="application/ld+json"], script#__NEXT_DATA__'):
+        try:
+            data = json.loads(parser.get_text(script))
+        except ValueError:
+            continue
+        for title, link in _iter_embedded_posts(data):
+            link = urljoin(url, link)
+            if len(title.split()) < 2 or link in seen:
+                continue
+            if config.filter_pattern and config.filter_pattern not in link:
+                continue
+            seen.add(link)
+            entries.append(create_post_entry(title, link, title))
+    return entries
+
+def _compare_links(browser_entries, http_entries):
+    """
+    Compare the post links found with and without a browser.
+
+    Returns:
+        tuple: (recall, precision) of the plain fetch against the browser's posts
+    """
+    browser_links = {entry['link'] for entry in browser_entries}
+    http_links = {entry['link'] for entry in http_entries}
+    if not browser_links or not http_links:
+        return 0.0, 0.0
+    common = len(browser_links & http_links)
+    return common / len(browser_links), common / len(http_links)
+
+def _get_page_html(url, config, user_agent):
+    """Fetch a page with requests, raising RequestException on failure."""
+    response = requests.get(url, timeout=NETWORK_TIMEOUT, headers=_prepare_request_headers(config, user_agent))
+    response.raise_for_status()
+    return response.text
+
+def _extract_fast_path_posts(html, config, url, mode):
+    if mode == FAST_PATH_JSON:
+        return _extract_embedded_posts(html, config, url)
+    return _extract_posts_from_html(html, config, url)
+
+def _fetch_without_browser(url, config, user_agent, mode):
+    """
+    Fetch a needs_selenium site with requests, using a fast-path mode.
+
+    Args:
+        url (str): URL to fetch
+        config: Configuration object
+        user_agent (str): User agent string
+        mode (str): FAST_PATH_HTML or FAST_PATH_JSON
+
+    Returns:
+        tuple: (entries, status) where entries is list of post entries and status is HTTP status
+    """
+    try:
+        html = _get_page_html(url, config, user_agent)
+    except requests.exceptions.RequestException as e:
+        g_logger.error(f"Request error for {url}: {e}")
+        return [], 500
+    return _extract_fast_path_posts(html, config, url, mode), 200
+
+def _probe_fast_path(url, config, user_agent, base_domain, verdict, browser_entries):
+    """
+    Fetch a page without a browser and store whether that finds the same posts.
+
+    The site's selectors are tried on the plain HTML first, then the embedded
+    JSON. The first that finds enough of the browser's posts, without too many
+    others, becomes the domain's verdict; otherwise it stays on the browser.
+
+    Args:
+        url (str): URL just fetched with a browser
+        config: Configuration object
+        user_agent (str): User agent the browser used
+        base_domain (str): Site's base domain
+        verdict (dict): Domain's current verdict, from get_fast_path_verdict()
+        browser_entries (list): Posts the browser found
+
+    Returns:
+        str: The new mode (FAST_PATH_*)
+    """
+    best = (FAST_PATH_BROWSER, 0.0, 0.0)
+    try:
+        html = _get_page_html(url, config, user_agent)
+    except requests.exceptions.RequestException as e:
+        # Blocked or failing without a browser: keep the browser until the next probe
+        g_logger.info(f"Fast-path probe of {url} failed: {e}")
+        html = None
+
+    if html is not None:
+        for mode in (FAST_PATH_HTML, FAST_PATH_JSON):
+            recall, precision = _compare_links(browser_entries, _extract_fast_path_posts(html, config, url, mode))
+            if recall >= FAST_PATH_MIN_RECALL and precision >= FAST_PATH_MIN_PRECISION:
+                best = (mode, recall, precision)
+                break
+            if recall > best[1]:
+                best = (FAST_PATH_BROWSER, recall, precision)
+
+    verdict['mode'], verdict['recall'], verdict['precision'] = best
+    verdict['checked'] = time.time()
+    g_cs.put(_fast_path_key(base_domain), verdict, timeout=EXPIRE_WEEK)
+    g_logger.info(f"Fast-path probe for {base_domain}: {best[0]} (recall {best[1]:.2f}, precision {best[2]:.2f})")
+    return best[0]
+
 # =============================================================================
 # BROWSER ENGINE SELECTION
 # =============================================================================
@@ -1744,9 +2113,21 @@ def _get_browser_module():
                 g_logger.error(f"Both Selenium and Playwright are unavailable. Selenium error: {e}, Playwright error: {e2}")
                 raise ImportError("Neither Selenium nor Playwright browser modules are available")
 
-def _get_browser_instance(use_tor, user_agent):
+def _get_async_engine():
+    """
+    Get the process-wide async Playwright engine.
+
+    Returns:
+        AsyncBrowserEngine: Engine rendering pages concurrently in one browser
+    """
+    # Import here to avoid circular imports
+    from async_browser import async_engine
+    return async_engine
+
+def _create_pooled_browser(use_tor, user_agent):
     """
-    Get a browser instance using the configured browser engine with fallback support.
+    Start a browser for the pool using the configured engine, falling back to
+    Selenium if Playwright fails.
     
     Args:
         use_tor (bool): Whether to use Tor proxy
@@ -1757,51 +2138,18 @@ def _get_browser_instance(use_tor, user_agent):
     """
     browser_module = _get_browser_module()
     
-    if USE_PLAYWRIGHT:
+    if USE_PLAYWRIGHT and browser_module.__name__ == "playwrightfetch":
         try:
-            browser, context = browser_module.SharedPlaywrightBrowser.get_browser_context(use_tor, user_agent)
-            if browser and context:
-                return PlaywrightBrowserWrapper(browser, context, use_tor, user_agent)
-            else:
-                g_logger.warning("Playwright browser/context creation returned None, falling back to Selenium")
-                return _fallback_to_selenium(use_tor, user_agent)
-        except (AttributeError, Exception) as e:
+            return browser_module.create_pooled_browser(use_tor, user_agent)
+        except Exception as e:
             g_logger.warning(f"Playwright failed ({e}), falling back to Selenium")
-            return _fallback_to_selenium(use_tor, user_agent)
-    else:
-        try:
-            driver = browser_module.SharedSeleniumDriver.get_driver(use_tor, user_agent)
-            if driver:
-                return SeleniumBrowserWrapper(driver, use_tor, user_agent)
-        except AttributeError:
-            g_logger.error("Selenium SharedSeleniumDriver not available")
+            import seleniumfetch
+            return seleniumfetch.create_pooled_browser(use_tor, user_agent)
     
-    return None
+    return browser_module.create_pooled_browser(use_tor, user_agent)
 
-def _fallback_to_selenium(use_tor, user_agent):
-    """
-    Fallback to Selenium when Playwright fails.
-    
-    Args:
-        use_tor (bool): Whether to use Tor proxy
-        user_agent (str): User agent string for the browser
-        
-    Returns:
-        BrowserInterface: Selenium browser instance or None if fallback fails
-    """
-    try:
-        import seleniumfetch
-        g_logger.info("Attempting fallback to Selenium")
-        driver = seleniumfetch.SharedSeleniumDriver.get_driver(use_tor, user_agent)
-        if driver:
-            g_logger.info("Successfully fell back to Selenium")
-            return SeleniumBrowserWrapper(driver, use_tor, user_agent)
-        else:
-            g_logger.error("Selenium fallback failed - driver creation returned None")
-            return None
-    except Exception as e:
-        g_logger.error(f"Selenium fallback failed: {e}")
-        return None
+# Long-lived browsers shared by all fetch threads of this process
+browser_pool = BrowserPool(_create_pooled_browser)
 
 # =============================================================================
 # UNIFIED API FUNCTIONS
@@ -1812,7 +2160,13 @@ def fetch_site_posts(url, user_agent):
     Fetch posts from a website using the configured browser engine.
     
     This function automatically uses either Selenium or Playwright based on
-    the USE_PLAYWRIGHT global variable in shared.py.
+    the USE_PLAYWRIGHT global variable in shared.py. Browser fetches run on a
+    browser checked out from browser_pool, so concurrent fetches use separate
+    browsers and none pays browser startup once the pool is warm. With
+    USE_ASYNC_PLAYWRIGHT, pages are instead rendered concurrently in the one
+    browser of async_browser.async_engine. Sites whose
+    fast-path probe found the same posts without JavaScript are fetched with
+    requests instead (see BROWSER-FREE FAST PATH).
     
     Args:
         url (str): URL of the site to fetch posts from
@@ -1840,47 +2194,50 @@ def fetch_site_posts(url, user_agent):
             # Use random user agent to avoid detection (reuse existing REDDIT_USER_AGENT)
             user_agent = g_cs.get("REDDIT_USER_AGENT")
 
-        # Acquire the fetch lock before starting the fetch operation
-        lock_acquired = False
-        try:
-            lock_acquired = acquire_fetch_lock()
-            if not lock_acquired:
-                g_logger.warning(f"Failed to acquire fetch lock for {url}, skipping...")
-                return build_feed_result([], url, status=503)
-
-            browser_instance = _get_browser_instance(config.needs_tor, user_agent)
+        # Sites probed as serving their posts without JavaScript skip the browser.
+        # Tor sites are never probed, since a plain fetch would bypass the proxy.
+        use_fast_path = ENABLE_BROWSER_FAST_PATH and not config.needs_tor
+        verdict = get_fast_path_verdict(base_domain) if use_fast_path else None
+        if verdict and verdict['mode'] != FAST_PATH_BROWSER and not _probe_due(verdict):
+            start = time.monotonic()
+            entries, status = _fetch_without_browser(url, config, user_agent, verdict['mode'])
+            if entries:
+                _record_fetch_cost(base_domain, verdict, 'http', time.monotonic() - start)
+                g_logger.info(f"Fetched {len(entries)} entries from {url} without a browser")
+                return build_feed_result(entries, url, status)
+            # The site changed or blocks plain fetches: use the browser until it is probed
+            # again, stored now in case the browser fetch fails too
+            g_logger.info(f"Fast path for {base_domain} found no posts, falling back to the browser")
+            verdict['mode'], verdict['checked'] = FAST_PATH_BROWSER, 0
+            g_cs.put(_fast_path_key(base_domain), verdict, timeout=EXPIRE_WEEK)
+
+        start = time.monotonic()
+        if USE_PLAYWRIGHT and USE_ASYNC_PLAYWRIGHT:
+            # Render in the shared async browser, alongside other workers' pages
+            entries, status = _get_async_engine().fetch(url, config, user_agent)
+        else:
+            # Check out a warm browser; it is recycled by the pool, not after every fetch
+            browser_instance = browser_pool.checkout(config.needs_tor, user_agent, timeout=BROWSER_CHECKOUT_TIMEOUT)
             if not browser_instance:
                 g_logger.error(f"Failed to get browser instance for {url}")
                 return build_feed_result([], url, status=503)
-                
-            entries, status = _fetch_with_browser(url, config, user_agent, browser_instance)
-            
-            # Force cleanup after browser fetch to prevent zombie processes
-            if config.needs_selenium:
-                g_logger.info(f"Browser fetch completed for {url}, forcing Selenium cleanup")
-                try:
-                    import seleniumfetch
-                    seleniumfetch.SharedSeleniumDriver.force_cleanup_after_request()
-                    g_logger.info(f"Selenium cleanup completed for {url}")
-                except Exception as cleanup_error:
-                    g_logger.error(f"Error during Selenium cleanup for {url}: {cleanup_error}")
-                
-        except Exception as e:
-            g_logger.error(f"Error during browser fetch for {url}: {e}")
-            # Force cleanup on error as well
-            if config.needs_selenium:
-                g_logger.info(f"Browser fetch error for {url}, forcing Selenium cleanup")
-                try:
-                    import seleniumfetch
-                    seleniumfetch.SharedSeleniumDriver.force_cleanup_after_request()
-                    g_logger.info(f"Selenium cleanup after error completed for {url}")
-                except Exception as cleanup_error:
-                    g_logger.error(f"Error during Selenium cleanup after error for {url}: {cleanup_error}")
-            raise
-        finally:
-            # Always release the fetch lock, even if an error occurs
-            if lock_acquired:
-                release_fetch_lock()
+
+            failed = True
+            try:
+                # Runs on the browser's owner thread when the engine is thread-bound
+                entries, status = browser_pool.run(browser_instance, _fetch_with_browser,
+                                                   url, config, user_agent, browser_instance)
+                failed = status == 500
+            except Exception as e:
+                g_logger.error(f"Error during browser fetch for {url}: {e}")
+                raise
+            finally:
+                browser_pool.checkin(browser_instance, failed=failed)
+
+        if verdict and status == 200 and entries:
+            _record_fetch_cost(base_domain, verdict, 'browser', time.monotonic() - start)
+            if _probe_due(verdict):
+                _probe_fast_path(url, config, user_agent, base_domain, verdict, entries)
     else:
         # Use requests for non-JavaScript sites
         entries, status = _fetch_with_requests(url, config, user_agent)
@@ -1892,9 +2249,12 @@ def cleanup_browsers():
     """
     Clean up all browser instances using the configured browser engine.
     
-    This function automatically calls the appropriate cleanup function
-    based on the USE_PLAYWRIGHT global variable in shared.py.
+    This function closes the pooled browsers, then calls the appropriate
+    cleanup function based on the USE_PLAYWRIGHT global variable in shared.py.
     """
+    browser_pool.close_all()
+    if USE_PLAYWRIGHT and USE_ASYNC_PLAYWRIGHT:
+        _get_async_engine().close()
     try:
         browser_module = _get_browser_module()
         
@@ -1945,45 +2305,6 @@ def get_shared_driver(use_tor, user_agent):
             g_logger.error("Selenium SharedSeleniumDriver not available")
             return None
 
-def acquire_fetch_lock():
-    """
-    Acquire the fetch lock using the configured browser engine.
-    
-    Returns:
-        bool: True if lock was acquired successfully
-    """
-    browser_module = _get_browser_module()
-    
-    if USE_PLAYWRIGHT:
-        try:
-            return browser_module.SharedPlaywrightBrowser.acquire_fetch_lock()
-        except AttributeError:
-            g_logger.error("Playwright fetch lock not available")
-            return False
-    else:
-        try:
-            return browser_module.SharedSeleniumDriver.acquire_fetch_lock()
-        except AttributeError:
-            g_logger.error("Selenium fetch lock not available")
-            return False
-
-def release_fetch_lock():
-    """
-    Release the fetch lock using the configured browser engine.
-    """
-    browser_module = _get_browser_module()
-    
-    if USE_PLAYWRIGHT:
-        try:
-            browser_module.SharedPlaywrightBrowser.release_fetch_lock()
-        except AttributeError:
-            g_logger.warning("Playwright fetch lock release not available")
-    else:
-        try:
-            browser_module.SharedSeleniumDriver.release_fetch_lock()
-        except AttributeError:
-            g_logger.warning("Selenium fetch lock release not available")
-
 # =============================================================================
 # GLOBAL CLEANUP REGISTRATION
 # =============================================================================
@@ -2007,8 +2328,6 @@ __all__ = [
     'fetch_site_posts',
     'cleanup_browsers', 
     'get_shared_driver',
-    'acquire_fetch_lock',
-    'release_fetch_lock',
     # Shared utility functions
     'extract_base_domain',
     'get_site_config',
@@ -2031,6 +2350,11 @@ __all__ = [
     'get_proxy_config',
     'get_common_context_options',
     'get_common_chrome_options',
+    # Resource blocking
+    'should_block_request',
+    'get_blocked_url_patterns',
+    # Browser-free fast path
+    'get_fast_path_verdict',
     # Unified element extraction
     'ElementExtractor',
     'SeleniumElementExtractor',
@@ -2046,7 +2370,9 @@ __all__ = [
     'BrowserUtils',
     # Shared constants
     'NETWORK_TIMEOUT',
-    'FETCH_LOCK_TIMEOUT',
     'BROWSER_TIMEOUT',
-    'BROWSER_WAIT_TIMEOUT'
+    'BROWSER_WAIT_TIMEOUT',
+    'BROWSER_CHECKOUT_TIMEOUT',
+    # Browser pool
+    'browser_pool'
 ]
@@ -0,0 +1,455 @@
+"""
+browser_pool.py
+
+Pool of long-lived browser instances for JavaScript-rendered sites.
+
+Starting Chrome costs far more than loading a page, so browsers are kept between
+fetches instead of being started and shut down for each one. A fetch checks out
+an idle browser with the right configuration (Tor, user agent), gets a fresh
+isolated context or cleared session, and checks it back in. Browsers are
+recycled after an error, and idle ones are health checked before reuse.
+
+Engines whose objects may only be used from the thread that created them
+(sync Playwright) get a long-lived owner thread per browser: the browser is
+started there and every call on it runs there (see BrowserPool.run), so any
+fetch thread can use any pooled browser and browsers outlive the threads of a
+refresh cycle.
+
+A watchdog thread recycles browsers that cross the configured limits on memory
+(RSS of the browser's process tree), pages served or age, and reaps zombie
+chrome/chromedriver processes.
+Browsers stay warm until they cross a limit, which keeps memory bounded on
+small servers without restarting Chrome for every fetch.
+
+The pool is engine-agnostic: it only needs a factory that returns objects with
+the BrowserInterface methods reset(), is_valid() and close() (see browser_fetch).
+"""
+
+# =============================================================================
+# STANDARD LIBRARY IMPORTS
+# =============================================================================
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# =============================================================================
+# THIRD-PARTY IMPORTS
+# =============================================================================
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# =============================================================================
+# LOCAL IMPORTS
+# =============================================================================
+from shared import g_logger
+from app_config import get_browser_limits
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+# Browser processes kept per web process; each serves one fetch at a time
+BROWSER_POOL_SIZE = 2
+
+# Recycle a browser past these limits, to bound leaks in Chrome (config.yaml: browser)
+_limits = get_browser_limits()
+MAX_BROWSER_RSS_MB = _limits['max_rss_mb']
+MAX_PAGES_PER_BROWSER = _limits['max_pages']
+MAX_BROWSER_AGE = _limits['max_age_seconds']
+
+# Seconds between watchdog checks of the pooled browsers
+WATCHDOG_INTERVAL = 60
+
+# Names of the processes a browser is made of, for zombie reaping
+BROWSER_PROCESS_NAMES = ("chrome", "chromium", "chromedriver", "headless_shell")
+
+# Check that an idle browser still responds before handing it out
+HEALTH_CHECK_AFTER_IDLE = 60
+
+# =============================================================================
+# BROWSER PROCESSES
+# =============================================================================
+
+def process_tree_rss_mb(pid):
+    """
+    Measure the resident memory of a browser's process tree.
+
+    Args:
+        pid (int): Root process id of the browser (see BrowserInterface.process_id)
+
+    Returns:
+        float or None: RSS in MB, or None if psutil or the process id is unavailable
+    """
+    if psutil is None or not pid:
+        return None
+    try:
+        root = psutil.Process(pid)
+        processes = [root] + root.children(recursive=True)
+    except psutil.Error:
+        return None
+    rss = 0
+    for process in processes:
+        try:
+            rss += process.memory_info().rss
+        except psutil.Error:
+            continue  # Exited while being measured
+    return rss / (1024 * 1024)
+
+
+def kill_process_tree(pid):
+    """
+    Terminate a browser's process tree, for browsers that cannot be closed normally.
+
+    Args:
+        pid (int): Root process id
+
+    Returns:
+        bool: Whether the processes were signalled
+    """
+    if psutil is None or not pid:
+        return False
+    try:
+        root = psutil.Process(pid)
+        processes = root.children(recursive=True) + [root]
+    except psutil.Error:
+        return False
+    for process in processes:
+        try:
+            process.terminate()
+        except psutil.Error:
+            pass
+    _, alive = psutil.wait_procs(processes, timeout=5)
+    for process in alive:
+        try:
+            process.kill()
+        except psutil.Error:
+            pass
+    return True
+
+
+def reap_zombie_browsers():
+    """
+    Reap exited chrome/chromedriver children of this process that nobody waited for.
+
+    Returns:
+        int: Number of zombies reaped
+    """
+    if psutil is None:
+        return 0
+    reaped = 0
+    for child in psutil.Process().children():
+        try:
+            if child.status() == psutil.STATUS_ZOMBIE and child.name().startswith(BROWSER_PROCESS_NAMES):
+                os.waitpid(child.pid, os.WNOHANG)
+                reaped += 1
+        except (psutil.Error, ChildProcessError):
+            continue
+    if reaped:
+        g_logger.info(f"Reaped {reaped} zombie browser processes")
+    return reaped
+
+# =============================================================================
+# POOL
+# =============================================================================
+
+class PooledBrowser:
+    """A browser owned by the pool, with the state used to decide when to recycle it."""
+
+    def __init__(self, browser, key, owner=None):
+        self.browser = browser
+        self.key = key
+        self.owner = owner  # Single-thread executor of a thread-bound browser, or None
+        self.created = time.monotonic()
+        self.last_used = self.created
+        self.pages = 0
+        self.busy = False
+        self.retire_reason = None  # Set for a busy browser, which is closed on checkin
+
+    def call(self, fn, *args):
+        """Run fn(*args) on the browser's owner thread, or on this thread if it has none."""
+        if self.owner is None:
+            return fn(*args)
+        return self.owner.submit(fn, *args).result()
+
+    def recycle_reason(self):
+        """Why this browser must be recycled, or None while it is within its limits."""
+        if self.retire_reason:
+            return self.retire_reason
+        if self.pages >= MAX_PAGES_PER_BROWSER:
+            return f"served {self.pages} pages"
+        age = time.monotonic() - self.created
+        if age > MAX_BROWSER_AGE:
+            return f"is {age:.0f}s old"
+        return None
+
+
+class BrowserPool:
+    """
+    Fixed-size pool of browsers, each checked out by one fetch at a time.
+
+    When every browser is busy, checkout waits for one to be checked in. When
+    all slots are taken by idle browsers with another configuration, the least
+    recently used one is closed to make room. A watchdog thread, started with
+    the first browser, recycles browsers past their limits (see check_limits).
+    """
+
+    def __init__(self, factory, size=BROWSER_POOL_SIZE, watchdog_interval=WATCHDOG_INTERVAL):
+        """
+        Args:
+            factory (callable): factory(use_tor, user_agent) returning a new browser
+            size (int): Maximum number of browsers
+            watchdog_interval (float): Seconds between watchdog checks, or None for no watchdog
+        """
+        self._factory = factory
+        self._size = size
+        self._entries = []
+        self._starting = 0  # Slots reserved for browsers being started outside the lock
+        self._changed = threading.Condition()
+        self._watchdog_interval = watchdog_interval
+        self._watchdog = None
+        self.started = 0
+        self.recycled = 0
+
+    def checkout(self, use_tor, user_agent, timeout=60):
+        """
+        Check out a browser for one fetch.
+
+        Args:
+            use_tor (bool): Whether the browser must use the Tor proxy
+            user_agent (str): User agent the browser must send
+            timeout (float): Seconds to wait for a free browser
+
+        Returns:
+            Browser instance, or None if none became free in time or starting one failed
+        """
+        key = (use_tor, user_agent)
+        deadline = time.monotonic() + timeout
+        while True:
+            evicted = []
+            with self._changed:
+                entry = self._take_idle(key)
+                if entry is None:
+                    if len(self._entries) + self._starting >= self._size:
+                        evicted = self._evict_idle()
+                    if len(self._entries) + self._starting - len(evicted) < self._size:
+                        self._entries = [e for e in self._entries if e not in evicted]
+                        self._starting += 1
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            g_logger.warning(f"No browser became free within {timeout}s")
+                            return None
+                        self._changed.wait(remaining)
+                        continue
+
+            for old in evicted:
+                self._close(old, "make room for another configuration")
+            if entry is not None:
+                if self._healthy(entry):
+                    return entry.browser
+                self._discard(entry, "failed its health check")
+                continue
+            return self._start(key)
+
+    def run(self, browser, fn, *args):
+        """
+        Run fn(*args) for a fetch on a checked-out browser.
+
+        Thread-bound browsers run it on their owner thread, so fn may use the
+        browser and any object it returns; others run it on the calling thread.
+
+        Args:
+            browser: Browser returned by checkout()
+            fn (callable): Function using the browser
+            *args: Arguments for fn
+
+        Returns:
+            Whatever fn returns; exceptions from fn are raised to the caller
+        """
+        with self._changed:
+            entry = next((e for e in self._entries if e.browser is browser), None)
+        if entry is None:
+            return fn(*args)
+        return entry.call(fn, *args)
+
+    def checkin(self, browser, failed=False):
+        """
+        Return a browser after a fetch, recycling it if needed.
+
+        Args:
+            browser: Browser returned by checkout()
+            failed (bool): Whether the fetch failed in a way that may have broken the browser
+        """
+        with self._changed:
+            entry = next((e for e in self._entries if e.browser is browser), None)
+            if entry is None:
+                return
+            entry.pages += 1
+            entry.last_used = time.monotonic()
+            reason = "failed" if failed else entry.recycle_reason()
+            if reason:
+                self._entries.remove(entry)
+            else:
+                entry.busy = False
+            self._changed.notify()
+
+        if reason:
+            self._close(entry, reason)
+
+    def check_limits(self):
+        """
+        Recycle browsers past the memory, page or age limits, then reap zombies.
+
+        Idle browsers are closed now, on their owner thread if they have one;
+        busy ones are marked and closed when their fetch checks them in.
+        """
+        with self._changed:
+            entries = list(self._entries)
+        for entry in entries:
+            rss = process_tree_rss_mb(self._process_id(entry))
+            if rss is not None and rss > MAX_BROWSER_RSS_MB:
+                reason = f"uses {rss:.0f} MB"
+            else:
+                reason = entry.recycle_reason()
+            if reason:
+                self._retire(entry, reason)
+        reap_zombie_browsers()
+
+    def close_all(self):
+        """Close every idle browser and forget the busy ones, which close on checkin."""
+        with self._changed:
+            idle = [e for e in self._entries if not e.busy]
+            self._entries = [e for e in self._entries if e.busy]
+            for entry in self._entries:
+                entry.retire_reason = "pool shutdown"
+        for entry in idle:
+            self._close(entry, "pool shutdown")
+
+    def stats(self):
+        """
+        Describe the pool, for logging.
+
+        Returns:
+            dict: Browsers alive and busy, and how many were started and recycled
+        """
+        with self._changed:
+            return {'browsers': len(self._entries), 'busy': sum(e.busy for e in self._entries),
+                    'started': self.started, 'recycled': self.recycled}
+
+    # --- internals ---
+
+    def _take_idle(self, key):
+        """Mark and return the most recently used idle browser for key (warmest first)."""
+        candidates = [e for e in self._entries
+                      if not e.busy and not e.retire_reason and e.key == key]
+        if not candidates:
+            return None
+        entry = max(candidates, key=lambda e: e.last_used)
+        entry.busy = True
+        return entry
+
+    def _evict_idle(self):
+        """Pick the least recently used idle browser, if any."""
+        idle = [e for e in self._entries if not e.busy]
+        if not idle:
+            return []
+        return [min(idle, key=lambda e: e.last_used)]
+
+    def _healthy(self, entry):
+        """Reset a checked-out browser for a new fetch, checking it still responds."""
+        try:
+            if time.monotonic() - entry.last_used > HEALTH_CHECK_AFTER_IDLE and not entry.call(entry.browser.is_valid):
+                return False
+            entry.call(entry.browser.reset)
+            return True
+        except Exception as e:
+            g_logger.warning(f"Error resetting pooled browser: {e}")
+            return False
+
+    def _start(self, key):
+        """
+        Start a browser in a reserved slot, on a new owner thread.
+
+        The factory runs on the owner thread, since which engine it starts (and
+        so whether the browser is thread-bound) is only known afterwards. The
+        thread is kept for thread-bound browsers and let go for the others.
+        """
+        browser = None
+        owner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pooled-browser")
+        try:
+            browser = owner.submit(self._factory, *key).result()
+        except Exception as e:
+            g_logger.error(f"Error starting pooled browser: {e}")
+        if browser is None or not getattr(browser, 'thread_bound', False):
+            owner.shutdown(wait=False)
+            owner = None
+        with self._changed:
+            self._starting -= 1
+            if browser is not None:
+                entry = PooledBrowser(browser, key, owner)
+                entry.busy = True
+                self._entries.append(entry)
+                self.started += 1
+            self._changed.notify()
+        if browser is not None:
+            g_logger.info(f"Started pooled browser with Tor: {key[0]} ({self.started} started so far)")
+            self._start_watchdog()
+        return browser
+
+    def _start_watchdog(self):
+        with self._changed:
+            if self._watchdog is not None or self._watchdog_interval is None:
+                return
+            self._watchdog = threading.Thread(target=self._watch, name="browser-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self._watchdog_interval)
+            try:
+                self.check_limits()
+            except Exception as e:
+                g_logger.error(f"Error in browser watchdog: {e}")
+
+    def _retire(self, entry, reason):
+        """Recycle a browser the watchdog found past a limit, from the watchdog thread."""
+        with self._changed:
+            if entry not in self._entries:
+                return
+            if entry.busy:
+                entry.retire_reason = reason
+                return
+            self._entries.remove(entry)
+            self._changed.notify()
+        self._close(entry, reason)
+
+    def _process_id(self, entry):
+        """Root process id of a pooled browser, or None if the engine does not expose it."""
+        # Called directly: it only reads attributes, and the owner may be busy with a fetch
+        try:
+            return entry.browser.process_id()
+        except Exception:
+            return None
+
+    def _discard(self, entry, reason):
+        with self._changed:
+            if entry in self._entries:
+                self._entries.remove(entry)
+            self._changed.notify()
+        self._close(entry, reason)
+
+    def _close(self, entry, reason):
+        self.recycled += 1
+        g_logger.info(f"Recycling pooled browser after {entry.pages} pages: {reason}")
+        try:
+            entry.call(entry.browser.close)
+        except Exception as e:
+            g_logger.error(f"Error closing pooled browser: {e}")
+            # A browser that cannot be closed normally still must not leak its processes
+            kill_process_tree(self._process_id(entry))
+        finally:
+            if entry.owner is not None:
+                entry.owner.shutdown(wait=False)
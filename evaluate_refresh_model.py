@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Offline evaluator for feed refresh scheduling policies.
+
+Replays a feed history file and compares the legacy FeedHistory interval logic with
+the publish-rate model in publish_rate_model.py, reporting how many fetches each
+policy makes and how stale articles are when they are first fetched.
+
+Usage:
+    python evaluate_refresh_model.py [feed_history_file.json] [--train-fraction F]
+
+    Publish events come from the `published` timestamps in the feed history's
+    fetch event log (feed_history-<mode>.events), which compaction never
+    truncates. The history is opened read-only, so the evaluator can run against
+    the files of a live site.
+
+    The recorded period is split in time: both policies learn from the first
+    --train-fraction of it and are scored on the rest, so the results are out of
+    sample.
+
+    Staleness is the mean delay between an article's publish time and the first
+    fetch at or after it. The model is evaluated at several fractions of the
+    legacy fetch count so savings can be read against staleness.
+"""
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+import publish_rate_model
+from FeedHistory import FeedConfig, FeedHistory
+
+BUDGET_FRACTIONS = [0.25, 0.5, 0.75, 1.0]
+TRAIN_FRACTION = 0.5
+
+
+def load_records(history):
+    """
+    Read the recorded fetches in time order.
+
+    Args:
+        history (FeedHistory): Read-only feed history
+
+    Returns:
+        list: (url, fetch time, new articles, publish timestamps) tuples
+    """
+    records = []
+    for record in history.read_events():
+        try:
+            fetch_time = datetime.fromisoformat(record["time"])
+        except (TypeError, ValueError):
+            continue
+        records.append((record["url"], fetch_time, record.get("new", 0), record.get("published") or []))
+    records.sort(key=lambda record: record[1])
+    return records
+
+
+def split_records(records, train_fraction):
+    """
+    Split fetches into an earlier training window and a later evaluation window.
+
+    Returns:
+        tuple: (training records, evaluation records, evaluation start, evaluation end)
+    """
+    first, last = records[0][1].timestamp(), records[-1][1].timestamp()
+    split = first + (last - first) * train_fraction
+    train = [record for record in records if record[1].timestamp() < split]
+    test = [record for record in records if record[1].timestamp() >= split]
+    return train, test, split, last
+
+
+def train_history(records):
+    """Replay training fetches into an in-memory FeedHistory, which also fits the rate model."""
+    history = FeedHistory(None)
+    for url, fetch_time, new, published in records:
+        history._apply_fetch(url, fetch_time, new, published)
+    return history
+
+
+def evaluation_events(records, start, end):
+    """
+    Collect the publish times inside the evaluation window, per feed.
+
+    Returns:
+        dict: url -> sorted np.ndarray of timestamps
+    """
+    events = {}
+    for url, _, _, published in records:
+        events.setdefault(url, set()).update(ts for ts in published if start <= ts <= end)
+    return {url: np.array(sorted(stamps)) for url, stamps in events.items()}
+
+
+def staleness(fetches, stamps, end):
+    """Sum of delays between each publish time and the first fetch at or after it."""
+    if len(stamps) == 0:
+        return 0.0
+    fetches = np.append(np.asarray(fetches), end)
+    return float((fetches[np.searchsorted(fetches, stamps)] - stamps).sum())
+
+
+def simulate_legacy(events, start, end, history):
+    """
+    Replay the legacy bucket/success-rate interval logic.
+
+    Args:
+        history (FeedHistory): In-memory history trained on the earlier window, updated in place
+
+    Returns:
+        dict: url -> np.ndarray of fetch timestamps
+    """
+    fetches = {}
+    for url, stamps in events.items():
+        t, last, times = start, start, []
+        while t < end:
+            new = int(np.searchsorted(stamps, t, side="right") - np.searchsorted(stamps, last, side="right"))
+            fetch_time = datetime.fromtimestamp(t, FeedConfig.TZ)
+            history._apply_fetch(url, fetch_time, new)
+            times.append(t)
+            interval = min(history.get_interval(url, now=fetch_time), FeedConfig.MAX_INTERVAL)
+            last, t = t, t + interval.total_seconds()
+        fetches[url] = np.array(times)
+    return fetches
+
+
+def simulate_model(urls, rates, start, end, fetches_per_day):
+    """
+    Replay the publish-rate model for all feeds at once.
+
+    Returns:
+        dict: url -> np.ndarray of fetch timestamps
+    """
+    threshold = publish_rate_model.budget_threshold(rates, fetches_per_day)
+    last = np.full(len(urls), start)
+    times = [last.copy()]
+    while (last < end).any():
+        due = publish_rate_model.next_due(rates, last, threshold, FeedConfig.MIN_INTERVAL.total_seconds(),
+                                          FeedConfig.MAX_INTERVAL.total_seconds(), FeedConfig.TZ)
+        last = np.where(last < end, due, last)
+        times.append(last.copy())
+    stacked = np.array(times)
+    return {url: np.unique(stacked[:, i][stacked[:, i] < end]) for i, url in enumerate(urls)}
+
+
+def report(name, fetches, events, days, end):
+    """Print one policy's totals and return its fetch count."""
+    total_fetches = sum(len(f) for f in fetches.values())
+    total_events = sum(len(s) for s in events.values())
+    delay = sum(staleness(fetches[url], events[url], end) for url in events)
+    mean_delay = delay / total_events / 60 if total_events else 0.0
+    per_fetch = total_events / total_fetches if total_fetches else 0.0
+    print(f"{name:28} {total_fetches:8d} {total_fetches / days:10.1f} {per_fetch:12.2f} {mean_delay:14.1f}")
+    return total_fetches, mean_delay
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Compare feed refresh policies on recorded history.")
+    parser.add_argument("history_file", nargs="?", default="feed_history-robot.json")
+    parser.add_argument("--train-fraction", type=float, default=TRAIN_FRACTION,
+                        help="Share of the recorded period used for training; the rest is evaluated")
+    args = parser.parse_args()
+
+    path = Path(args.history_file)
+    if not path.with_suffix(".events").exists():
+        print(f"Error: No fetch event log next to {path}", file=sys.stderr)
+        sys.exit(1)
+
+    history = FeedHistory(path, read_only=True)
+    records = load_records(history)
+    if not any(published for *_, published in records):
+        print(f"No recorded publish times in {history.events_file}; nothing to evaluate. "
+              "Publish times are recorded as the site fetches feeds.")
+        sys.exit(1)
+
+    train, test, start, end = split_records(records, args.train_fraction)
+    trained = train_history(train)
+    events = {url: stamps for url, stamps in evaluation_events(test, start, end).items() if url in trained.data}
+    if not events or end <= start:
+        print("Not enough recorded history to train on one window and evaluate on a later one.")
+        sys.exit(1)
+
+    urls = list(events)
+    # Fit before the legacy replay continues updating the trained history
+    rates = publish_rate_model.rate_matrix([trained.data[url] for url in urls])
+    train_days = (start - records[0][1].timestamp()) / 86400
+    days = (end - start) / 86400
+
+    print(f"Feeds: {len(urls)}  Trained on: {train_days:.1f} days  Evaluated on: {days:.1f} later days  "
+          f"Articles: {sum(len(s) for s in events.values())}")
+    print(f"{'Policy':28} {'Fetches':>8} {'Per day':>10} {'Arts/fetch':>12} {'Stale (min)':>14}")
+    print("-" * 76)
+
+    legacy_fetches, legacy_delay = report("legacy", simulate_legacy(events, start, end, trained), events, days, end)
+    for fraction in BUDGET_FRACTIONS:
+        budget = legacy_fetches / days * fraction
+        fetches, delay = report(f"model @ {fraction:.0%} of legacy", simulate_model(urls, rates, start, end, budget), events, days, end)
+        print(f"{'':28} savings {1 - fetches / legacy_fetches:6.1%}, staleness change {delay - legacy_delay:+.1f} min")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+feed_bundle.py
+
+Feed bundles: every processed feed of a report packed into one object-store object,
+so a reader refreshes all of them with a single request instead of up to three
+round trips per feed.
+
+Layout:
+
+    b"LRB" | bundle version (1 byte) | manifest length (4 bytes, big-endian) |
+    manifest (JSON) | feed blobs
+
+The manifest maps each feed URL to its version (the publisher's last fetch time)
+and the offset and length of its blob. Blobs are feeds encoded by feed_codec, so a
+reader only decompresses the feeds whose version changed.
+"""
+
+# =============================================================================
+# STANDARD LIBRARY IMPORTS
+# =============================================================================
+import json
+import struct
+import time
+from datetime import datetime
+
+# =============================================================================
+# LOCAL IMPORTS
+# =============================================================================
+from feed_codec import FeedFormatError, decode_feed, encode_feed
+from models import RssFeed
+from object_storage_config import ConfigurationError, LibcloudError, StorageConnectionError, StorageOperationError
+from object_storage_sync import fetch_bytes_if_changed, publish_bytes
+from shared import EXPIRE_WEEK, MODE, TZ, g_c, g_logger, history
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+BUNDLE_MAGIC = b"LRB"
+BUNDLE_VERSION = 1
+_PREFIX = struct.Struct(">3sBI")
+
+# Cache key remembering the hash of the last bundle this instance applied
+BUNDLE_HASH_KEY = "feed_bundle_hash"
+
+STORAGE_ERRORS = (ConfigurationError, StorageConnectionError, StorageOperationError, LibcloudError)
+
+# =============================================================================
+# FORMAT
+# =============================================================================
+
+def encode_bundle(feeds, published=None):
+    """
+    Pack feeds into a bundle.
+
+    Args:
+        feeds (dict): url -> (version, RssFeed); version is a Unix timestamp
+        published (Optional[float]): Bundle creation time, defaults to now
+
+    Returns:
+        bytes: Encoded bundle
+    """
+    manifest = {}
+    blobs = []
+    offset = 0
+    for url, (version, feed) in feeds.items():
+        blob = encode_feed(feed)
+        manifest[url] = {"version": version, "offset": offset, "length": len(blob)}
+        blobs.append(blob)
+        offset += len(blob)
+
+    header = json.dumps({"published": published or time.time(), "feeds": manifest},
+                        separators=(",", ":")).encode("utf-8")
+    return _PREFIX.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(header)) + header + b"".join(blobs)
+
+
+class FeedBundle:
+    """
+    A parsed bundle. Only the manifest is decoded up front; feeds are decoded on demand.
+
+    Attributes:
+        published (float): When the bundle was created
+        versions (dict): url -> version of every feed in the bundle
+    """
+
+    def __init__(self, data):
+        """
+        Parse a bundle's manifest.
+
+        Args:
+            data (bytes): Encoded bundle
+
+        Raises:
+            FeedFormatError: If the data is not a bundle this version can read
+        """
+        if len(data) < _PREFIX.size:
+            raise FeedFormatError("Truncated feed bundle")
+        magic, version, header_length = _PREFIX.unpack_from(data)
+        if magic != BUNDLE_MAGIC:
+            raise FeedFormatError("Not a feed bundle")
+        if version > BUNDLE_VERSION:
+            raise FeedFormatError(f"Feed bundle version {version} is newer than supported version {BUNDLE_VERSION}")
+
+        body_start = _PREFIX.size + header_length
+        try:
+            header = json.loads(data[_PREFIX.size:body_start])
+        except ValueError as e:
+            raise FeedFormatError(f"Corrupt feed bundle manifest: {e}") from e
+
+        self._data = memoryview(data)
+        self._body_start = body_start
+        self._manifest = header["feeds"]
+        self.published = header["published"]
+        self.versions = {url: entry["version"] for url, entry in self._manifest.items()}
+
+    def feed(self, url):
+        """
+        Decode one feed from the bundle.
+
+        Args:
+            url (str): Feed URL from the manifest
+
+        Returns:
+            RssFeed: The decoded feed
+        """
+        entry = self._manifest[url]
+        start = self._body_start + entry["offset"]
+        return decode_feed(bytes(self._data[start:start + entry["length"]]))
+
+# =============================================================================
+# PUBLISHING AND SYNCING
+# =============================================================================
+
+def bundle_key():
+    """Object-store key of the current report's bundle."""
+    return f"feed_bundle:{MODE.value}"
+
+
+def publish_feed_bundle(urls):
+    """
+    Publish the cached feeds among urls as this report's bundle.
+
+    Args:
+        urls (List[str]): Feeds to include; feeds not in the cache are skipped
+
+    Returns:
+        int: Number of feeds published
+    """
+    last_fetches = g_c.get_all_last_fetches(urls)
+    feeds = {}
+    for url in urls:
+        feed = g_c.get(url)
+        last_fetch = last_fetches.get(url)
+        if isinstance(feed, RssFeed) and last_fetch is not None:
+            feeds[url] = (last_fetch.timestamp(), feed)
+    if not feeds:
+        return 0
+
+    try:
+        data = encode_bundle(feeds)
+        publish_bytes(data, bundle_key())
+    except (TypeError, ValueError) + STORAGE_ERRORS as e:
+        g_logger.error(f"Error publishing feed bundle: {e}")
+        return 0
+
+    g_logger.info(f"Published feed bundle with {len(feeds)} feeds ({len(data)} bytes).")
+    return len(feeds)
+
+
+def sync_feed_bundle():
+    """
+    Apply the newest bundle from the object store to the local cache.
+
+    Downloads the bundle only if its hash changed since the last sync, and only
+    decodes feeds whose version is newer than the local copy.
+
+    Returns:
+        int: Number of feeds updated
+    """
+    try:
+        data, metadata = fetch_bytes_if_changed(bundle_key(), g_c.get(BUNDLE_HASH_KEY))
+        if data is None:
+            return 0
+
+        bundle = FeedBundle(data)
+        last_fetches = g_c.get_all_last_fetches(list(bundle.versions))
+        updated = 0
+        for url, version in bundle.versions.items():
+            local = last_fetches.get(url)
+            if local is not None and local.timestamp() >= version:
+                continue
+            fetch_time = datetime.fromtimestamp(version, TZ)
+            g_c.put(url, bundle.feed(url), timeout=EXPIRE_WEEK)
+            g_c.set_last_fetch(url, fetch_time, timeout=EXPIRE_WEEK,
+                               next_due=history.get_next_due(url, fetch_time))
+            updated += 1
+    except (FeedFormatError,) + STORAGE_ERRORS as e:
+        g_logger.error(f"Error syncing feed bundle: {e}")
+        return 0
+
+    g_c.put(BUNDLE_HASH_KEY, metadata['hash'], timeout=EXPIRE_WEEK)
+    g_logger.info(f"Synced feed bundle: {updated} of {len(bundle.versions)} feeds updated.")
+    return updated
@@ -0,0 +1,172 @@
+"""
+feed_codec.py
+
+Compact, versioned serialization for feeds published to object storage. A feed is
+encoded as JSON (no Python class layout involved) and compressed with zstd when
+available, zlib otherwise, behind a small header:
+
+    b"LRF" | format version (1 byte) | compression codec (1 byte) | payload
+
+Readers still accept the legacy pickled RssFeed objects published by older
+versions, so front-ends and fetchers can be upgraded in any order.
+"""
+
+# =============================================================================
+# STANDARD LIBRARY IMPORTS
+# =============================================================================
+import json
+import pickle
+import time
+import zlib
+from datetime import datetime
+
+# =============================================================================
+# THIRD-PARTY IMPORTS
+# =============================================================================
+from feedparser import FeedParserDict
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    try:
+        from backports import zstd
+    except ImportError:
+        zstd = None
+
+# =============================================================================
+# LOCAL IMPORTS
+# =============================================================================
+from models import RssFeed
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+MAGIC = b"LRF"
+FORMAT_VERSION = 1
+HEADER_SIZE = len(MAGIC) + 2
+
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+ZSTD_LEVEL = 6
+ZLIB_LEVEL = 6
+
+# Tags for values JSON cannot represent directly
+_STRUCT_TIME_TAG = "__struct_time__"
+_DATETIME_TAG = "__datetime__"
+
+# Exceptions that mean the compressed payload is corrupt
+_DECOMPRESS_ERRORS = (zlib.error, zstd.ZstdError) if zstd is not None else (zlib.error,)
+
+
+class FeedFormatError(ValueError):
+    """Raised when published feed data cannot be decoded."""
+
+# =============================================================================
+# ENCODING
+# =============================================================================
+
+def _to_json(value):
+    """Convert feed values into JSON-compatible structures, tagging times."""
+    if isinstance(value, dict):
+        return {str(key): _to_json(item) for key, item in value.items()}
+    if isinstance(value, time.struct_time):
+        return {_STRUCT_TIME_TAG: list(value)}
+    if isinstance(value, datetime):
+        return {_DATETIME_TAG: value.isoformat()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    raise TypeError(f"Cannot encode {type(value).__name__} in a feed")
+
+
+def _from_json(obj):
+    """json object_hook restoring tagged times."""
+    if len(obj) == 1:
+        if _STRUCT_TIME_TAG in obj:
+            return time.struct_time(obj[_STRUCT_TIME_TAG])
+        if _DATETIME_TAG in obj:
+            return datetime.fromisoformat(obj[_DATETIME_TAG])
+    return obj
+
+
+def encode_feed(rssfeed):
+    """
+    Serialize an RssFeed for publishing.
+
+    Args:
+        rssfeed (RssFeed): Feed to serialize
+
+    Returns:
+        bytes: Header followed by the compressed JSON document
+
+    Raises:
+        TypeError: If an entry holds a value the format cannot represent
+    """
+    document = {
+        "entries": _to_json(rssfeed.entries),
+        "top_articles": _to_json(rssfeed.top_articles),
+    }
+    payload = json.dumps(document, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if zstd is not None:
+        return MAGIC + bytes((FORMAT_VERSION, CODEC_ZSTD)) + zstd.compress(payload, level=ZSTD_LEVEL)
+    return MAGIC + bytes((FORMAT_VERSION, CODEC_ZLIB)) + zlib.compress(payload, ZLIB_LEVEL)
+
+# =============================================================================
+# DECODING
+# =============================================================================
+
+def decode_feed(data):
+    """
+    Deserialize published feed data, accepting both the versioned format and legacy pickles.
+
+    Args:
+        data (bytes): Content fetched from object storage
+
+    Returns:
+        RssFeed: The decoded feed
+
+    Raises:
+        FeedFormatError: If the data is corrupt, from a newer format version, or not a feed
+    """
+    if not data.startswith(MAGIC):
+        return _decode_legacy_pickle(data)
+    if len(data) < HEADER_SIZE:
+        raise FeedFormatError("Truncated feed header")
+
+    version, codec = data[len(MAGIC)], data[len(MAGIC) + 1]
+    if version > FORMAT_VERSION:
+        raise FeedFormatError(f"Feed format version {version} is newer than supported version {FORMAT_VERSION}")
+
+    body = data[HEADER_SIZE:]
+    try:
+        if codec == CODEC_ZSTD:
+            if zstd is None:
+                raise FeedFormatError("Feed is zstd-compressed but no zstd module is installed")
+            payload = zstd.decompress(body)
+        elif codec == CODEC_ZLIB:
+            payload = zlib.decompress(body)
+        else:
+            raise FeedFormatError(f"Unknown feed compression codec {codec}")
+        document = json.loads(payload, object_hook=_from_json)
+    except _DECOMPRESS_ERRORS + (ValueError, TypeError) as e:
+        if isinstance(e, FeedFormatError):
+            raise
+        raise FeedFormatError(f"Corrupt feed data: {e}") from e
+
+    # Entries behave like feedparser's, e.g. entry.link works as well as entry['link']
+    entries = [FeedParserDict(entry) for entry in document.get("entries", [])]
+    return RssFeed(entries, top_articles=document.get("top_articles", []))
+
+
+def _decode_legacy_pickle(data):
+    """Load a feed published as a pickled RssFeed by older versions."""
+    try:
+        rssfeed = pickle.loads(data)
+    except (pickle.UnpicklingError, EOFError, TypeError, AttributeError, ImportError) as e:
+        raise FeedFormatError(f"Corrupt legacy feed pickle: {e}") from e
+    if not isinstance(rssfeed, RssFeed):
+        raise FeedFormatError(f"Legacy pickle holds {type(rssfeed).__name__}, not RssFeed")
+    return rssfeed
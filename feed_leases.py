@@ -0,0 +1,178 @@
+"""
+feed_leases.py
+
+Per-feed fetch leases shared by every process on a host. A single ownership table
+in the shared cache (g_cs) maps each feed being fetched to the process holding it
+and when its lease runs out, so any process can fetch any feed nobody else holds
+without waiting for another process's whole refresh cycle.
+"""
+
+# =============================================================================
+# STANDARD LIBRARY IMPORTS
+# =============================================================================
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# =============================================================================
+# THIRD-PARTY IMPORTS
+# =============================================================================
+import diskcache
+
+# =============================================================================
+# LOCAL IMPORTS
+# =============================================================================
+from models import g_logger, LockHeartbeat
+
+# =============================================================================
+# LEASE TABLE
+# =============================================================================
+
+def new_owner_id(prefix="feed_worker"):
+    """
+    Create a unique lease owner id for the calling thread.
+
+    Args:
+        prefix (str): Human-readable prefix for debugging
+
+    Returns:
+        str: Owner id
+    """
+    return f"{prefix}_{os.getpid()}_{threading.get_ident()}_{uuid.uuid4().hex[:8]}"
+
+
+class FeedLeaseTable:
+    """
+    Ownership table of feed fetch leases, stored as one dict in a diskcache.Cache.
+
+    Each entry maps a feed URL to (owner id, expiry timestamp). Leases expire on
+    their own, so a crashed process cannot keep a feed locked.
+    """
+
+    def __init__(self, cache_instance, lease_seconds, key="feed_leases"):
+        """
+        Initialize the lease table.
+
+        Args:
+            cache_instance (diskcache.Cache): Shared cache holding the table
+            lease_seconds (int): How long a lease lasts unless released earlier
+            key (str): Cache key for the table
+        """
+        self.cache = cache_instance
+        self.lease_seconds = lease_seconds
+        self.key = key
+
+    def _live(self, now):
+        """Return the table without expired leases. Must be called inside a transaction."""
+        table = self.cache.get(self.key) or {}
+        return {url: lease for url, lease in table.items() if lease[1] > now}
+
+    def claim(self, urls, owner):
+        """
+        Take leases on every feed in urls that no other owner holds.
+
+        Args:
+            urls (List[str]): Feeds to claim
+            owner (str): Owner id from new_owner_id()
+
+        Returns:
+            List[str]: Feeds now leased to owner, in the order given
+        """
+        try:
+            with self.cache.transact():
+                now = time.time()
+                table = self._live(now)
+                claimed = []
+                for url in urls:
+                    holder = table.get(url)
+                    if holder is None or holder[0] == owner:
+                        table[url] = (owner, now + self.lease_seconds)
+                        claimed.append(url)
+                self.cache.set(self.key, table)
+                return claimed
+        except (diskcache.Timeout, sqlite3.Error, OSError) as e:
+            g_logger.warning(f"Feed lease table unavailable, not claiming {len(urls)} feeds: {e}")
+            return []
+
+    def release(self, urls, owner):
+        """
+        Give up the leases owner holds on urls.
+
+        Args:
+            urls (List[str]): Feeds to release
+            owner (str): Owner id used to claim them
+        """
+        try:
+            with self.cache.transact():
+                table = self._live(time.time())
+                for url in urls:
+                    if table.get(url, (None,))[0] == owner:
+                        del table[url]
+                self.cache.set(self.key, table)
+        except (diskcache.Timeout, sqlite3.Error, OSError) as e:
+            g_logger.warning(f"Feed lease table unavailable, leases expire on their own: {e}")
+
+    @contextmanager
+    def lease(self, url, owner_prefix="feed_worker"):
+        """
+        Hold the lease on a single feed for the duration of a with block.
+
+        The lease is renewed in the background, so slow fetches (browser-based
+        sites, Tor) keep it however long they run.
+
+        Args:
+            url (str): Feed to lease
+            owner_prefix (str): Prefix for the generated owner id
+
+        Yields:
+            bool: True if the lease was taken, False if another owner holds it
+        """
+        owner = new_owner_id(owner_prefix)
+        leased = bool(self.claim([url], owner))
+        if not leased:
+            yield False
+            return
+        try:
+            with LockHeartbeat(lambda: bool(self.claim([url], owner)), self.lease_seconds / 3, name=f"lease on {url}"):
+                yield True
+        finally:
+            self.release([url], owner)
+
+    def held(self, urls=None):
+        """
+        Report which feeds are currently leased.
+
+        Args:
+            urls (Optional[List[str]]): Feeds to check, or None for all
+
+        Returns:
+            dict: url -> owner id for every live lease
+        """
+        table = self.cache.get(self.key) or {}
+        now = time.time()
+        if urls is not None:
+            table = {url: table[url] for url in urls if url in table}
+        return {url: owner for url, (owner, expiry) in table.items() if expiry > now}
+
+    def wait_released(self, urls, timeout):
+        """
+        Wait until no process holds a lease on any of urls.
+
+        Args:
+            urls (List[str]): Feeds another process may be fetching
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            bool: True if all leases were released, False on timeout
+        """
+        deadline = time.monotonic() + timeout
+        delay = 0.05
+        while self.held(urls):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2, 1.0)
+        return True
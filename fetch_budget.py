@@ -0,0 +1,125 @@
+"""
+fetch_budget.py
+
+Host-level fetch budget shared by every report instance on a machine. A token
+bucket stored in the shared cache (g_cs) limits the total number of feed fetches
+per minute, so several reports running on one small server spread their
+refreshes over time instead of all fetching at once.
+"""
+
+# =============================================================================
+# STANDARD LIBRARY IMPORTS
+# =============================================================================
+import math
+import sqlite3
+import time
+
+# =============================================================================
+# THIRD-PARTY IMPORTS
+# =============================================================================
+import diskcache
+
+# =============================================================================
+# LOCAL IMPORTS
+# =============================================================================
+from models import g_logger
+
+# =============================================================================
+# TOKEN BUCKET
+# =============================================================================
+
+class FetchBudget:
+    """
+    Token bucket for feed fetches, shared across processes through a diskcache.Cache.
+
+    Tokens refill continuously at `fetches_per_minute` up to `burst`. Background
+    refreshes only fetch as many feeds as there are whole tokens; fetches that a
+    user is waiting on are always allowed but still consume tokens, which can put
+    the bucket into debt and delay the next background refresh.
+    """
+
+    def __init__(self, cache_instance, fetches_per_minute, burst, key="fetch_budget"):
+        """
+        Initialize the budget.
+
+        Args:
+            cache_instance (diskcache.Cache): Shared cache holding the bucket state
+            fetches_per_minute (float): Sustained fetch rate across all instances
+            burst (int): Maximum number of fetches that can be granted at once
+            key (str): Cache key for the bucket state
+        """
+        self.cache = cache_instance
+        self.rate = fetches_per_minute / 60.0
+        self.burst = burst
+        self.key = key
+
+    def _update(self, requested, force):
+        """Refill the bucket and take up to `requested` tokens in one transaction."""
+        try:
+            with self.cache.transact():
+                now = time.time()
+                tokens, updated = self.cache.get(self.key) or (self.burst, now)
+                tokens = min(self.burst, tokens + max(now - updated, 0) * self.rate)
+
+                granted = requested if force else max(0, min(requested, math.floor(tokens)))
+                self.cache.set(self.key, (tokens - granted, now))
+                return granted
+        except (diskcache.Timeout, sqlite3.Error, OSError) as e:
+            # Never block fetching on a cache failure
+            g_logger.warning(f"Fetch budget unavailable, not limiting fetches: {e}")
+            return requested
+
+    def acquire(self, requested):
+        """
+        Take up to `requested` fetch tokens.
+
+        Args:
+            requested (int): Number of feeds that want to be fetched
+
+        Returns:
+            int: Number of feeds that may be fetched now
+        """
+        if requested <= 0:
+            return 0
+        return self._update(requested, force=False)
+
+    def consume(self, count):
+        """
+        Record fetches that happen regardless of the budget.
+
+        Args:
+            count (int): Number of feeds being fetched
+        """
+        if count > 0:
+            self._update(count, force=True)
+
+# =============================================================================
+# PRIORITIZATION
+# =============================================================================
+
+def prioritize(urls, expected_new, site_urls):
+    """
+    Order feeds by how valuable a refresh is right now.
+
+    Priority is the expected number of new articles, weighted by how prominent the
+    feed is in the page layout: the first feed in SITE_URLS counts twice as much as
+    the last, and feeds not in SITE_URLS count like the last one.
+
+    Args:
+        urls (List[str]): Feeds that are due for a refresh
+        expected_new (List[float]): Expected new articles per feed, same order as urls
+        site_urls (List[str]): Display order of the report's feeds
+
+    Returns:
+        List[str]: urls sorted from highest to lowest priority
+    """
+    rank = {url: i for i, url in enumerate(site_urls)}
+    count = max(len(site_urls), 1)
+
+    def priority(item):
+        url, expected = item
+        weight = 2.0 - rank.get(url, count) / count
+        # The small floor lets prominence break ties between feeds expected to be empty
+        return (expected + 0.01) * weight
+
+    return [url for url, _ in sorted(zip(urls, expected_new), key=priority, reverse=True)]
@@ -0,0 +1,196 @@
+"""
+frontend_sync.py
+
+Keeps read-only front-end nodes up to date without fetching anything upstream.
+
+A fetch node publishes its processed feeds as a bundle (see feed_bundle) and the
+rendered headline fragments shown above the feeds. Front-ends run a background
+loop that pulls both from the object store, checking versions so unchanged data
+costs one metadata request and no download. Pages are then rendered from the
+local cache exactly as on a fetch node.
+"""
+
+# =============================================================================
+# STANDARD LIBRARY IMPORTS
+# =============================================================================
+import os
+import hashlib
+import threading
+import time
+
+# =============================================================================
+# LOCAL IMPORTS
+# =============================================================================
+from feed_bundle import STORAGE_ERRORS, sync_feed_bundle
+from leader_election import is_read_only
+from object_storage_sync import fetch_bytes_if_changed, publish_bytes
+from shared import (
+    ABOVE_HTML_FILE, EXTRA_HEADLINES_HTML_ABOVE_FILE, EXTRA_HEADLINES_HTML_BELOW_FILE,
+    EXPIRE_WEEK, FRONTEND_SYNC_INTERVAL, PATH, g_c, g_logger, get_lock
+)
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+# Rendered HTML fragments a fetch node produces and front-ends serve as-is
+FRAGMENT_FILES = (ABOVE_HTML_FILE, EXTRA_HEADLINES_HTML_ABOVE_FILE, EXTRA_HEADLINES_HTML_BELOW_FILE)
+
+# Lock so only one process of an instance runs a sync at a time
+FRONTEND_SYNC_LOCK_KEY = "frontend_sync"
+
+# Cache key with the time of the last completed sync, shared by all processes
+LAST_SYNC_KEY = "frontend_last_sync"
+
+# Per-process sync loop, restarted after a fork
+_sync_thread = None
+_sync_thread_pid = None
+_sync_thread_guard = threading.Lock()
+
+# =============================================================================
+# RENDERED FRAGMENTS
+# =============================================================================
+
+def _fragment_key(filename):
+    """Object-store key of a rendered fragment."""
+    return f"fragment:{filename}"
+
+
+def publish_fragments():
+    """
+    Publish the rendered headline fragments that changed since the last publish.
+
+    Returns:
+        int: Number of fragments published
+    """
+    published = 0
+    for filename in FRAGMENT_FILES:
+        try:
+            with open(os.path.join(PATH, filename), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            g_logger.error(f"Error reading fragment {filename}: {e}")
+            continue
+
+        digest = hashlib.md5(data).hexdigest()
+        if g_c.get(f"fragment_published:{filename}") == digest:
+            continue
+        try:
+            publish_bytes(data, _fragment_key(filename))
+        except (TypeError, ValueError) + STORAGE_ERRORS as e:
+            g_logger.error(f"Error publishing fragment {filename}: {e}")
+            continue
+        g_c.put(f"fragment_published:{filename}", digest, timeout=EXPIRE_WEEK)
+        published += 1
+    return published
+
+
+def sync_fragments():
+    """
+    Download the rendered headline fragments that changed on the fetch node.
+
+    Files are replaced atomically, so a page being rendered never reads half a
+    fragment; the file cache picks up the new content from the changed mtime.
+
+    Returns:
+        int: Number of fragments updated
+    """
+    updated = 0
+    for filename in FRAGMENT_FILES:
+        hash_key = f"fragment_hash:{filename}"
+        try:
+            data, metadata = fetch_bytes_if_changed(_fragment_key(filename), g_c.get(hash_key))
+        except STORAGE_ERRORS as e:
+            g_logger.error(f"Error syncing fragment {filename}: {e}")
+            continue
+        if data is None:
+            continue
+
+        path = os.path.join(PATH, filename)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            g_logger.error(f"Error writing fragment {filename}: {e}")
+            continue
+        g_c.put(hash_key, metadata['hash'], timeout=EXPIRE_WEEK)
+        updated += 1
+    return updated
+
+# =============================================================================
+# SYNC LOOP
+# =============================================================================
+
+def sync_frontend(interval=FRONTEND_SYNC_INTERVAL):
+    """
+    Pull feeds and fragments from the object store if no process did so recently.
+
+    Args:
+        interval (int): Minimum seconds between syncs across all processes
+
+    Returns:
+        bool: True if this call ran a sync, False if it was skipped
+    """
+    lock = get_lock(FRONTEND_SYNC_LOCK_KEY, owner_prefix=f"frontend_sync_{os.getpid()}")
+    if not lock.acquire(timeout_seconds=max(interval, 60), wait=False):
+        return False
+
+    try:
+        last_sync = g_c.get(LAST_SYNC_KEY)
+        if last_sync is not None and time.time() - last_sync < interval:
+            return False
+
+        feeds = sync_feed_bundle()
+        fragments = sync_fragments()
+        g_c.put(LAST_SYNC_KEY, time.time(), timeout=EXPIRE_WEEK)
+        if feeds or fragments:
+            g_logger.info(f"Front-end sync updated {feeds} feeds and {fragments} fragments.")
+        return True
+    finally:
+        lock.release()
+
+
+def _sync_loop(interval):
+    """
+    Run sync_frontend forever; errors are logged so the loop never dies.
+
+    The loop idles while this node is the elected fetch leader, since it then
+    produces the data itself.
+    """
+    while True:
+        try:
+            if is_read_only():
+                sync_frontend(interval)
+        except Exception as e:
+            g_logger.error(f"Front-end sync failed: {e}")
+        time.sleep(interval)
+
+
+def start_frontend_sync(interval=FRONTEND_SYNC_INTERVAL):
+    """
+    Start this process's background sync loop, if it is not already running.
+
+    Safe to call on every request: the check is a lock-free comparison once the
+    loop runs. The loop is started lazily rather than at import so it lives in
+    the worker process, not in a parent that forks and loses its threads.
+
+    Args:
+        interval (int): Seconds between syncs
+    """
+    global _sync_thread, _sync_thread_pid
+    pid = os.getpid()
+    if _sync_thread_pid == pid and _sync_thread.is_alive():
+        return
+
+    with _sync_thread_guard:
+        if _sync_thread_pid == pid and _sync_thread.is_alive():
+            return
+        _sync_thread = threading.Thread(target=_sync_loop, args=(interval,),
+                                        name="frontend-sync", daemon=True)
+        _sync_thread_pid = pid
+        _sync_thread.start()
+        g_logger.info(f"Started front-end sync loop every {interval}s.")
@@ -0,0 +1,248 @@
+"""
+html_parsing.py
+
+Pluggable HTML parsing backends for scraping and image discovery.
+
+BeautifulSoup with 'html.parser' is pure Python and the slowest way to parse a
+page; whole article pages are parsed for every image lookup and scrape. This
+module puts selectolax (lexbor) and lxml behind the ElementExtractor interface
+of browser_fetch, plus parse() and get_attributes(), so callers select elements
+with CSS selectors the same way whatever parser is installed. BeautifulSoup is
+the fallback when neither is available.
+
+Usage:
+    from html_parsing import get_html_parser
+
+    parser = get_html_parser()
+    document = parser.parse(html)
+    for link in parser.find_elements(document, "h2 a"):
+        print(parser.get_attribute(link, "href"), parser.get_text(link))
+
+Benchmark over pages saved by site_debugger: tests/parser_benchmark.py
+"""
+
+# =============================================================================
+# STANDARD LIBRARY IMPORTS
+# =============================================================================
+from functools import lru_cache
+
+# =============================================================================
+# THIRD-PARTY IMPORTS
+# =============================================================================
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml.html
+    from lxml.cssselect import CSSSelector
+except ImportError:  # lxml, or cssselect which lxml needs for CSS selectors
+    CSSSelector = None
+
+# =============================================================================
+# LOCAL IMPORTS
+# =============================================================================
+from shared import g_logger
+from browser_fetch import ElementExtractor, BeautifulSoupElementExtractor
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+# Backend to use: "selectolax", "lxml" or "beautifulsoup"; None picks the
+# fastest one installed, in this order
+HTML_PARSER_BACKEND = None
+BACKEND_PREFERENCE = ("selectolax", "lxml", "beautifulsoup")
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class HtmlParser(ElementExtractor):
+    """ElementExtractor over parsed HTML, which can also parse the document."""
+
+    name = None
+
+    def parse(self, html):
+        """
+        Parse an HTML document.
+
+        Args:
+            html (str): Page source
+
+        Returns:
+            Document usable as the parent of find_element() and find_elements()
+        """
+        raise NotImplementedError("Subclasses must implement parse")
+
+    def get_attributes(self, element):
+        """
+        Get all attributes of an element.
+
+        Args:
+            element: Element to read
+
+        Returns:
+            dict: Attribute names to string values
+        """
+        raise NotImplementedError("Subclasses must implement get_attributes")
+
+
+class SelectolaxParser(HtmlParser):
+    """selectolax with the lexbor engine: a C parser and CSS selector engine."""
+
+    name = "selectolax"
+
+    def parse(self, html):
+        return LexborHTMLParser(html)
+
+    def find_element(self, parent, selector):
+        try:
+            return parent.css_first(selector)
+        except Exception:
+            return None
+
+    def find_elements(self, parent, selector):
+        try:
+            return parent.css(selector)
+        except Exception:
+            return []
+
+    def get_attribute(self, element, attr):
+        try:
+            if attr == "text":
+                return element.text().strip()
+            attributes = element.attributes
+            if attr not in attributes:
+                return None
+            # A valueless attribute, like <a href>, reads as "" as in the other backends
+            return attributes[attr] or ""
+        except Exception:
+            return None
+
+    def get_attributes(self, element):
+        # Attributes without a value, like <img hidden>, read as None
+        return {name: value or "" for name, value in element.attributes.items()}
+
+    def get_text(self, element):
+        try:
+            return element.text()
+        except Exception:
+            return ""
+
+
+@lru_cache(maxsize=256)
+def _compile_selector(selector):
+    return CSSSelector(selector)
+
+
+class LxmlParser(HtmlParser):
+    """lxml's libxml2 HTML parser, with selectors compiled to XPath by cssselect."""
+
+    name = "lxml"
+
+    def parse(self, html):
+        if isinstance(html, str):
+            # lxml rejects str input with an XML encoding declaration
+            html = html.encode("utf-8")
+        try:
+            return lxml.html.document_fromstring(html)
+        except Exception:  # Empty or unparseable document
+            return lxml.html.document_fromstring(b"<html></html>")
+
+    def find_element(self, parent, selector):
+        elements = self.find_elements(parent, selector)
+        return elements[0] if elements else None
+
+    def find_elements(self, parent, selector):
+        try:
+            return _compile_selector(selector)(parent)
+        except Exception:
+            return []
+
+    def get_attribute(self, element, attr):
+        try:
+            if attr == "text":
+                return element.text_content().strip()
+            return element.get(attr)
+        except Exception:
+            return None
+
+    def get_attributes(self, element):
+        return dict(element.attrib)
+
+    def get_text(self, element):
+        try:
+            return element.text_content()
+        except Exception:
+            return ""
+
+
+class SoupParser(BeautifulSoupElementExtractor, HtmlParser):
+    """BeautifulSoup with Python's html.parser: slowest, but always installed."""
+
+    name = "beautifulsoup"
+
+    def parse(self, html):
+        return BeautifulSoup(html, 'html.parser')
+
+    def get_attributes(self, element):
+        # Multi-valued attributes such as class come back as lists
+        return {name: " ".join(value) if isinstance(value, list) else value
+                for name, value in element.attrs.items()}
+
+
+BACKENDS = {
+    "selectolax": (SelectolaxParser, lambda: LexborHTMLParser is not None),
+    "lxml": (LxmlParser, lambda: CSSSelector is not None),
+    "beautifulsoup": (SoupParser, lambda: True),
+}
+
+# =============================================================================
+# BACKEND SELECTION
+# =============================================================================
+
+_parsers = {}
+
+def available_backends():
+    """
+    List the installed backends.
+
+    Returns:
+        list: Backend names, fastest first
+    """
+    return [name for name in BACKEND_PREFERENCE if BACKENDS[name][1]()]
+
+
+def get_html_parser(backend=None):
+    """
+    Get the parser for a backend, or the fastest one installed.
+
+    Args:
+        backend (str, optional): Backend name; defaults to HTML_PARSER_BACKEND
+
+    Returns:
+        HtmlParser: Parser instance, shared by all callers
+    """
+    backend = backend or HTML_PARSER_BACKEND
+    installed = available_backends()
+    if backend not in installed:
+        if backend:
+            g_logger.warning(f"HTML parser backend '{backend}' is not installed, using {installed[0]}")
+        backend = installed[0]
+    if backend not in _parsers:
+        _parsers[backend] = BACKENDS[backend][0]()
+    return _parsers[backend]
+
+
+def get_fallback_parser():
+    """
+    Get the BeautifulSoup parser, for documents or selectors the fast backends reject.
+
+    Returns:
+        HtmlParser: BeautifulSoup parser
+    """
+    return get_html_parser("beautifulsoup")
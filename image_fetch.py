@@ -20,9 +20,9 @@ from io import BytesIO
 from PIL import Image
 import xml.etree.ElementTree as ET
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
 import json
 from shared import g_logger
+from html_parsing import get_html_parser
 
 # Selenium imports (for optional JS-heavy sites)
 from selenium.webdriver.common.by import By
@@ -49,26 +49,26 @@ def parse_dimension(value):
     m = re.match(r'^\\s*(\\d+(?:\\.\\d+)?)', str(value))
     return float(m.group(1)) if m else 0
 
-def extract_dimensions_from_tag_or_style(tag):
+def extract_dimensions_from_tag_or_style(attrs):
     width = 0
     height = 0
     try:
-        if tag.get('width'):
-            w = tag['width']
+        if attrs.get('width'):
+            w = attrs['width']
             if isinstance(w, str) and w.strip().endswith('px'):
                 w = w.strip().rstrip('px')
             if str(w).isdigit():
                 width = int(w)
-        if tag.get('height'):
-            h = tag['height']
+        if attrs.get('height'):
+            h = attrs['height']
             if isinstance(h, str) and h.strip().endswith('px'):
                 h = h.strip().rstrip('px')
             if str(h).isdigit():
                 height = int(h)
     except (ValueError, KeyError):
         pass
-    if (width == 0 or height == 0) and tag.get('style'):
-        style = tag['style']
+    if (width == 0 or height == 0) and attrs.get('style'):
+        style = attrs['style']
         width_match = re.search(r'width:\\s*(\\d+)px', style)
         if width_match:
             width = int(width_match.group(1))
@@ -203,9 +203,8 @@ def extract_underlying_url(url, selector_func):
     try:
         response = requests.get(url, headers=HEADERS, timeout=10)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        underlying_url = selector_func(soup)
+        parser = get_html_parser()
+        underlying_url = selector_func(parser, parser.parse(response.text))
         if underlying_url:
             g_logger.info(f"Found underlying URL: {underlying_url}")
             return underlying_url
@@ -216,18 +215,18 @@ def extract_underlying_url(url, selector_func):
         g_logger.warning(f"Error extracting underlying URL: {e}")
         return None
 
-def citizenfreepress_selector(soup):
-    external_link_paragraph = soup.find('p', class_='external-link')
-    if external_link_paragraph:
-        link = external_link_paragraph.find('a')
-        if link and 'href' in link.attrs:
-            return link['href']
+def citizenfreepress_selector(parser, document):
+    external_link_paragraph = parser.find_element(document, 'p.external-link')
+    if external_link_paragraph is not None:
+        link = parser.find_element(external_link_paragraph, 'a')
+        if link is not None:
+            return parser.get_attribute(link, 'href')
     return None
 
-def linuxtoday_selector(soup):
-    link = soup.find('a', class_='action-btn publication_source')
-    if link and 'href' in link.attrs:
-        return link['href']
+def linuxtoday_selector(parser, document):
+    link = parser.find_element(document, 'a.action-btn.publication_source')
+    if link is not None:
+        return parser.get_attribute(link, 'href')
     return None
 
 def generic_custom_fetch(url, selector_func):
@@ -251,10 +250,10 @@ def reddit_custom_fetch(url, underlying_link=None, html_content=None):
         g_logger.info(f"Reddit hack: using provided underlying link {underlying_link}")
         return fetch_largest_image_requests(underlying_link)
     if html_content:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            if 'reddit' not in href:
+        parser = get_html_parser()
+        for link in parser.find_elements(parser.parse(html_content), 'a[href]'):
+            href = parser.get_attribute(link, 'href')
+            if href and 'reddit' not in href:
                 g_logger.info(f"Reddit hack: using link from html_content {href}")
                 return fetch_largest_image_requests(href)
     g_logger.info(f"No images found in Reddit content, not bothering to try reddit.com: {url}")
@@ -269,17 +268,17 @@ custom_hacks = {
 }
 
 # Core image parsing from image_parser.py
-def extract_img_url_from_tag(img_tag, base_url):
-    srcset = img_tag.get('srcset')
+def extract_img_url_from_tag(attrs, base_url):
+    srcset = attrs.get('srcset')
     if srcset:
         best, _ = parse_best_srcset(srcset)
         if best:
             return urljoin(base_url, best)
-    src = img_tag.get('src', '')
+    src = attrs.get('src', '')
     if src and not src.startswith('data:'):
         return urljoin(base_url, src)
     ext = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.svg')
-    for value in img_tag.attrs.values():
+    for value in attrs.values():
         if isinstance(value, str) and (value.startswith('http') or value.lower().endswith(ext)):
             return urljoin(base_url, value)
     return None
@@ -289,7 +288,9 @@ def add_candidate(candidate_images, processed_urls, url, metadata):
         processed_urls.add(url)
         candidate_images.append((url, metadata))
 
-def parse_images_requests(soup, base_url):
+def parse_images_requests(html, base_url):
+    parser = get_html_parser()
+    document = parser.parse(html)
     candidate_images = []
     processed_urls = set()
 
@@ -302,15 +303,16 @@ def parse_images_requests(soup, base_url):
         ('meta[itemprop="image"]', 'content', 8000000),
     ]
     for selector, attr, score in meta_tags:
-        for tag in soup.select(selector):
-            if tag.get(attr):
-                url = urljoin(base_url, tag[attr])
+        for tag in parser.find_elements(document, selector):
+            value = parser.get_attribute(tag, attr)
+            if value:
+                url = urljoin(base_url, value)
                 add_candidate(candidate_images, processed_urls, url, {'score': score, 'meta': True})
 
     # JSON-LD
-    for script in soup.find_all('script', type='application/ld+json'):
+    for script in parser.find_elements(document, 'script[type="application/ld+json"]'):
         try:
-            data = json.loads(script.string)
+            data = json.loads(parser.get_text(script))
             if isinstance(data, dict):
                 image_candidates = []
                 if 'image' in data:
@@ -335,17 +337,18 @@ def parse_images_requests(soup, base_url):
             g_logger.debug(f"Error parsing JSON-LD: {e}")
 
     # Img tags
-    for img in soup.find_all('img'):
-        url = extract_img_url_from_tag(img, base_url)
+    for img in parser.find_elements(document, 'img'):
+        attrs = parser.get_attributes(img)
+        url = extract_img_url_from_tag(attrs, base_url)
         if not url or is_excluded(url):
             continue
-        width, height = extract_dimensions_from_tag_or_style(img)
+        width, height = extract_dimensions_from_tag_or_style(attrs)
         metadata = {}
         if width > 0:
             metadata['width'] = width
         if height > 0:
             metadata['height'] = height
-        alt_text = img.get('alt', '')
+        alt_text = attrs.get('alt', '')
         metadata['score'] = score_image_candidate(width, height, alt_text)
         add_candidate(candidate_images, processed_urls, url, metadata)
 
@@ -390,6 +393,7 @@ def process_candidate_images(candidate_images):
     return best_url
 
 def get_final_response(url, headers, max_redirects=2):
+    parser = get_html_parser()
     for _ in range(max_redirects):
         try:
             response = requests.get(url, headers=headers, timeout=10)
@@ -398,13 +402,13 @@ def get_final_response(url, headers, max_redirects=2):
             g_logger.error(f"Error fetching {url}: {e}")
             return None
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-        meta_refresh = soup.find('meta', attrs={'http-equiv': lambda x: x and x.lower() == 'refresh'})
+        meta_refresh = next((meta for meta in parser.find_elements(parser.parse(response.text), 'meta[http-equiv]')
+                             if (parser.get_attribute(meta, 'http-equiv') or '').lower() == 'refresh'), None)
 
-        if not meta_refresh:
+        if meta_refresh is None:
             return response
 
-        content = meta_refresh.get('content', '')
+        content = parser.get_attribute(meta_refresh, 'content') or ''
         parts = content.split(';')
         target_url = None
         for part in parts:
@@ -425,9 +429,8 @@ def fetch_largest_image_requests(url):
     if os.path.exists(url):
         with open(url, 'r', encoding='utf-8') as f:
             html = f.read()
-        soup = BeautifulSoup(html, "html.parser")
         base_url = "file://" + os.path.abspath(url)
-        candidate_images = parse_images_requests(soup, base_url)
+        candidate_images = parse_images_requests(html, base_url)
         if not candidate_images:
             g_logger.warning("No suitable images found in local file.")
             return None
@@ -480,9 +483,8 @@ def fetch_largest_image_requests(url):
             g_logger.debug(f"Content-Type ({content_type}) is not HTML or image, skipping image parsing for {url}")
             return None
 
-        soup = BeautifulSoup(response.text, 'html.parser')
         base_url = response.url
-        candidate_images = parse_images_requests(soup, base_url)
+        candidate_images = parse_images_requests(response.text, base_url)
 
         if not candidate_images:
             g_logger.warning("No suitable images found.")
@@ -632,11 +634,12 @@ def custom_fetch_largest_image(url, underlying_link=None, html_content=None):
         g_logger.info("Using underlying link provided")
         url_to_process = underlying_link
     elif html_content:
-        soup = BeautifulSoup(html_content, "html.parser")
-        first_link = soup.find("a")
-        if first_link and first_link.get("href"):
+        parser = get_html_parser()
+        first_link = parser.find_element(parser.parse(html_content), "a")
+        href = parser.get_attribute(first_link, "href") if first_link is not None else None
+        if href:
             g_logger.info("Using first link from HTML content")
-            url_to_process = first_link["href"]
+            url_to_process = href
         else:
             g_logger.info("HTML content provided but no link found, using original URL")
             url_to_process = url
@@ -0,0 +1,192 @@
+"""
+leader_election.py
+
+Elects the one node of a report that fetches feeds and runs auto_update.
+
+Every node competes for a renewable "fetch leader" lease held in an
+ObjectStorageLock. The holder renews it every third of the lease; the other nodes
+behave as read-only front-ends (see frontend_sync) and retry on the same schedule.
+If the leader dies or loses storage access, its lease expires and another node
+takes over, so failover takes at most LEADER_LEASE_SECONDS plus one retry interval.
+
+A leader only acts as leader until its lease would expire minus a clock skew
+margin, measured from before its last successful renewal, so two nodes never
+both believe they lead as long as their clocks agree within the margin.
+
+Within a node, one web process runs the election at a time and records the
+outcome in the report cache for the other processes and for auto_update.
+
+The lease is owned per node (SERVER_ID), not per publisher: all nodes of an
+election share one publisher_id so that followers read what the leader publishes,
+and an owner shared by every node would let each of them take the lease as its own.
+"""
+
+# =============================================================================
+# STANDARD LIBRARY IMPORTS
+# =============================================================================
+import os
+import threading
+import time
+
+# =============================================================================
+# LOCAL IMPORTS
+# =============================================================================
+from ObjectStorageLock import LocalLockStore, ObjectStorageLock
+from object_storage_config import SERVER_ID, StorageError, LibcloudError
+from shared import (
+    ENABLE_LEADER_ELECTION, EXPIRE_DAY, LEADER_LEASE_SECONDS, LEADER_STORE_PATH, MODE,
+    READ_ONLY_FRONTEND, g_c, g_logger, get_lock
+)
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+# Allowed disagreement between server clocks
+CLOCK_SKEW_SECONDS = 10
+
+# Cache key holding the time until which this node leads, shared by its processes
+LEADER_STATE_KEY = "fetch_leader_until"
+
+# Per-process election loop, restarted after a fork
+_election_thread = None
+_election_thread_pid = None
+_election_thread_guard = threading.Lock()
+
+# =============================================================================
+# ELECTION
+# =============================================================================
+
+class LeaderElection:
+    """
+    One node's view of the election for a lock.
+
+    Call step() every lease_seconds / 3 or more often; it acquires or renews the
+    lease and returns whether this node leads.
+    """
+
+    def __init__(self, lock, lease_seconds, skew_seconds=CLOCK_SKEW_SECONDS, clock=time.time):
+        """
+        Args:
+            lock (ObjectStorageLock): Lock holding the lease, with this node's owner_id
+            lease_seconds (float): How long a lease lasts without renewal
+            skew_seconds (float): Margin for clock differences between servers
+            clock (callable): Wall-clock time source
+        """
+        self.lock = lock
+        self.lease_seconds = lease_seconds
+        self.skew_seconds = skew_seconds
+        self._clock = clock
+        self.valid_until = 0.0
+
+    def step(self):
+        """
+        Acquire or renew the lease.
+
+        Returns:
+            bool: True if this node leads until valid_until
+        """
+        started = self._clock()
+        if self.lock.locked():
+            if self.lock.renew(self.lease_seconds):
+                self.valid_until = started + self.lease_seconds - self.skew_seconds
+            else:
+                g_logger.warning(f"Lost fetch leadership: could not renew {self.lock.lock_name}.")
+                self.valid_until = 0.0
+                self.lock.release()
+        elif self.lock.acquire(timeout_seconds=self.lease_seconds, wait=False):
+            g_logger.info(f"Became fetch leader as {self.lock.owner_id} (token {self.lock.fencing_token}).")
+            self.valid_until = started + self.lease_seconds - self.skew_seconds
+        return self.is_leader()
+
+    def is_leader(self):
+        """Check whether this node leads right now."""
+        return self._clock() < self.valid_until
+
+    def resign(self):
+        """Give up the lease so another node can take over immediately."""
+        self.valid_until = 0.0
+        if self.lock.locked():
+            self.lock.release()
+
+# =============================================================================
+# NODE ROLE
+# =============================================================================
+
+def is_fetch_leader():
+    """Check whether this node currently holds the fetch leader lease."""
+    return (g_c.get(LEADER_STATE_KEY) or 0) > time.time()
+
+
+def is_read_only():
+    """
+    Check whether this node must not fetch feeds.
+
+    Returns:
+        bool: True on read-only front-ends, and on election followers
+    """
+    if READ_ONLY_FRONTEND:
+        return True
+    if ENABLE_LEADER_ELECTION:
+        return not is_fetch_leader()
+    return False
+
+
+def _make_election(server_id=SERVER_ID):
+    """
+    Create a node's election for the current report.
+
+    Args:
+        server_id (str): Identity of the node, unique across servers
+
+    Returns:
+        LeaderElection: Election whose lease is owned by this node alone
+    """
+    store = LocalLockStore(LEADER_STORE_PATH) if LEADER_STORE_PATH else None
+    lock = ObjectStorageLock(f"fetch-leader:{MODE.value}", store=store,
+                             owner_id=f"{server_id}:{MODE.value}")
+    return LeaderElection(lock, LEADER_LEASE_SECONDS)
+
+
+def _election_loop():
+    """Run elections while this process is the node's elector."""
+    interval = LEADER_LEASE_SECONDS / 3
+    elector = get_lock(f"leader_elector:{MODE.value}", owner_prefix=f"elector_{os.getpid()}")
+    election = None
+    while True:
+        try:
+            if elector.locked() and not elector.renew(LEADER_LEASE_SECONDS):
+                # Another process took over the election; its own instance holds the lease now
+                elector.release()
+                election = None
+            if elector.locked() or elector.acquire(timeout_seconds=LEADER_LEASE_SECONDS, wait=False):
+                if election is None:
+                    election = _make_election()
+                leader = election.step()
+                g_c.put(LEADER_STATE_KEY, election.valid_until if leader else 0, timeout=EXPIRE_DAY)
+        except (StorageError, LibcloudError, OSError) as e:
+            g_logger.error(f"Fetch leader election failed: {e}")
+        time.sleep(interval)
+
+
+def start_leader_election():
+    """
+    Start this process's election loop, if election is enabled and it is not running.
+
+    Safe to call on every request. Like the front-end sync loop, it starts lazily
+    so it runs in the worker process rather than in a parent that forks.
+    """
+    global _election_thread, _election_thread_pid
+    if not ENABLE_LEADER_ELECTION or READ_ONLY_FRONTEND:
+        return
+    pid = os.getpid()
+    if _election_thread_pid == pid and _election_thread.is_alive():
+        return
+
+    with _election_thread_guard:
+        if _election_thread_pid == pid and _election_thread.is_alive():
+            return
+        _election_thread = threading.Thread(target=_election_loop, name="leader-election", daemon=True)
+        _election_thread_pid = pid
+        _election_thread.start()
+        g_logger.info(f"Started fetch leader election every {LEADER_LEASE_SECONDS / 3:.0f}s.")
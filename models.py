@@ -13,6 +13,8 @@ from flask_login import UserMixin
 import datetime
 import os
 import sys
+import threading
+import time
 
 # =============================================================================
 # THIRD-PARTY IMPORTS
@@ -174,18 +176,59 @@ class DiskCacheWrapper:
         Returns:
             bool: True if the feed has expired, False otherwise
         """
-        if last_fetch is None:
-            last_fetch = self.get_last_fetch(url)
-        if last_fetch is None:
-            return True
+        last_fetches = {url: last_fetch} if last_fetch is not None else None
+        return url in self.get_expired([url], last_fetches=last_fetches, history=history)
+
+    def get_expired(self, urls, last_fetches=None, history=None, now=None):
+        """
+        Determine which feeds have expired using the precomputed next-due times.
+        
+        Feeds fetched by a worker have their next-due time stored next to the last
+        fetch time, so expiry is a single comparison against one clock value. Feeds
+        without a stored next-due time (legacy entries, forced refreshes) fall back
+        to computing the interval from the feed history.
         
-        # Use provided history instance or the global one from shared
-        if history is None:
-            # Import here to avoid circular imports
-            import shared
-            history = shared.history
+        Args:
+            urls (List[str]): List of URLs to check
+            last_fetches (Optional[Dict[str, datetime.datetime]]): Pre-fetched result of
+                                                                  get_all_last_fetches()
+            history (Optional[FeedHistory.FeedHistory]): FeedHistory instance for the fallback path.
+                                                       If None, uses the global history instance from shared.py
+            now (Optional[float]): Current time as a Unix timestamp, to reuse a clock value
+                                   the caller already has
         
-        return history.has_expired(url, last_fetch)
+        Returns:
+            set: URLs that should be refreshed
+        """
+        if last_fetches is None:
+            last_fetches = self.get_all_last_fetches(urls)
+        all_next_due = self.get('all_next_due') or {}
+        if now is None:
+            now = time.time()
+
+        expired = set()
+        for url in urls:
+            next_due = all_next_due.get(url)
+            if next_due is not None:
+                if now > next_due:
+                    expired.add(url)
+                continue
+
+            last_fetch = last_fetches.get(url)
+            if last_fetch is None:
+                expired.add(url)
+                continue
+
+            # Use provided history instance or the global one from shared
+            if history is None:
+                # Import here to avoid circular imports
+                import shared
+                history = shared.history
+
+            if history.has_expired(url, last_fetch):
+                expired.add(url)
+
+        return expired
 
     def get_all_last_fetches(self, urls):
         """
@@ -215,7 +258,7 @@ class DiskCacheWrapper:
             return all_fetches[url]
         return None
 
-    def set_last_fetch(self, url, timestamp, timeout=None):
+    def set_last_fetch(self, url, timestamp, timeout=None, next_due=None):
         """
         Set the last fetch time for a URL in the shared disk cache.
         
@@ -223,11 +266,21 @@ class DiskCacheWrapper:
             url (str): URL to set last fetch time for
             timestamp (Any): Timestamp to store
             timeout (Optional[int]): Cache expiration time
+            next_due (Optional[datetime.datetime]): When the feed is next due for a refresh.
+                                                  If None, any stored next-due time is cleared
+                                                  and expiry is computed from the timestamp.
         """
         all_fetches = self.get('all_last_fetches') or {}
         all_fetches[url] = timestamp
         self.put('all_last_fetches', all_fetches, timeout)
 
+        all_next_due = self.get('all_next_due') or {}
+        if next_due is None:
+            all_next_due.pop(url, None)
+        else:
+            all_next_due[url] = next_due.timestamp()
+        self.put('all_next_due', all_next_due, timeout)
+
     def clear_last_fetch(self, url):
         """
         Clear the last fetch time for a URL in the shared disk cache.
@@ -295,3 +348,41 @@ class LockBase(ABC):
     def renew(self, timeout_seconds):
         """Renews the lock with a new timeout."""
         pass
+
+
+class LockHeartbeat:
+    """
+    Keeps a lock or lease alive from a background thread while long-running work holds it.
+
+    Usage:
+        with LockHeartbeat(lambda: lock.renew(60), interval=20, name="refresh cycle"):
+            do_slow_work()
+    """
+
+    def __init__(self, renew, interval, name="lock"):
+        """
+        Args:
+            renew (Callable[[], bool]): Extends the lock; returns False if it was lost
+            interval (float): Seconds between renewals, well below the lock timeout
+            name (str): Description used in log messages
+        """
+        self.renew = renew
+        self.interval = interval
+        self.name = name
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self.renew():
+                g_logger.warning(f"Lost {self.name} while still working; another process may take over.")
+                return
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, name=f"heartbeat-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
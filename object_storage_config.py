@@ -18,6 +18,8 @@ STORAGE_ACCESS_KEY = storage_config['access_key']
 STORAGE_SECRET_KEY = storage_config['secret_key']
 STORAGE_HOST = storage_config['host']
 STORAGE_SYNC_PATH = storage_config['sync_path']
+# Whether the provider honors If-Match / If-None-Match on PUT (not all S3-compatible ones do)
+STORAGE_CONDITIONAL_WRITES = storage_config.get('conditional_writes', False)
 
 # Common constants for all object storage modules
 DEFAULT_RETRY_INTERVAL = 1.0  # Base interval for lock acquisition retries
@@ -30,9 +32,17 @@ RETRY_MULTIPLIER = 1.0        # Multiplier for exponential backoff
 # Sync configuration
 SERVER_ID = hashlib.md5(os.uname().nodename.encode()).hexdigest()[:8] if hasattr(os, 'uname') else "default_server_id"
 
+# Cross-server namespace. Publishers write under PUBLISHER_ID and readers pull from
+# FEED_SOURCE_ID, so read-only front-ends can consume feeds produced by a
+# designated fetch node. With no namespace configured, objects use the legacy
+# per-host layout and every server only reads back what it published itself.
+STORAGE_NAMESPACE = storage_config.get('namespace') or ''
+PUBLISHER_ID = storage_config.get('publisher_id') or SERVER_ID
+FEED_SOURCE_ID = storage_config.get('feed_source') or PUBLISHER_ID
+
 # Libcloud imports for availability check and init_storage
 try:
-    from libcloud.storage.types import ContainerDoesNotExistError
+    from libcloud.storage.types import ContainerDoesNotExistError, ObjectDoesNotExistError
     from libcloud.storage.providers import get_driver
     from libcloud.common.types import LibcloudError
     LIBCLOUD_AVAILABLE = True
@@ -157,12 +167,13 @@ def init_storage() -> bool:
     
     return True
 
-def generate_object_name(key: str, prefix: str = "") -> str:
+def generate_object_name(key: str, prefix: str = "", server_id: str = None) -> str:
     """Generate a unique object name for storage.
     
     Args:
         key: Base identifier for the object
         prefix: Optional prefix to add to the path (e.g., 'cache/', 'lock/')
+        server_id: Server the object belongs to, defaults to this server
         
     Returns:
         str: Unique object name with server ID and hash
@@ -177,8 +188,42 @@ def generate_object_name(key: str, prefix: str = "") -> str:
     path_parts = [STORAGE_SYNC_PATH]
     if prefix:
         path_parts.append(prefix)
-    path_parts.extend([SERVER_ID, key_hash])
+    path_parts.extend([server_id or SERVER_ID, key_hash])
     
     return "/".join(path_parts)
 
+def generate_shared_object_name(key: str, publisher: str) -> str:
+    """Generate the object name of published data for a given publisher.
+    
+    Args:
+        key: Base identifier for the object
+        publisher: Identity of the server that publishes the object
+        
+    Returns:
+        str: Object name in the shared namespace, or in the legacy per-host
+             layout if no namespace is configured
+    """
+    if not key:
+        raise ValueError("Key cannot be empty")
+
+    if not STORAGE_NAMESPACE:
+        return f"{STORAGE_SYNC_PATH}bytes/{publisher}/{generate_object_name(key, 'data', server_id=publisher)}"
+
+    key_hash = hashlib.md5(key.encode()).hexdigest()
+    return f"{STORAGE_SYNC_PATH}shared/{STORAGE_NAMESPACE}/{publisher}/{key_hash}"
+
+def generate_lock_object_name(key: str) -> str:
+    """Generate the object name of a lock shared by every server in the namespace.
+
+    Args:
+        key: Lock identifier
+
+    Returns:
+        str: Object name, the same on every server using this namespace
+    """
+    if not key:
+        raise ValueError("Key cannot be empty")
+
+    key_hash = hashlib.md5(key.encode()).hexdigest()
+    return f"{STORAGE_SYNC_PATH}lock/{STORAGE_NAMESPACE or 'default'}/{key_hash}"
 
@@ -18,6 +18,7 @@ from functools import wraps
 import json
 import datetime
 import mimetypes
+import threading
 from shared import g_logger
 
 import unittest
@@ -25,17 +26,18 @@ from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_excep
 
 # Import from object_storage_config
 import object_storage_config as oss_config
-from shared import g_cm
+from shared import g_cm, g_cs, EXPIRE_DAY, EXPIRE_WEEK
 
 from object_storage_config import (
     LIBCLOUD_AVAILABLE, STORAGE_ENABLED,
     init_storage, SERVER_ID, STORAGE_SYNC_PATH,
-    _storage_driver, _storage_container,
+    PUBLISHER_ID, FEED_SOURCE_ID,
     StorageOperationError,
     ConfigurationError,
     StorageConnectionError,
     LibcloudError,
     generate_object_name,
+    generate_shared_object_name,
     MAX_RETRY_ATTEMPTS,
     RETRY_MULTIPLIER,
     MAX_RETRY_INTERVAL
@@ -45,6 +47,10 @@ from object_storage_config import (
 BUCKET_LAST_WRITTEN_KEY = f"{STORAGE_SYNC_PATH}last-written"
 DEFAULT_CACHE_EXPIRY = 300  # 5 minutes in seconds
 
+# smart_fetch outcomes for this process
+_smart_fetch_stats = {'fresh': 0, 'revalidated': 0, 'misses': 0, 'not_found': 0}
+_smart_fetch_stats_lock = threading.Lock()
+
 def generate_file_object_name(file_path: str) -> str:
     """Generate a unique object name for a file
     
@@ -111,6 +117,18 @@ def _init_check():
         raise StorageConnectionError("Failed to initialize storage")
     return True
 
+def _bytes_object_name(key: str, publisher: Optional[str] = None) -> str:
+    """Get the object name that publish_bytes() stores a key under.
+    
+    Args:
+        key: Identifier for the object
+        publisher: Publishing server, defaults to the configured feed source
+        
+    Returns:
+        str: Full object name in the bucket
+    """
+    return generate_shared_object_name(key, publisher or FEED_SOURCE_ID)
+
 def _get_object_metadata(obj: Any) -> Dict:
     """Get S3 metadata from an object.
     
@@ -138,7 +156,7 @@ def _get_object(obj_name: str) -> Optional[Any]:
     try:
         _init_check()
         try:
-            return _storage_container.get_object(object_name=obj_name)
+            return oss_config._storage_container.get_object(object_name=obj_name)
         except oss_config.ObjectDoesNotExistError:
             return None
     except (ConfigurationError, StorageConnectionError, LibcloudError) as e:
@@ -200,9 +218,9 @@ def _update_bucket_last_written():
     try:
         timestamp = str(time.time())
         timestamp_bytes = timestamp.encode('utf-8')
-        _storage_driver.upload_object_via_stream(
+        oss_config._storage_driver.upload_object_via_stream(
             iterator=BytesIO(timestamp_bytes),
-            container=_storage_container,
+            container=oss_config._storage_container,
             object_name=BUCKET_LAST_WRITTEN_KEY
         )
     except (StorageOperationError, LibcloudError) as e:
@@ -232,14 +250,14 @@ def publish_bytes(bytes_data: bytes, key: str) -> Any:
             raise ValueError(f"Invalid bytes data. Type: {type(bytes_data)}, Data: {bytes_data}")
         
         # Generate a safe object key from the key identifier
-        safe_key = generate_object_name(key, "data")
-        object_name = f"{STORAGE_SYNC_PATH}bytes/{SERVER_ID}/{safe_key}"
+        object_name = _bytes_object_name(key, PUBLISHER_ID)
         
         content_stream = BytesIO(bytes_data)
-        obj = _storage_driver.upload_object_via_stream(
+        obj = oss_config._storage_driver.upload_object_via_stream(
             iterator=content_stream,
-            container=_storage_container,
-            object_name=object_name
+            container=oss_config._storage_container,
+            object_name=object_name,
+            extra={'meta_data': {'publisher': PUBLISHER_ID}}
         )
         
         # Update bucket last-written timestamp
@@ -257,20 +275,21 @@ def publish_bytes(bytes_data: bytes, key: str) -> Any:
     retry=retry_if_exception_type((StorageOperationError, LibcloudError)),
     reraise=True
 )
-def fetch_bytes(key: str) -> tuple[Optional[bytes], Optional[Dict]]:
+def fetch_bytes(key: str, publisher: Optional[str] = None) -> tuple[Optional[bytes], Optional[Dict]]:
     """Fetch bytes data from object storage with its metadata.
     
     Args:
         key: Identifier for the object to fetch
+        publisher: Publishing server to read from, defaults to the configured feed source
     
     Returns:
         Tuple containing data and metadata or None values if not found
     """
     try:
-        obj = _get_object(f"{STORAGE_SYNC_PATH}bytes/{SERVER_ID}/{generate_object_name(key, 'data')}")
+        obj = _get_object(_bytes_object_name(key, publisher))
         if obj:
             content_buffer = BytesIO()
-            _storage_driver.download_object_as_stream(obj, content_buffer)
+            oss_config._storage_driver.download_object_as_stream(obj, content_buffer)
             content = content_buffer.getvalue()
             metadata = _get_object_metadata(obj)
             g_logger.info(f"Retrieved {len(content)} bytes for key: {key}")
@@ -288,66 +307,129 @@ def fetch_bytes(key: str) -> tuple[Optional[bytes], Optional[Dict]]:
     retry=retry_if_exception_type((StorageOperationError, LibcloudError)),
     reraise=True
 )
-def smart_fetch(key: str, cache_expiry: int = DEFAULT_CACHE_EXPIRY) -> tuple[Optional[bytes], Optional[Dict]]:
-    """Smart fetch that handles caching and metadata checks using the global cache manager.
+def fetch_bytes_if_changed(key: str, known_hash: Optional[str] = None,
+                           publisher: Optional[str] = None) -> tuple[Optional[bytes], Optional[Dict]]:
+    """Fetch bytes only if the object's hash (ETag) differs from a known one.
+    
+    A metadata request decides whether to download, so an unchanged object costs
+    one round trip and no transfer.
     
     Args:
         key: Identifier for the object to fetch
-        cache_expiry: Optional cache expiry time in seconds (defaults to 5 minutes)
-        
+        known_hash: Hash from the metadata of the last download, if any
+        publisher: Publishing server to read from, defaults to the configured feed source
+    
     Returns:
-        Tuple containing raw bytes and metadata or None values if not found
+        Tuple of (content, metadata). Content is None if the object is unchanged;
+        both are None if the object does not exist.
     """
     try:
-        # Check global cache first
-        memory_key = f"objstorage_cache:{key}"
-        cached_value = g_cm.get(memory_key)
-        if cached_value is not None:
-            return cached_value, None
-
-        # Get object metadata first (lightweight operation)
-        obj = _get_object(f"{STORAGE_SYNC_PATH}bytes/{SERVER_ID}/{generate_object_name(key, 'data')}")
+        obj = _get_object(_bytes_object_name(key, publisher))
         if not obj:
             return None, None
 
         metadata = _get_object_metadata(obj)
-        
-        # Check both bucket last-written and object last-modified timestamps
-        bucket_last_written_obj = _get_object(BUCKET_LAST_WRITTEN_KEY)
-        if bucket_last_written_obj:
-            bucket_last_written_key = f"{memory_key}:bucket_last_written"
-            cached_bucket_last_written = g_cm.get(bucket_last_written_key)
-            cached_object_last_modified = g_cm.get(f"{memory_key}:object_last_modified")
-            
-            if cached_bucket_last_written is not None and cached_object_last_modified is not None:
-                content_buffer = BytesIO()
-                _storage_driver.download_object_as_stream(bucket_last_written_obj, content_buffer)
-                current_bucket_last_written = float(content_buffer.getvalue().decode('utf-8'))
-                
-                # If both timestamps match, we can safely return cached value
-                if (cached_bucket_last_written == current_bucket_last_written and 
-                    cached_object_last_modified == metadata['last_modified']):
-                    return cached_value, None
-
-        # Fetch content if we need to
+        if known_hash is not None and metadata['hash'] == known_hash:
+            return None, metadata
+
         content_buffer = BytesIO()
-        _storage_driver.download_object_as_stream(obj, content_buffer)
-        content = content_buffer.getvalue()
+        oss_config._storage_driver.download_object_as_stream(obj, content_buffer)
+        return content_buffer.getvalue(), metadata
+    except (StorageOperationError, LibcloudError) as e:
+        g_logger.error(f"Error fetching changed bytes for key: {key}, exception: {e}")
+        raise
+
+def _same_version(cached: Dict, current: Dict) -> bool:
+    """Check whether two metadata snapshots describe the same object version.
+    
+    Args:
+        cached: Metadata stored with the cached copy
+        current: Metadata from the latest check
         
-        if not content:
-            return None, None
-            
-        # Cache the results
-        g_cm.set(memory_key, content, ttl=cache_expiry)
+    Returns:
+        bool: True if the cached copy is still current
+    """
+    if cached.get('hash') and current.get('hash'):
+        return cached['hash'] == current['hash']
+    return (cached.get('last_modified') is not None and
+            cached.get('last_modified') == current.get('last_modified') and
+            cached.get('size') == current.get('size'))
+
+def _count_smart_fetch(outcome: str) -> None:
+    """Record the outcome of a smart_fetch call."""
+    with _smart_fetch_stats_lock:
+        _smart_fetch_stats[outcome] += 1
+
+def get_smart_fetch_stats() -> Dict[str, Union[int, float]]:
+    """Get smart_fetch cache counters for this process.
+    
+    Returns:
+        dict: Counts of fresh hits (no request), revalidated hits (metadata
+              request only), misses (downloads) and missing objects, plus the
+              share of calls served from the cache
+    """
+    with _smart_fetch_stats_lock:
+        stats = dict(_smart_fetch_stats)
+    hits = stats['fresh'] + stats['revalidated']
+    total = hits + stats['misses'] + stats['not_found']
+    stats['hit_rate'] = hits / total if total else 0.0
+    return stats
+
+@retry(
+    stop=stop_after_attempt(MAX_RETRY_ATTEMPTS),
+    wait=wait_exponential(multiplier=RETRY_MULTIPLIER, max=MAX_RETRY_INTERVAL),
+    retry=retry_if_exception_type((StorageOperationError, LibcloudError)),
+    reraise=True
+)
+def smart_fetch(key: str, cache_expiry: int = DEFAULT_CACHE_EXPIRY,
+                publisher: Optional[str] = None) -> tuple[Optional[bytes], Optional[Dict]]:
+    """Fetch bytes, revalidating a cached copy instead of downloading it again.
+    
+    Copies are kept in memory and in the shared disk cache together with the
+    object's ETag and last-modified time. A copy checked within cache_expiry is
+    returned without any request. An older copy costs one metadata request: if the
+    object is unchanged the cached bytes are returned, otherwise it is downloaded.
+    
+    Args:
+        key: Identifier for the object to fetch
+        cache_expiry: Seconds a checked copy is trusted without a new check (defaults to 5 minutes)
+        publisher: Publishing server to read from, defaults to the configured feed source
         
-        # Cache both timestamps
-        if bucket_last_written_obj:
+    Returns:
+        Tuple containing raw bytes and metadata or None values if not found
+    """
+    try:
+        cache_key = f"objstorage_cache:{publisher or FEED_SOURCE_ID}:{key}"
+        now = time.time()
+
+        # Memory first, then the copy other processes on this host left in the shared cache
+        entry = g_cm.get(cache_key) or g_cs.get(cache_key)
+        if entry is not None and now - entry['checked'] < cache_expiry:
+            g_cm.set(cache_key, entry, ttl=EXPIRE_DAY)
+            _count_smart_fetch('fresh')
+            return entry['content'], entry['metadata']
+
+        # Get object metadata (lightweight operation)
+        obj = _get_object(_bytes_object_name(key, publisher))
+        if not obj:
+            _count_smart_fetch('not_found')
+            return None, None
+
+        metadata = _get_object_metadata(obj)
+        if entry is not None and _same_version(entry['metadata'], metadata):
+            _count_smart_fetch('revalidated')
+            content = entry['content']
+        else:
             content_buffer = BytesIO()
-            _storage_driver.download_object_as_stream(bucket_last_written_obj, content_buffer)
-            current_bucket_last_written = float(content_buffer.getvalue().decode('utf-8'))
-            g_cm.set(f"{memory_key}:bucket_last_written", current_bucket_last_written, ttl=cache_expiry)
-            g_cm.set(f"{memory_key}:object_last_modified", metadata['last_modified'], ttl=cache_expiry)
-        
+            oss_config._storage_driver.download_object_as_stream(obj, content_buffer)
+            content = content_buffer.getvalue()
+            _count_smart_fetch('misses')
+            if not content:
+                return None, None
+
+        entry = {'content': content, 'metadata': metadata, 'checked': now}
+        g_cm.set(cache_key, entry, ttl=EXPIRE_DAY)
+        g_cs.put(cache_key, entry, timeout=EXPIRE_WEEK)
         return content, metadata
             
     except (StorageOperationError, LibcloudError, TypeError) as e:
@@ -540,9 +622,9 @@ class TestObjectStorageSync(unittest.TestCase):
         
         # Publish with specific content type
         content_stream = BytesIO(test_data)
-        obj = _storage_driver.upload_object_via_stream(
+        obj = oss_config._storage_driver.upload_object_via_stream(
             iterator=content_stream,
-            container=_storage_container,
+            container=oss_config._storage_container,
             object_name=test_key,
             extra={'content_type': 'application/json'}
         )
@@ -30,7 +30,7 @@ from shared import g_logger
 from browser_fetch import (
     BROWSER_TIMEOUT, BROWSER_WAIT_TIMEOUT,
     SharedBrowserManager, get_common_context_options, BrowserErrorHandler,
-    PlaywrightElementExtractor, BrowserUtils
+    PlaywrightElementExtractor, BrowserUtils, PlaywrightBrowserWrapper
 )
 
 # =============================================================================
@@ -112,6 +112,31 @@ def create_browser_context(playwright, use_tor, user_agent):
         g_logger.error(f"Full traceback: {traceback.format_exc()}")
         raise
 
+def create_pooled_browser(use_tor, user_agent):
+    """
+    Launch a long-lived Playwright browser for the browser pool (see browser_pool).
+
+    The wrapper owns the Playwright instance and browser, and gives each fetch a
+    new isolated context. Like all sync Playwright objects, it can only be used
+    from the thread that created it; the pool makes every call on it from that thread.
+
+    Args:
+        use_tor (bool): Whether to use Tor proxy for connections
+        user_agent (str): User agent string to use for requests
+
+    Returns:
+        PlaywrightBrowserWrapper: Browser wrapped in the unified browser interface
+    """
+    playwright = _safe_playwright_start()
+    if not playwright:
+        raise RuntimeError("Failed to start Playwright safely")
+    try:
+        browser, context = create_browser_context(playwright, use_tor, user_agent)
+    except Exception:
+        playwright.stop()
+        raise
+    return PlaywrightBrowserWrapper(browser, context, use_tor, user_agent, playwright=playwright)
+
 # =============================================================================
 # SHARED PLAYWRIGHT BROWSER MANAGEMENT
 # =============================================================================
@@ -0,0 +1,226 @@
+"""
+publish_rate_model.py
+
+Predictive per-feed publish-rate model for refresh scheduling. Estimates how many
+articles each feed publishes in every hour of the week from the `published` times
+of the entries it returns, and turns those rates into refresh times that spend a
+global fetch budget where new articles are most likely.
+
+Scheduling policy: a feed is refreshed once the expected number of articles
+published since its last fetch reaches a threshold c. Every fetch then returns
+about c articles, and c is chosen so that the implied fetch rate across all feeds
+matches the budget: sum(rate_f) / c = fetches per day.
+"""
+
+# =============================================================================
+# STANDARD LIBRARY IMPORTS
+# =============================================================================
+import math
+from datetime import datetime
+
+# =============================================================================
+# THIRD-PARTY IMPORTS
+# =============================================================================
+import numpy as np
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+HOURS_PER_WEEK = 168
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_WEEK = HOURS_PER_WEEK * SECONDS_PER_HOUR
+
+# Exponential forgetting of old observations
+HALF_LIFE_WEEKS = 4.0
+
+# Pseudo-weeks of the feed's average rate blended into every hour slot
+PRIOR_WEEKS = 1.0
+
+# Cap on how far back the first fetch of a feed may extend the observation window
+MAX_INITIAL_WEEKS = 4.0
+
+# =============================================================================
+# OBSERVATION
+# =============================================================================
+
+def hour_of_week(timestamp, tz):
+    """
+    Map a Unix timestamp to its hour-of-week slot (0 = Monday 00:00) in the given timezone.
+
+    Args:
+        timestamp (float): Unix timestamp
+        tz (tzinfo): Timezone defining the local week
+
+    Returns:
+        int: Slot in the range [0, HOURS_PER_WEEK)
+    """
+    dt = datetime.fromtimestamp(timestamp, tz)
+    return dt.weekday() * 24 + dt.hour
+
+
+def observe(feed_data, fetch_time, published, tz):
+    """
+    Fold the publish times of newly seen entries into a feed's model state.
+
+    The state lives in the feed's history dictionary so it is persisted with the
+    rest of FeedHistory:
+    - publish_counts: decayed article counts per hour-of-week slot
+    - observed_weeks: decayed length of the observation window, in weeks
+    - observed_at: Unix timestamp the state was last decayed to
+
+    Args:
+        feed_data (dict): Per-feed history dictionary, updated in place
+        fetch_time (float): Unix timestamp of the fetch
+        published (list): Unix timestamps of the new entries
+        tz (tzinfo): Timezone defining the local week
+    """
+    decay_rate = math.log(2) / (HALF_LIFE_WEEKS * SECONDS_PER_WEEK)
+    counts = feed_data.get("publish_counts") or [0.0] * HOURS_PER_WEEK
+    observed_at = feed_data.get("observed_at")
+
+    if observed_at is None:
+        # The first fetch returns a backlog, so the window starts at the oldest entry
+        oldest = min(published, default=fetch_time)
+        start = max(oldest, fetch_time - MAX_INITIAL_WEEKS * SECONDS_PER_WEEK)
+        elapsed = max(fetch_time - start, 0.0)
+        observed_weeks = (1 - math.exp(-decay_rate * elapsed)) / (decay_rate * SECONDS_PER_WEEK)
+        counts = list(counts)
+    else:
+        elapsed = max(fetch_time - observed_at, 0.0)
+        decay = math.exp(-decay_rate * elapsed)
+        window = (1 - decay) / (decay_rate * SECONDS_PER_WEEK)
+        observed_weeks = feed_data.get("observed_weeks", 0.0) * decay + window
+        counts = [count * decay for count in counts]
+        start = observed_at
+
+    for timestamp in published:
+        # Entries older than the window were already counted or predate the model
+        if observed_at is not None and timestamp <= start:
+            continue
+        age = max(fetch_time - timestamp, 0.0)
+        counts[hour_of_week(timestamp, tz)] += math.exp(-decay_rate * age)
+
+    feed_data["publish_counts"] = counts
+    feed_data["observed_weeks"] = observed_weeks
+    feed_data["observed_at"] = fetch_time
+
+# =============================================================================
+# VECTORIZED RATE ESTIMATION AND SCHEDULING
+# =============================================================================
+
+def rate_matrix(feeds):
+    """
+    Build the expected articles-per-hour matrix for a list of feeds.
+
+    Each slot is smoothed toward the feed's average hourly rate so that sparse
+    feeds do not get zero-rate hours that would never be fetched.
+
+    Args:
+        feeds (list): Per-feed history dictionaries
+
+    Returns:
+        np.ndarray: Array of shape (len(feeds), HOURS_PER_WEEK)
+    """
+    if not feeds:
+        return np.zeros((0, HOURS_PER_WEEK))
+
+    counts = np.array([feed.get("publish_counts") or [0.0] * HOURS_PER_WEEK for feed in feeds], dtype=float)
+    weeks = np.array([feed.get("observed_weeks", 0.0) for feed in feeds], dtype=float)[:, None]
+
+    mean_rate = counts.sum(axis=1, keepdims=True) / (HOURS_PER_WEEK * np.maximum(weeks, PRIOR_WEEKS))
+    return (counts + PRIOR_WEEKS * mean_rate) / (weeks + PRIOR_WEEKS)
+
+
+def budget_threshold(rates, fetches_per_day):
+    """
+    Compute the expected-articles threshold that spends the fetch budget.
+
+    Args:
+        rates (np.ndarray): Output of rate_matrix()
+        fetches_per_day (float): Total refreshes per day allowed across all feeds
+
+    Returns:
+        float: Expected new articles a feed should accumulate before it is refreshed
+    """
+    articles_per_day = rates.sum() / 7
+    return max(articles_per_day / max(fetches_per_day, 1), 1e-3)
+
+
+def expected_new(rates, last_fetch, now, tz):
+    """
+    Expected number of articles published between each feed's last fetch and now.
+
+    Args:
+        rates (np.ndarray): Output of rate_matrix()
+        last_fetch (np.ndarray): Unix timestamps of the last fetch, one per feed
+        now (float): Current Unix timestamp
+        tz (tzinfo): Timezone defining the local week
+
+    Returns:
+        np.ndarray: Expected new articles per feed
+    """
+    last_fetch = np.asarray(last_fetch, dtype=float)
+    elapsed = np.maximum(now - last_fetch, 0.0)
+    horizon = int(math.ceil(elapsed.max() / SECONDS_PER_HOUR)) + 1 if len(elapsed) else 1
+    offsets, cumulative, segment_rates = _cumulative_windows(rates, last_fetch, horizon, tz)
+
+    segment = (offsets <= elapsed[:, None]).sum(axis=1) - 1
+    rows = np.arange(len(last_fetch))
+    previous = np.where(segment > 0, cumulative[rows, segment - 1], 0.0)
+    within = (elapsed - offsets[rows, segment]) / SECONDS_PER_HOUR
+    return previous + segment_rates[rows, segment] * within
+
+
+def next_due(rates, last_fetch, threshold, min_interval, max_interval, tz):
+    """
+    Compute when each feed will have accumulated `threshold` expected articles.
+
+    Args:
+        rates (np.ndarray): Output of rate_matrix()
+        last_fetch (np.ndarray): Unix timestamps of the last fetch, one per feed
+        threshold (float): Output of budget_threshold()
+        min_interval (float): Shortest allowed refresh interval in seconds
+        max_interval (float): Longest allowed refresh interval in seconds
+        tz (tzinfo): Timezone defining the local week
+
+    Returns:
+        np.ndarray: Unix timestamps at which each feed is next due
+    """
+    last_fetch = np.asarray(last_fetch, dtype=float)
+    horizon = int(math.ceil(max_interval / SECONDS_PER_HOUR)) + 1
+    offsets, cumulative, segment_rates = _cumulative_windows(rates, last_fetch, horizon, tz)
+
+    reached = cumulative >= threshold
+    segment = np.argmax(reached, axis=1)
+    rows = np.arange(len(last_fetch))
+    previous = np.where(segment > 0, cumulative[rows, segment - 1], 0.0)
+    rate = segment_rates[rows, segment]
+    within = np.where(rate > 0, (threshold - previous) / np.maximum(rate, 1e-12), 0.0) * SECONDS_PER_HOUR
+
+    interval = np.where(reached.any(axis=1), offsets[rows, segment] + within, max_interval)
+    return last_fetch + np.clip(interval, min_interval, max_interval)
+
+
+def _cumulative_windows(rates, last_fetch, horizon, tz):
+    """
+    Lay out each feed's rates hour by hour starting at its last fetch.
+
+    Segment 0 is the remainder of the hour the fetch happened in, later segments
+    are whole hours.
+
+    Returns:
+        tuple: (segment start offsets in seconds, cumulative expected articles at
+               each segment end, per-segment hourly rate), each of shape (n, horizon)
+    """
+    starts = np.array([hour_of_week(ts, tz) for ts in last_fetch], dtype=int)
+    into_hour = np.mod(last_fetch, SECONDS_PER_HOUR) / SECONDS_PER_HOUR
+
+    slots = (starts[:, None] + np.arange(horizon)[None, :]) % HOURS_PER_WEEK
+    segment_rates = np.take_along_axis(rates, slots, axis=1)
+
+    lengths = np.ones((len(last_fetch), horizon))
+    lengths[:, 0] = 1 - into_hour
+    cumulative = np.cumsum(segment_rates * lengths, axis=1)
+    offsets = (np.cumsum(lengths, axis=1) - lengths) * SECONDS_PER_HOUR
+    return offsets, cumulative, segment_rates
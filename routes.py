@@ -44,6 +44,8 @@ from shared import (
 from weather import get_default_weather_html, init_weather_routes, get_cached_geolocation
 from openrouter_models import get_openrouter_models_shell_html, init_openrouter_models_routes
 from workers import fetch_urls_parallel, fetch_urls_thread
+from frontend_sync import start_frontend_sync
+from leader_election import is_read_only, start_leader_election
 from caching import get_cached_file_content
 from admin_stats import update_performance_stats, get_admin_stats_html, track_rate_limit_event
 from old_headlines import init_old_headlines_routes
@@ -477,6 +479,7 @@ def _register_main_routes(flask_app):
 
         # 1. See if we need to fetch any RSS feeds
         last_fetch_cache = g_c.get_all_last_fetches(page_order)
+        expired_urls = g_c.get_expired(page_order, last_fetches=last_fetch_cache, now=start_time) if ENABLE_BACKGROUND_REFRESH else set()
         for url in page_order:
             rss_info = ALL_URLS.get(url, None)
 
@@ -484,17 +487,18 @@ def _register_main_routes(flask_app):
                 rss_info = RssInfo("Custom.png", "Custom site", url + "HTML")
                 ALL_URLS[url] = rss_info
 
-            last_fetch = last_fetch_cache.get(url)
-            
-            expired_rss = ENABLE_BACKGROUND_REFRESH and g_c.has_feed_expired(url, last_fetch)
-
             if not g_c.has(url):
                 needed_urls.append(url)
-            elif expired_rss:
+            elif url in expired_urls:
                 need_fetch = True
 
-        # 2. Fetch any needed feeds
-        if len(needed_urls) > 0:
+        # 2. Fetch any needed feeds. Read-only nodes never fetch; missing feeds
+        # show as not loaded until the sync loop brings them in.
+        start_leader_election()
+        read_only = is_read_only()
+        if read_only:
+            start_frontend_sync()
+        elif len(needed_urls) > 0:
             # Use current start_time to avoid additional kernel calls for fetch timing
             fetch_urls_parallel(needed_urls)
             # We could calculate fetch time using end_time later, but for now just log the count
@@ -610,7 +614,7 @@ def _register_main_routes(flask_app):
                                default_theme=DEFAULT_THEME)
 
         # Trigger background fetching if needed
-        if need_fetch and ENABLE_BACKGROUND_REFRESH and not is_bot:
+        if need_fetch and ENABLE_BACKGROUND_REFRESH and not is_bot and not read_only:
             fetch_urls_thread()
 
         # Single kernel time call at end and track performance stats
@@ -898,6 +902,9 @@ Sitemap: {request.host_url.rstrip('/')}/sitemap.xml
     @login_required
     def force_refresh_feed():
         """Force refresh a specific RSS feed by marking it as expired."""
+        if is_read_only():
+            return jsonify({'error': 'Feeds are read-only on this server; refresh them on the fetch node'}), 409
+
         try:
             feed_url = request.json.get('feed_url')
             if not feed_url:
@@ -32,7 +32,7 @@ from shared import g_logger
 from browser_fetch import (
     BROWSER_TIMEOUT,
     SharedBrowserManager, get_common_chrome_options,
-    SeleniumElementExtractor
+    SeleniumElementExtractor, SeleniumBrowserWrapper
 )
 
 # =============================================================================
@@ -101,6 +101,19 @@ def create_driver(use_tor, user_agent):
         g_logger.error(f"Full traceback: {traceback.format_exc()}")
         raise
 
+def create_pooled_browser(use_tor, user_agent):
+    """
+    Create a long-lived Chrome driver for the browser pool (see browser_pool).
+    
+    Args:
+        use_tor (bool): Whether to use Tor proxy for connections
+        user_agent (str): User agent string to use for requests
+        
+    Returns:
+        SeleniumBrowserWrapper: Driver wrapped in the unified browser interface
+    """
+    return SeleniumBrowserWrapper(create_driver(use_tor, user_agent), use_tor, user_agent)
+
 # =============================================================================
 # SHARED SELENIUM DRIVER MANAGEMENT
 # =============================================================================
@@ -286,7 +299,8 @@ def fetch_site_posts(url, user_agent):
     
     This function now delegates to the unified browser_fetch implementation
     to eliminate code duplication while maintaining Selenium-specific functionality.
-    Includes automatic cleanup after each request to prevent zombie processes.
+    Drivers come from the browser pool, which recycles them on errors and after
+    a number of pages instead of after every request.
     
     Args:
         url (str): URL of the site to fetch posts from
@@ -303,23 +317,10 @@ def fetch_site_posts(url, user_agent):
         g_logger.debug(f"Calling unified fetch_site_posts for URL: {url}")
         result = unified_fetch_site_posts(url, user_agent)
         g_logger.debug(f"Unified fetch_site_posts completed for URL: {url}")
-        
-        # Force cleanup after each request to prevent zombie processes
-        g_logger.debug(f"Selenium fetch completed for URL: {url}, forcing cleanup")
-        SharedSeleniumDriver.force_cleanup_after_request()
-        g_logger.debug(f"Cleanup completed for URL: {url}")
-        
         return result
         
     except Exception as e:
         g_logger.error(f"Error during Selenium fetch for {url}: {e}")
-        # Ensure cleanup even on error
-        try:
-            g_logger.debug(f"Attempting cleanup after error for URL: {url}")
-            SharedSeleniumDriver.force_cleanup_after_request()
-            g_logger.debug(f"Cleanup after error completed for URL: {url}")
-        except Exception as cleanup_error:
-            g_logger.error(f"Error during cleanup after fetch error: {cleanup_error}")
         
         # Return empty result on error
         return {
@@ -329,4 +330,4 @@ def fetch_site_posts(url, user_agent):
             'feed': {'title': url, 'link': url, 'description': ''},
             'href': url,
             'status': 500
-        }
\ No newline at end of file
+        }
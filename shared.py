@@ -41,6 +41,9 @@ from flask_restful import Api
 # Local application imports
 import FeedHistory
 from SqliteLock import DiskcacheSqliteLock
+from FcntlLock import FcntlLock
+from fetch_budget import FetchBudget
+from feed_leases import FeedLeaseTable
 from models import LockBase, DiskCacheWrapper, RssFeed, g_logger
 from app_config import get_settings_config, get_allowed_domains, get_allowed_requester_domains, get_cdn_config, get_object_store_config, get_welcome_html, get_reports_config, get_storage_config, get_proxy_server, get_proxy_username, get_proxy_password
 from request_utils import get_rate_limit_key, dynamic_rate_limit, get_ip_prefix, format_last_updated
@@ -60,6 +63,15 @@ FLASK_DASHBOARD = False
 # Set to True to use Playwright, False to use Selenium
 USE_PLAYWRIGHT = False
 
+# With Playwright, render pages with the async engine (async_browser.py): one
+# browser on one event loop renders several sites at once, instead of one
+# browser per concurrent fetch
+USE_ASYNC_PLAYWRIGHT = False
+
+# Periodically check whether sites marked needs_selenium also serve their posts
+# in plain HTML or embedded JSON, and fetch them without a browser when they do
+ENABLE_BROWSER_FAST_PATH = True
+
 # =============================================================================
 # CONFIGURATION LOADING AND SETTINGS
 # =============================================================================
@@ -189,6 +201,18 @@ OBJECT_STORE_FEED_TIMEOUT = object_store_config['feed_timeout']
 # Enable publishing feeds to object store when fetched
 ENABLE_OBJECT_STORE_FEED_PUBLISH = object_store_config['enable_publish']
 
+# Read-only front-end: never fetch upstream feeds, only serve what a fetch node
+# published to the object store, pulled every FRONTEND_SYNC_INTERVAL seconds
+READ_ONLY_FRONTEND = object_store_config.get('read_only', False)
+FRONTEND_SYNC_INTERVAL = object_store_config.get('sync_interval', 60)
+
+# Leader election: the node holding the fetch lease fetches and runs auto_update,
+# the others behave as read-only front-ends until it fails to renew the lease
+ENABLE_LEADER_ELECTION = object_store_config.get('leader_election', False)
+LEADER_LEASE_SECONDS = object_store_config.get('leader_lease', 90)
+# Directory shared by all servers to hold the lease instead of the bucket (e.g. NFS)
+LEADER_STORE_PATH = object_store_config.get('leader_store_path', '')
+
 # =============================================================================
 # USER INTERFACE SETTINGS
 # =============================================================================
@@ -210,6 +234,11 @@ INFINITE_SCROLL_DEBUG = True
 #     using RSS / Tor / feedparser logic.
 ENABLE_REDDIT_API_FETCH = False
 
+# With the Reddit API, fetch the due Reddit feeds of a refresh that share a sort
+# in one multireddit listing (r/a+b+c/new) and split the results per feed, instead
+# of one listing call per feed
+ENABLE_REDDIT_BATCH_FETCH = True
+
 # =============================================================================
 # GEOLOCATION SETTINGS
 # =============================================================================
@@ -330,15 +359,34 @@ g_cm = Cache()                    # In-memory cache with per-item TTL
 # LOCK MANAGEMENT
 # =============================================================================
 
-# Shared lock key for global fetch operations
+# Advisory "refresh cycle running" flag; feeds themselves are protected by leases
 GLOBAL_FETCH_MODE_LOCK_KEY = "global_fetch_mode"
 
-# Selectable lock class and factory
+# How long a process may hold a feed before another process can take it over
+FEED_LEASE_SECONDS = 300
+
+# Ownership table of per-feed fetch leases, shared by all instances on the host
+feed_leases = FeedLeaseTable(g_cs.cache, FEED_LEASE_SECONDS)
+
+# =============================================================================
+# HOST-WIDE FETCH BUDGET
+# =============================================================================
+
+# Total feed fetches per minute across every report instance sharing g_cs
+FETCH_BUDGET_PER_MINUTE = 30
+
+# Largest batch of background refreshes allowed at once
+FETCH_BUDGET_BURST = 10
+
+fetch_budget = FetchBudget(g_cs.cache, FETCH_BUDGET_PER_MINUTE, FETCH_BUDGET_BURST)
+
+# Selectable lock class and factory: DiskcacheSqliteLock (polling, expiring) or
+# FcntlLock (blocking flock on files in SPATH/locks, held until release)
 LOCK_CLASS = DiskcacheSqliteLock
 
 def get_lock(lock_name, owner_prefix=None):
     """
-    Get a DiskcacheSqliteLock instance for distributed locking.
+    Get a lock instance of the selected LOCK_CLASS for distributed locking.
     
     Args:
         lock_name: Name of the lock to acquire
@@ -347,17 +395,12 @@ def get_lock(lock_name, owner_prefix=None):
     Returns:
         Lock instance for distributed operations
     """
-    return DiskcacheSqliteLock(lock_name, g_cs.cache, owner_prefix)
-
-# Original factory implementation (commented out for reference):
-# def get_lock(lock_name, owner_prefix=None):
-#     """Factory to get a lock instance using the selected lock class."""
-#     if issubclass(LOCK_CLASS, FileLockWrapper):
-#         return LOCK_CLASS(lock_name)
-#     elif issubclass(LOCK_CLASS, DiskcacheSqliteLock):
-#         return LOCK_CLASS(lock_name, g_cs.cache, owner_prefix)
-#     else:
-#         raise TypeError(f"Unsupported lock class: {LOCK_CLASS}")
+    if issubclass(LOCK_CLASS, FcntlLock):
+        return LOCK_CLASS(lock_name, os.path.join(SPATH, "locks"), owner_prefix)
+    elif issubclass(LOCK_CLASS, DiskcacheSqliteLock):
+        return LOCK_CLASS(lock_name, g_cs.cache, owner_prefix)
+    else:
+        raise TypeError(f"Unsupported lock class: {LOCK_CLASS}")
 
 # =============================================================================
 # CHAT CACHE CONFIGURATION
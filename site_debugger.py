@@ -23,6 +23,8 @@ Usage:
         debugger = SiteDebugger(config)
         result = debugger.debug_selenium()
 
+    - Fetch cost of browser sites (browser vs. plain HTTP fast path):
+        python site_debugger.py
 
 """
 
@@ -680,3 +682,57 @@ class SiteDebugger:
             traceback.print_exc()
             return False
 
+
+
+def fetch_cost_report() -> List[Dict[str, Any]]:
+    """
+    Summarize the fetch cost of every needs_selenium site from its fast-path verdict.
+
+    Uses only the verdicts and timings cached by browser_fetch; nothing is fetched.
+
+    Returns:
+        List of dicts with domain, mode, recall, fetch counts, average seconds per
+        browser and plain fetch, and the browser seconds saved by plain fetches
+    """
+    from shared import CUSTOM_FETCH_CONFIG
+    from browser_fetch import get_fast_path_verdict
+
+    rows = []
+    for domain, site_config in sorted(CUSTOM_FETCH_CONFIG.items()):
+        if not site_config.needs_selenium:
+            continue
+        verdict = get_fast_path_verdict(domain)
+        browser, http = verdict['browser'], verdict['http']
+        browser_avg = browser['seconds'] / browser['fetches'] if browser['fetches'] else None
+        http_avg = http['seconds'] / http['fetches'] if http['fetches'] else None
+        saved = None
+        if browser_avg is not None and http_avg is not None:
+            saved = http['fetches'] * (browser_avg - http_avg)
+        rows.append({
+            'domain': domain,
+            'mode': 'tor (not probed)' if site_config.needs_tor else verdict['mode'],
+            'recall': verdict['recall'],
+            'browser_fetches': browser['fetches'],
+            'browser_avg': browser_avg,
+            'http_fetches': http['fetches'],
+            'http_avg': http_avg,
+            'saved_seconds': saved,
+        })
+    return rows
+
+
+def print_fetch_cost_report() -> None:
+    """Print fetch_cost_report() as a table."""
+    def fmt(value, spec):
+        return format(value, spec) if value is not None else "-"
+
+    print(f"{'Domain':<30} {'Mode':<17} {'Recall':>6} {'Browser':>8} {'Avg s':>6} {'HTTP':>6} {'Avg s':>6} {'Saved s':>8}")
+    print("-" * 95)
+    for row in fetch_cost_report():
+        print(f"{row['domain']:<30} {row['mode']:<17} {fmt(row['recall'], '.2f'):>6} "
+              f"{row['browser_fetches']:>8} {fmt(row['browser_avg'], '.1f'):>6} "
+              f"{row['http_fetches']:>6} {fmt(row['http_avg'], '.1f'):>6} {fmt(row['saved_seconds'], '.0f'):>8}")
+
+
+if __name__ == "__main__":
+    print_fetch_cost_report()
@@ -0,0 +1,272 @@
+"""
+story_index.py
+
+Cheap cross-feed duplicate detection for headlines. Titles are reduced to 64-bit
+SimHash fingerprints over word shingles and stored in a banded index, so the same
+story showing up in several boxes (HN, Slashdot, LXer, Reddit, ...) is clustered
+in microseconds per entry without an embedding model.
+
+The index is kept in the per-report cache and updated by load_url_worker, one key
+per story and one per band, each expiring on its own. A feed fetch reads and writes
+only the keys of its own entries, so workers never rewrite or lock the whole index.
+Entries that repeat a story already seen in another feed get a `duplicate_of` key
+holding the link of the first copy, which pages can use to mark or collapse them.
+"""
+
+# =============================================================================
+# STANDARD LIBRARY IMPORTS
+# =============================================================================
+import hashlib
+import re
+import time
+
+# =============================================================================
+# THIRD-PARTY IMPORTS
+# =============================================================================
+import numpy as np
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+# Cache key prefixes for stories (link -> entry) and bands (band -> links)
+STORY_KEY_PREFIX = "story:"
+STORY_BAND_PREFIX = "story_band:"
+
+# Fingerprints within this Hamming distance are the same story
+MAX_DISTANCE = 3
+
+# 64 bits split into MAX_DISTANCE + 1 bands: any pair within MAX_DISTANCE shares a band
+BAND_BITS = 16
+BAND_MASK = (1 << BAND_BITS) - 1
+BANDS = 64 // BAND_BITS
+
+# Titles shorter than this are too generic to fingerprint reliably
+MIN_TOKENS = 4
+
+# Forget stories first seen longer ago than this
+MAX_AGE_SECONDS = 3 * 86400
+
+STOPWORDS = frozenset((
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in",
+    "is", "it", "its", "of", "on", "or", "that", "the", "this", "to", "was", "with",
+))
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# =============================================================================
+# FINGERPRINTING
+# =============================================================================
+
+def tokenize(title):
+    """
+    Normalize a title into lowercase word tokens without stopwords or punctuation.
+
+    Args:
+        title (str): Headline text
+
+    Returns:
+        list: Tokens in title order
+    """
+    return [token for token in _TOKEN_RE.findall(title.lower()) if token not in STOPWORDS]
+
+
+def simhash(title):
+    """
+    Compute the 64-bit SimHash of a title over unigrams and bigrams.
+
+    Args:
+        title (str): Headline text
+
+    Returns:
+        Optional[int]: Fingerprint, or None if the title is too short to fingerprint
+    """
+    tokens = tokenize(title or "")
+    if len(tokens) < MIN_TOKENS:
+        return None
+
+    # blake2b rather than hash(), which is salted per process
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    digests = b"".join(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest() for feature in features)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(len(features), 8), axis=1, bitorder="little")
+    majority = np.packbits(2 * bits.sum(axis=0) > len(features), bitorder="little")
+    return int.from_bytes(majority.tobytes(), "little")
+
+
+def hamming(a, b):
+    """Number of differing bits between two fingerprints."""
+    return bin(a ^ b).count("1")
+
+# =============================================================================
+# INDEX
+# =============================================================================
+
+class StoryIndex:
+    """
+    Banded SimHash index clustering near-identical titles from different sources.
+
+    Attributes:
+        entries (dict): link -> (fingerprint, source, canonical link, first seen,
+                        source of the canonical link)
+        bands (dict): (band number, band value) -> set of links
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.bands = {}
+
+    def _band_keys(self, fingerprint):
+        return [(band, (fingerprint >> (band * BAND_BITS)) & BAND_MASK) for band in range(BANDS)]
+
+    def add(self, link, title, source, now=None):
+        """
+        Add a headline and return the story it duplicates, if any.
+
+        Args:
+            link (str): Article link, the identity of the entry
+            title (str): Headline text
+            source (str): Feed the entry came from; only other sources count as duplicates
+            now (Optional[float]): Current Unix timestamp
+
+        Returns:
+            Optional[str]: Link of the first-seen copy of this story from another
+                           source, or None if this entry is the first copy
+        """
+        known = self._get_entry(link)
+        if known is not None:
+            if known[1] != source:
+                return known[2]  # The same article carried by another feed
+            return known[2] if known[2] != link else None
+
+        fingerprint = simhash(title)
+        if fingerprint is None:
+            return None
+        if now is None:
+            now = time.time()
+
+        canonical, canonical_seen, canonical_source = link, now, source
+        keys = self._band_keys(fingerprint)
+        for key in keys:
+            for other_fp, other_source, other_canonical, other_seen, first_source in self._band_members(key, now):
+                if other_source == source or other_seen >= canonical_seen or hamming(fingerprint, other_fp) > MAX_DISTANCE:
+                    continue
+                # A story first seen in this same feed is not a cross-feed duplicate
+                if first_source == source:
+                    continue
+                canonical, canonical_seen, canonical_source = other_canonical, other_seen, first_source
+
+        self._put(link, (fingerprint, source, canonical, now, canonical_source), keys)
+        return canonical if canonical != link else None
+
+    def _get_entry(self, link):
+        return self.entries.get(link)
+
+    def _band_members(self, key, now):
+        return [self.entries[other] for other in self.bands.get(key, ())]
+
+    def _put(self, link, entry, keys):
+        self.entries[link] = entry
+        for key in keys:
+            self.bands.setdefault(key, set()).add(link)
+
+    def prune(self, now=None):
+        """
+        Drop stories first seen more than MAX_AGE_SECONDS ago.
+
+        Args:
+            now (Optional[float]): Current Unix timestamp
+        """
+        if now is None:
+            now = time.time()
+        cutoff = now - MAX_AGE_SECONDS
+        for link in [link for link, entry in self.entries.items() if entry[3] < cutoff]:
+            fingerprint = self.entries.pop(link)[0]
+            for key in self._band_keys(fingerprint):
+                members = self.bands.get(key)
+                if members is not None:
+                    members.discard(link)
+                    if not members:
+                        del self.bands[key]
+
+
+class CachedStoryIndex(StoryIndex):
+    """
+    StoryIndex stored in a diskcache.Cache, shared by every process of a report.
+
+    Each story and each band is its own key expiring MAX_AGE_SECONDS after it was
+    last written, which replaces prune(). Bands hold the entries of their stories,
+    so a lookup reads only the band keys; entries older than MAX_AGE_SECONDS are
+    skipped on lookup and dropped when the band is next written.
+    """
+
+    def __init__(self, cache):
+        """
+        Args:
+            cache (diskcache.Cache): Per-report cache holding the index keys
+        """
+        self.cache = cache
+
+    def _get_entry(self, link):
+        return self.cache.get(STORY_KEY_PREFIX + str(link))
+
+    def _band_members(self, key, now):
+        cutoff = now - MAX_AGE_SECONDS
+        members = self.cache.get(f"{STORY_BAND_PREFIX}{key[0]}:{key[1]}") or ()
+        return [entry for _, entry in members if entry[3] >= cutoff]
+
+    def _put(self, link, entry, keys):
+        cutoff = entry[3] - MAX_AGE_SECONDS
+        # One short transaction per story, so concurrent workers do not drop each other's links
+        with self.cache.transact():
+            self.cache.set(STORY_KEY_PREFIX + str(link), entry, expire=MAX_AGE_SECONDS)
+            for band, value in keys:
+                band_key = f"{STORY_BAND_PREFIX}{band}:{value}"
+                members = [(other, other_entry) for other, other_entry in self.cache.get(band_key) or ()
+                           if other != link and other_entry[3] >= cutoff]
+                members.append((link, entry))
+                self.cache.set(band_key, tuple(members), expire=MAX_AGE_SECONDS)
+
+    def prune(self, now=None):
+        """Nothing to do: the cache expires story and band keys itself."""
+
+# =============================================================================
+# PUBLIC HELPERS
+# =============================================================================
+
+def mark_duplicates(cache, feed_url, entries):
+    """
+    Add a feed's entries to the shared index and tag cross-feed duplicates.
+
+    Sets `duplicate_of` on entries that repeat a story from another feed and
+    removes it from entries that are the first copy.
+
+    Args:
+        cache (diskcache.Cache): Per-report cache holding the index
+        feed_url (str): URL of the feed the entries belong to
+        entries (list): Feed entries with 'link' and 'title' keys, updated in place
+    """
+    now = time.time()
+    index = CachedStoryIndex(cache)
+    for entry in entries:
+        duplicate_of = index.add(entry.get('link'), entry.get('title'), feed_url, now)
+        if duplicate_of:
+            entry['duplicate_of'] = duplicate_of
+        else:
+            entry.pop('duplicate_of', None)
+
+
+def collapse_duplicates(articles):
+    """
+    Drop articles whose titles repeat an earlier article in the list.
+
+    Stateless variant used before the embedding-based deduplication in auto_update,
+    so near-identical headlines from several feeds are embedded only once.
+
+    Args:
+        articles (list): Article dictionaries with 'title' and 'url' keys
+
+    Returns:
+        list: Articles with later near-duplicates removed, order preserved
+    """
+    index = StoryIndex()
+    return [article for article in articles if index.add(article["url"], article["title"], article["url"]) is None]
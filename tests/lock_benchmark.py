@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+lock_benchmark.py
+
+Contention benchmark comparing DiskcacheSqliteLock with FcntlLock. Several
+processes repeatedly acquire the same lock with wait=True, hold it briefly and
+release it. Reports throughput, wait latency percentiles, and CPU time spent,
+which shows the cost of polling versus sleeping in the kernel.
+
+Usage:
+    python tests/lock_benchmark.py [--processes N] [--iterations N] [--hold-ms N]
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import diskcache
+
+from FcntlLock import FcntlLock
+from SqliteLock import DiskcacheSqliteLock
+
+
+def make_lock(backend, directory):
+    """Create a fresh lock instance for the given backend."""
+    if backend == "sqlite":
+        return DiskcacheSqliteLock("bench_lock", diskcache.Cache(directory))
+    return FcntlLock("bench_lock", directory)
+
+
+def worker(backend, directory, iterations, hold_seconds, start_event, results):
+    """Acquire and release the shared lock `iterations` times, recording waits."""
+    lock = make_lock(backend, directory)
+    waits = []
+    start_event.wait()
+    cpu_start = time.process_time()
+    for _ in range(iterations):
+        requested = time.perf_counter()
+        if not lock.acquire(timeout_seconds=60, wait=True):
+            continue
+        waits.append(time.perf_counter() - requested)
+        time.sleep(hold_seconds)
+        lock.release()
+    results.put((waits, time.process_time() - cpu_start))
+
+
+def run(backend, processes, iterations, hold_seconds):
+    """Run one backend and print its results."""
+    with tempfile.TemporaryDirectory() as directory:
+        start_event = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=worker, args=(backend, directory, iterations, hold_seconds, start_event, results))
+            for _ in range(processes)
+        ]
+        for p in workers:
+            p.start()
+
+        wall_start = time.perf_counter()
+        start_event.set()
+        collected = [results.get() for _ in workers]
+        wall = time.perf_counter() - wall_start
+        for p in workers:
+            p.join()
+
+    waits = sorted(w for ws, _ in collected for w in ws)
+    cpu = sum(c for _, c in collected)
+    acquired = len(waits)
+    p50 = statistics.median(waits) * 1000 if waits else 0.0
+    p99 = waits[int(len(waits) * 0.99) - 1] * 1000 if waits else 0.0
+    print(f"{backend:8} {acquired:9d} {acquired / wall:10.1f} {p50:10.2f} {p99:10.2f} {cpu:10.2f}")
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Lock contention benchmark.")
+    parser.add_argument("--processes", type=int, default=max(4, os.cpu_count() or 1))
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--hold-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    print(f"Processes: {args.processes}  Iterations each: {args.iterations}  Hold: {args.hold_ms} ms")
+    print(f"{'Backend':8} {'Acquired':>9} {'Per sec':>10} {'p50 ms':>10} {'p99 ms':>10} {'CPU s':>10}")
+    print("-" * 62)
+    for backend in ("sqlite", "fcntl"):
+        run(backend, args.processes, args.iterations, args.hold_ms / 1000)
+
+
+if __name__ == "__main__":
+    main()
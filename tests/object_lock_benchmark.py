@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+object_lock_benchmark.py
+
+Compares ObjectStorageLock acquisition with conditional writes against the
+unconditional read-write-verify fallback. A LocalLockStore with simulated
+network latency stands in for an S3-compatible service: each request sleeps
+half a round trip before and after it takes effect, with random jitter.
+
+Every round, several contenders try to take a fresh lock at the same moment.
+Reports the latency of an acquire attempt, and the race rate: the share of
+rounds in which more than one contender believed it held the lock.
+
+Usage:
+    python tests/object_lock_benchmark.py [--contenders N] [--rounds N] [--rtt-ms N] [--jitter-ms N]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ObjectStorageLock import LocalLockStore, ObjectStorageLock
+
+
+class LatencyStore:
+    """Wraps a store, delaying each request like a round trip to object storage."""
+
+    def __init__(self, inner, rtt, jitter):
+        self.inner = inner
+        self.supports_conditional_writes = inner.supports_conditional_writes
+        self.rtt = rtt
+        self.jitter = jitter
+
+    def _request(self, operation, *args):
+        time.sleep(max(0.0, self.rtt / 2 + random.uniform(-self.jitter, self.jitter)))
+        result = operation(*args)
+        time.sleep(max(0.0, self.rtt / 2 + random.uniform(-self.jitter, self.jitter)))
+        return result
+
+    def read(self, name):
+        return self._request(self.inner.read, name)
+
+    def write(self, name, data):
+        return self._request(self.inner.write, name, data)
+
+    def write_if(self, name, data, etag):
+        return self._request(self.inner.write_if, name, data, etag)
+
+
+def run(conditional, contenders, rounds, rtt, jitter):
+    """Run one acquisition mode and print its results."""
+    latencies = []
+    races = 0
+    with tempfile.TemporaryDirectory() as root:
+        store = LatencyStore(LocalLockStore(root, conditional_writes=conditional), rtt, jitter)
+        for round_number in range(rounds):
+            barrier = threading.Barrier(contenders)
+            winners = []
+            guard = threading.Lock()
+
+            def contend():
+                lock = ObjectStorageLock(f"bench-{round_number}", store=store)
+                barrier.wait()
+                started = time.perf_counter()
+                acquired = lock.acquire(timeout_seconds=60)
+                elapsed = time.perf_counter() - started
+                with guard:
+                    latencies.append(elapsed)
+                    if acquired:
+                        winners.append(lock)
+
+            threads = [threading.Thread(target=contend) for _ in range(contenders)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            if len(winners) > 1:
+                races += 1
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    mode = "conditional" if conditional else "fallback"
+    print(f"{mode:12} {p50:10.1f} {p99:10.1f} {races:8d} {100 * races / rounds:9.1f}%")
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Object storage lock acquisition benchmark.")
+    parser.add_argument("--contenders", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"Contenders: {args.contenders}  Rounds: {args.rounds}  RTT: {args.rtt_ms} ms +/- {args.jitter_ms} ms")
+    print(f"{'Mode':12} {'p50 ms':>10} {'p99 ms':>10} {'Races':>8} {'Race rate':>10}")
+    print("-" * 54)
+    for conditional in (True, False):
+        run(conditional, args.contenders, args.rounds, args.rtt_ms / 1000, args.jitter_ms / 1000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+parser_benchmark.py
+
+Benchmark of the HTML parsing backends in html_parsing over real pages saved by
+site_debugger runs (the <site>_debug_<timestamp>.html files). For each installed
+backend it times the work scraping and image discovery do on a page: parsing,
+selecting links and headings, and collecting image candidates. Reports the time
+per page and the speedup over BeautifulSoup.
+
+Usage:
+    python tests/parser_benchmark.py [--pages GLOB ...] [--repeat N]
+"""
+
+import argparse
+import glob
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import html_parsing
+import image_fetch
+
+# Selectors typical of the site configs in *_report_settings.py
+SELECTORS = ["article", "h2 a", "a[href*='/20']", "div.post a", "li a"]
+
+
+def scrape(parser, html):
+    """Parse a page and run the selectors a scrape would."""
+    document = parser.parse(html)
+    found = 0
+    for selector in SELECTORS:
+        for element in parser.find_elements(document, selector):
+            parser.get_text(element)
+            parser.get_attribute(element, "href")
+            found += 1
+    return found
+
+
+def run(backend, pages, repeat):
+    """Time one backend over every page, returning the median seconds per page."""
+    html_parsing.HTML_PARSER_BACKEND = backend
+    parser = html_parsing.get_html_parser(backend)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path, html in pages:
+            scrape(parser, html)
+            image_fetch.parse_images_requests(html, "file://" + path)
+        timings.append((time.perf_counter() - start) / len(pages))
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML parser backend benchmark.")
+    parser.add_argument("--pages", nargs="+", default=["*_debug_*.html", "tests/*_debug_*.html"],
+                        help="Glob patterns of saved pages (default: site_debugger output)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs over all pages per backend")
+    args = parser.parse_args()
+
+    paths = sorted({path for pattern in args.pages for path in glob.glob(pattern)})
+    if not paths:
+        print("No saved pages found; save some with SiteDebugger (save_html=True) first.")
+        return
+    pages = []
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            pages.append((path, f.read()))
+    size = sum(len(html) for _, html in pages) / len(pages) / 1024
+    print(f"{len(pages)} pages, {size:.0f} KB on average, median of {args.repeat} runs\n")
+
+    results = {backend: run(backend, pages, args.repeat) for backend in html_parsing.available_backends()}
+    baseline = results["beautifulsoup"]
+    print(f"{'Backend':<15} {'ms/page':>10} {'Speedup':>9}")
+    for backend, seconds in results.items():
+        print(f"{backend:<15} {seconds * 1000:>10.2f} {baseline / seconds:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
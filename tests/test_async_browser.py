@@ -0,0 +1,124 @@
+"""
+test_async_browser.py
+
+Tests for the async Playwright engine: fetches submitted from several worker
+threads render concurrently as pages of one browser, up to the parallelism
+limit, and the rendered HTML is parsed with the site's selectors.
+"""
+
+import asyncio
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add the parent directory to Python path when running tests directly
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app_config import FetchConfig
+from async_browser import AsyncBrowserEngine
+
+CONFIG = FetchConfig(needs_selenium=True, post_container="div.post", title_selector="a", link_selector="a")
+
+
+class FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+        self.url = None
+
+    async def goto(self, url, timeout):
+        self.url = url
+        self.browser.active += 1
+        self.browser.peak = max(self.browser.peak, self.browser.active)
+        await asyncio.sleep(0.05)
+        self.browser.active -= 1
+        return SimpleNamespace(status=404 if url.endswith("/missing") else 200)
+
+    async def wait_for_selector(self, selector, timeout):
+        return True
+
+    async def content(self):
+        return f'<div class="post"><a href="{self.url}/story">Story from {self.url}</a></div>'
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def route(self, pattern, handler):
+        pass
+
+    async def new_page(self):
+        return FakePage(self.browser)
+
+    async def close(self):
+        self.browser.contexts_closed += 1
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.contexts_closed = 0
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **options):
+        return FakeContext(self)
+
+    async def close(self):
+        self.connected = False
+
+
+class Launcher:
+    def __init__(self):
+        self.browsers = []
+
+    async def __call__(self):
+        browser = FakeBrowser()
+        self.browsers.append(browser)
+        return SimpleNamespace(stop=self.stop), browser
+
+    async def stop(self):
+        pass
+
+
+@pytest.fixture
+def launcher():
+    return Launcher()
+
+
+def test_threads_share_one_browser_up_to_the_page_limit(launcher):
+    engine = AsyncBrowserEngine(launcher, max_pages=3)
+    urls = [f"https://site{i}.example.com" for i in range(8)]
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda url: engine.fetch(url, CONFIG, "UA"), urls))
+    finally:
+        engine.close()
+
+    assert len(launcher.browsers) == 1
+    browser = launcher.browsers[0]
+    assert browser.peak == 3 and browser.contexts_closed == len(urls)
+    for url, (entries, status) in zip(urls, results):
+        assert status == 200 and [entry["link"] for entry in entries] == [f"{url}/story"]
+    assert engine.stats() == {'running': False, 'active_pages': 0, 'pages_rendered': len(urls)}
+
+
+def test_error_status_and_relaunch_after_disconnect(launcher):
+    engine = AsyncBrowserEngine(launcher)
+    try:
+        assert engine.fetch("https://example.com/missing", CONFIG, "UA") == ([], 404)
+        launcher.browsers[0].connected = False
+        entries, status = engine.fetch("https://example.com", CONFIG, "UA")
+    finally:
+        engine.close()
+
+    assert status == 200 and len(entries) == 1
+    assert len(launcher.browsers) == 2
+    assert not any(thread.name == "async-browser" for thread in threading.enumerate())
@@ -0,0 +1,217 @@
+"""
+test_browser_pool.py
+
+Tests for the browser pool: browsers are reused across fetches, recycled after
+errors or too many pages, health checked when idle, and shared by concurrent
+fetches without a process-wide lock. Thread-bound browsers are only used from
+their owner thread, whichever fetch thread checks them out. The watchdog
+recycles browsers past the memory limit.
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add the parent directory to Python path when running tests directly
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import browser_fetch
+import browser_pool
+from browser_pool import BrowserPool
+
+
+class FakeBrowser:
+    thread_bound = False
+
+    def __init__(self, use_tor, user_agent):
+        self.use_tor = use_tor
+        self.user_agent = user_agent
+        self.resets = 0
+        self.closed = False
+        self.valid = True
+        self.pid = 1000 + id(self) % 1000
+
+    def process_id(self):
+        return self.pid
+
+    def reset(self):
+        self.resets += 1
+
+    def is_valid(self):
+        return self.valid
+
+    def close(self):
+        self.closed = True
+
+
+class ThreadBoundBrowser(FakeBrowser):
+    """Fails like sync Playwright when used from a thread other than its creator."""
+
+    thread_bound = True
+
+    def __init__(self, use_tor, user_agent):
+        super().__init__(use_tor, user_agent)
+        self.thread = threading.current_thread()
+
+    def check_thread(self):
+        if threading.current_thread() is not self.thread:
+            raise RuntimeError("used from another thread")
+
+    def reset(self):
+        self.check_thread()
+        super().reset()
+
+    def close(self):
+        self.check_thread()
+        super().close()
+
+
+class Factory:
+    def __init__(self, browser_class=FakeBrowser):
+        self.browser_class = browser_class
+        self.browsers = []
+
+    def __call__(self, use_tor, user_agent):
+        browser = self.browser_class(use_tor, user_agent)
+        self.browsers.append(browser)
+        return browser
+
+
+@pytest.fixture
+def factory():
+    return Factory()
+
+
+def test_browsers_are_reused_and_reset_between_fetches(factory):
+    pool = BrowserPool(factory, size=2)
+
+    for _ in range(5):
+        browser = pool.checkout(False, "UA")
+        pool.checkin(browser)
+
+    assert len(factory.browsers) == 1
+    assert factory.browsers[0].resets == 4  # a new browser starts clean
+    assert pool.stats() == {'browsers': 1, 'busy': 0, 'started': 1, 'recycled': 0}
+
+
+def test_recycled_after_failure_and_page_limit(factory, monkeypatch):
+    monkeypatch.setattr(browser_pool, "MAX_PAGES_PER_BROWSER", 3)
+    pool = BrowserPool(factory, size=1)
+
+    pool.checkin(pool.checkout(False, "UA"), failed=True)
+    assert factory.browsers[0].closed
+
+    for _ in range(3):
+        pool.checkin(pool.checkout(False, "UA"))
+    assert factory.browsers[1].closed
+    assert pool.stats()['browsers'] == 0
+
+
+def test_concurrent_checkouts_use_separate_browsers(factory):
+    pool = BrowserPool(factory, size=2)
+    first = pool.checkout(False, "UA")
+    second = pool.checkout(False, "UA")
+    assert first is not second
+
+    # A third fetch waits for a browser instead of failing at once
+    assert pool.checkout(False, "UA", timeout=0.1) is None
+    threading.Timer(0.1, pool.checkin, args=(first,)).start()
+    assert pool.checkout(False, "UA", timeout=5) is first
+
+
+def test_other_configuration_replaces_idle_browser(factory):
+    pool = BrowserPool(factory, size=1)
+    pool.checkin(pool.checkout(False, "UA"))
+
+    tor_browser = pool.checkout(True, "UA")
+
+    assert factory.browsers[0].closed
+    assert tor_browser.use_tor
+
+
+def test_unresponsive_idle_browser_is_replaced(factory, monkeypatch):
+    pool = BrowserPool(factory, size=1)
+    pool.checkin(pool.checkout(False, "UA"))
+    factory.browsers[0].valid = False
+    monkeypatch.setattr(browser_pool, "HEALTH_CHECK_AFTER_IDLE", 0)
+    time.sleep(0.01)
+
+    assert pool.checkout(False, "UA") is factory.browsers[1]
+    assert factory.browsers[0].closed
+
+
+def test_fetch_site_posts_returns_browser_to_pool(factory, monkeypatch):
+    pool = BrowserPool(factory, size=1)
+    monkeypatch.setattr(browser_fetch, "browser_pool", pool)
+    config = SimpleNamespace(needs_selenium=True, needs_tor=False, use_random_user_agent=False)
+    monkeypatch.setattr(browser_fetch, "get_site_config", lambda url: (config, "example.com"))
+    statuses = iter([200, 500, 200])
+    monkeypatch.setattr(browser_fetch, "_fetch_with_browser",
+                        lambda url, config, user_agent, browser: ([], next(statuses)))
+
+    for _ in range(3):
+        browser_fetch.fetch_site_posts("https://example.com/", "UA")
+
+    # The failed fetch recycled the first browser; the others reused a warm one
+    assert len(factory.browsers) == 2
+    assert factory.browsers[0].closed and not factory.browsers[1].closed
+
+
+def test_watchdog_recycles_browsers_over_memory_limit(factory, monkeypatch):
+    pool = BrowserPool(factory, size=2, watchdog_interval=None)
+    idle, busy = pool.checkout(False, "UA"), pool.checkout(False, "UA")
+    pool.checkin(idle)
+    monkeypatch.setattr(browser_pool, "process_tree_rss_mb", lambda pid: 10 * browser_pool.MAX_BROWSER_RSS_MB)
+
+    pool.check_limits()
+    assert idle.closed and not busy.closed  # a busy browser finishes its fetch first
+
+    pool.checkin(busy)
+    assert busy.closed and pool.stats()['browsers'] == 0
+
+
+def test_thread_bound_browsers_are_shared_by_more_threads_than_slots():
+    factory = Factory(ThreadBoundBrowser)
+    pool = BrowserPool(factory, size=2, watchdog_interval=None)
+
+    def fetch(_):
+        browser = pool.checkout(False, "UA", timeout=5)
+        assert browser is not None
+        try:
+            # Slow enough that the third thread must wait for a browser of another thread
+            return pool.run(browser, lambda: (browser.check_thread(), time.sleep(0.05)))
+        finally:
+            pool.checkin(browser)
+
+    # Each refresh cycle uses new threads, as workers does
+    for _ in range(3):
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            list(executor.map(fetch, range(3)))
+
+    # The two browsers stayed warm across cycles and were never used off their owner thread
+    assert len(factory.browsers) == 2
+    assert pool.stats() == {'browsers': 2, 'busy': 0, 'started': 2, 'recycled': 0}
+    assert all(browser.resets >= 1 for browser in factory.browsers)
+
+
+def test_watchdog_closes_thread_bound_browsers_on_their_owner_thread(monkeypatch):
+    factory = Factory(ThreadBoundBrowser)
+    pool = BrowserPool(factory, size=2, watchdog_interval=None)
+
+    worker = threading.Thread(target=lambda: pool.checkin(pool.checkout(False, "UA")))
+    worker.start()
+    worker.join()
+
+    # The browser outlives the thread that checked it out
+    browser = pool.checkout(False, "UA")
+    assert browser is factory.browsers[0]
+    pool.checkin(browser)
+
+    monkeypatch.setattr(browser_pool, "MAX_BROWSER_AGE", 0)
+    pool.check_limits()
+    assert browser.closed and pool.stats()['browsers'] == 0
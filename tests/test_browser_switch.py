@@ -15,7 +15,7 @@ from pathlib import Path
 # Add the parent directory to Python path when running tests directly
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from browser_fetch import fetch_site_posts, cleanup_browsers, get_shared_driver, acquire_fetch_lock, release_fetch_lock
+from browser_fetch import fetch_site_posts, cleanup_browsers, get_shared_driver, browser_pool
 from shared import USE_PLAYWRIGHT, g_logger
 
 # Test configuration
@@ -121,31 +121,26 @@ def test_shared_driver_functionality():
         print(f"Traceback: {traceback.format_exc()}")
         return False
 
-def test_fetch_lock_functionality():
-    """Test fetch lock functionality."""
+def test_browser_pool_functionality():
+    """Test that fetches return their browsers to the pool."""
     print("\n" + "=" * 60)
-    print("TEST 4: Fetch Lock Functionality")
+    print("TEST 4: Browser Pool Functionality")
     print("=" * 60)
     
     try:
-        print("Testing fetch lock acquisition...")
-        lock_acquired = acquire_fetch_lock()
+        stats = browser_pool.stats()
+        print(f"Browser pool stats: {stats}")
         
-        if lock_acquired:
-            print("PASS: Fetch lock acquired successfully")
-            
-            # Test that we can release the lock
-            release_fetch_lock()
-            print("PASS: Fetch lock released successfully")
-            
-            print("PASS: Fetch lock functionality test PASSED")
+        if stats['busy'] == 0:
+            print("PASS: No browsers left checked out after fetching")
+            print("PASS: Browser pool functionality test PASSED")
             return True
         else:
-            print("FAIL: Failed to acquire fetch lock")
+            print(f"FAIL: {stats['busy']} browsers still checked out")
             return False
             
     except Exception as e:
-        print(f"FAIL: Fetch lock functionality test FAILED: {e}")
+        print(f"FAIL: Browser pool functionality test FAILED: {e}")
         import traceback
         print(f"Traceback: {traceback.format_exc()}")
         return False
@@ -210,7 +205,7 @@ def run_all_tests():
         test_browser_engine_detection,
         test_fetch_functionality,
         test_shared_driver_functionality,
-        test_fetch_lock_functionality,
+        test_browser_pool_functionality,
         test_cleanup_functionality,
         test_engine_switching,
     ]
@@ -0,0 +1,119 @@
+"""
+test_fast_path.py
+
+Tests for the browser-free fast path: needs_selenium sites are probed with a
+plain fetch after a browser fetch, and fetched without a browser while the
+cached per-domain verdict says the same posts are in the HTML or embedded JSON.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add the parent directory to Python path when running tests directly
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import browser_fetch
+from app_config import FetchConfig
+from models import DiskCacheWrapper
+
+URL = "https://example.com/news"
+CONFIG = FetchConfig(needs_selenium=True, post_container="div.post", title_selector="a", link_selector="a")
+LINKS = [f"https://example.com/2025/story-{i}" for i in range(5)]
+
+
+def post_html(links):
+    return "".join(f'<div class="post"><a href="{link}">Story about {link[-1]}</a></div>' for link in links)
+
+
+def next_data_html(links):
+    data = {"props": {"pageProps": {"nav": [{"title": "Home", "url": "/"}],
+                                    "posts": [{"title": f"Story about {link[-1]}", "url": link} for link in links]}}}
+    return f'<div id="root"></div><script id="__NEXT_DATA__" type="application/json">{json.dumps(data)}</script>'
+
+
+class FakeSite:
+    """Serves a fixed page to requests.get and counts browser fetches."""
+
+    def __init__(self, monkeypatch, html):
+        self.html = html
+        self.http_fetches = 0
+        self.browser_fetches = 0
+        monkeypatch.setattr(browser_fetch.requests, "get", self.get)
+        monkeypatch.setattr(browser_fetch, "_fetch_with_browser", self.fetch_with_browser)
+        monkeypatch.setattr(browser_fetch.browser_pool, "checkout", lambda *args, **kwargs: object())
+        monkeypatch.setattr(browser_fetch.browser_pool, "checkin", lambda *args, **kwargs: None)
+
+    def get(self, url, timeout, headers):
+        self.http_fetches += 1
+        return SimpleNamespace(text=self.html, raise_for_status=lambda: None)
+
+    def fetch_with_browser(self, url, config, user_agent, browser):
+        self.browser_fetches += 1
+        return [browser_fetch.create_post_entry(f"Story about {link[-1]}", link, "") for link in LINKS], 200
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = DiskCacheWrapper(cache_dir)
+        monkeypatch.setattr(browser_fetch, "g_cs", cache)
+        monkeypatch.setattr(browser_fetch, "get_site_config", lambda url: (CONFIG, "example.com"))
+        yield cache
+
+
+@pytest.mark.parametrize("html, mode", [
+    (post_html(LINKS), browser_fetch.FAST_PATH_HTML),
+    (next_data_html(LINKS), browser_fetch.FAST_PATH_JSON),
+])
+def test_probe_switches_site_to_plain_http(monkeypatch, html, mode):
+    site = FakeSite(monkeypatch, html)
+
+    browser_fetch.fetch_site_posts(URL, "UA")
+    assert browser_fetch.get_fast_path_verdict("example.com")["mode"] == mode
+
+    result = browser_fetch.fetch_site_posts(URL, "UA")
+    assert [entry["link"] for entry in result["entries"]] == LINKS
+    assert site.browser_fetches == 1 and site.http_fetches == 2
+
+    verdict = browser_fetch.get_fast_path_verdict("example.com")
+    assert verdict["browser"]["fetches"] == 1 and verdict["http"]["fetches"] == 1
+
+
+def test_rendered_only_site_stays_on_browser_until_next_probe(monkeypatch):
+    site = FakeSite(monkeypatch, '<div id="root"></div>' + post_html(LINKS[:2]))
+
+    for _ in range(2):
+        browser_fetch.fetch_site_posts(URL, "UA")
+
+    verdict = browser_fetch.get_fast_path_verdict("example.com")
+    assert verdict["mode"] == browser_fetch.FAST_PATH_BROWSER and verdict["recall"] == pytest.approx(0.4)
+    assert site.browser_fetches == 2 and site.http_fetches == 1  # probed once per interval
+
+
+def test_fast_path_falls_back_when_posts_disappear(monkeypatch):
+    site = FakeSite(monkeypatch, post_html(LINKS))
+    browser_fetch.fetch_site_posts(URL, "UA")
+
+    site.html = '<div id="root"></div>'
+    result = browser_fetch.fetch_site_posts(URL, "UA")
+
+    assert len(result["entries"]) == len(LINKS) and site.browser_fetches == 2
+    assert browser_fetch.get_fast_path_verdict("example.com")["mode"] == browser_fetch.FAST_PATH_BROWSER
+
+
+def test_fallback_is_stored_even_when_the_browser_fails(monkeypatch):
+    site = FakeSite(monkeypatch, post_html(LINKS))
+    browser_fetch.fetch_site_posts(URL, "UA")
+
+    site.html = '<div id="root"></div>'
+    monkeypatch.setattr(browser_fetch, "_fetch_with_browser", lambda *args: ([], 500))
+    browser_fetch.fetch_site_posts(URL, "UA")
+    browser_fetch.fetch_site_posts(URL, "UA")
+
+    assert browser_fetch.get_fast_path_verdict("example.com")["mode"] == browser_fetch.FAST_PATH_BROWSER
+    assert site.http_fetches == 2  # the probe and the failed fast path, no retry on the next fetch
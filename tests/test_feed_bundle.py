@@ -0,0 +1,123 @@
+"""
+test_feed_bundle.py
+
+Tests for feed bundles: packing all feeds of a report into one object-store object
+and applying only the changed feeds on the reading side.
+"""
+
+import hashlib
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Add the parent directory to Python path when running tests directly
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import feed_bundle
+from feed_bundle import FeedBundle, encode_bundle
+from feed_codec import FeedFormatError
+from models import DiskCacheWrapper, RssFeed
+from shared import TZ
+
+URLS = [f"https://example.com/feed{i}.xml" for i in range(3)]
+
+
+def make_feed(name):
+    return RssFeed([{"title": f"{name} story", "link": f"https://example.com/{name}",
+                     "published_parsed": time.gmtime(1_700_000_000)}])
+
+
+class FakeStore:
+    """In-memory stand-in for publish_bytes / fetch_bytes_if_changed."""
+
+    def __init__(self):
+        self.objects = {}
+        self.downloads = 0
+
+    def publish_bytes(self, data, key):
+        self.objects[key] = data
+
+    def fetch_bytes_if_changed(self, key, known_hash=None):
+        data = self.objects.get(key)
+        if data is None:
+            return None, None
+        metadata = {"hash": hashlib.md5(data).hexdigest()}
+        if metadata["hash"] == known_hash:
+            return None, metadata
+        self.downloads += 1
+        return data, metadata
+
+
+@pytest.fixture
+def env(monkeypatch):
+    store = FakeStore()
+    monkeypatch.setattr(feed_bundle, "publish_bytes", store.publish_bytes)
+    monkeypatch.setattr(feed_bundle, "fetch_bytes_if_changed", store.fetch_bytes_if_changed)
+    with tempfile.TemporaryDirectory() as publisher_dir, tempfile.TemporaryDirectory() as reader_dir:
+        publisher, reader = DiskCacheWrapper(publisher_dir), DiskCacheWrapper(reader_dir)
+        yield store, publisher, reader, monkeypatch
+
+
+def test_bundle_round_trip_decodes_feeds_on_demand():
+    feeds = {url: (1000.0 + i, make_feed(f"f{i}")) for i, url in enumerate(URLS)}
+    bundle = FeedBundle(encode_bundle(feeds, published=5.0))
+
+    assert bundle.published == 5.0
+    assert bundle.versions == {url: 1000.0 + i for i, url in enumerate(URLS)}
+    assert bundle.feed(URLS[1]).entries[0]["link"] == "https://example.com/f1"
+
+
+@pytest.mark.parametrize("data", [b"", b"LRB", b"XYZ\x01\x00\x00\x00\x00", b"LRB\x09\x00\x00\x00\x02{}"])
+def test_bad_bundles_raise_format_error(data):
+    with pytest.raises(FeedFormatError):
+        FeedBundle(data)
+
+
+def test_publish_then_sync_only_applies_changes(env):
+    store, publisher, reader, monkeypatch = env
+    start = datetime(2025, 1, 1, tzinfo=TZ)
+
+    monkeypatch.setattr(feed_bundle, "g_c", publisher)
+    for i, url in enumerate(URLS):
+        publisher.put(url, make_feed(f"v1-{i}"))
+        publisher.set_last_fetch(url, start)
+    assert feed_bundle.publish_feed_bundle(URLS + ["https://example.com/not-cached.xml"]) == len(URLS)
+
+    monkeypatch.setattr(feed_bundle, "g_c", reader)
+    assert feed_bundle.sync_feed_bundle() == len(URLS)
+    assert reader.get(URLS[0]).entries[0]["link"] == "https://example.com/v1-0"
+    assert reader.get_last_fetch(URLS[0]) == start
+
+    # Unchanged bundle: one metadata check, no download
+    assert feed_bundle.sync_feed_bundle() == 0
+    assert store.downloads == 1
+
+    # One feed changes on the publisher
+    monkeypatch.setattr(feed_bundle, "g_c", publisher)
+    publisher.put(URLS[1], make_feed("v2-1"))
+    publisher.set_last_fetch(URLS[1], start + timedelta(minutes=30))
+    feed_bundle.publish_feed_bundle(URLS)
+
+    monkeypatch.setattr(feed_bundle, "g_c", reader)
+    assert feed_bundle.sync_feed_bundle() == 1
+    assert reader.get(URLS[1]).entries[0]["link"] == "https://example.com/v2-1"
+
+
+def test_sync_keeps_newer_local_feeds(env):
+    store, publisher, reader, monkeypatch = env
+    start = datetime(2025, 1, 1, tzinfo=TZ)
+
+    monkeypatch.setattr(feed_bundle, "g_c", publisher)
+    publisher.put(URLS[0], make_feed("remote"))
+    publisher.set_last_fetch(URLS[0], start)
+    feed_bundle.publish_feed_bundle(URLS[:1])
+
+    monkeypatch.setattr(feed_bundle, "g_c", reader)
+    reader.put(URLS[0], make_feed("local"))
+    reader.set_last_fetch(URLS[0], start + timedelta(hours=1))
+    assert feed_bundle.sync_feed_bundle() == 0
+    assert reader.get(URLS[0]).entries[0]["link"] == "https://example.com/local"
@@ -0,0 +1,114 @@
+"""
+test_feed_codec.py
+
+Tests for the versioned, compressed feed format published to object storage.
+"""
+
+import pickle
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+from feedparser import FeedParserDict
+
+# Add the parent directory to Python path when running tests directly
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import feed_codec
+from feed_codec import FORMAT_VERSION, MAGIC, FeedFormatError, decode_feed, encode_feed
+from models import RssFeed
+
+
+def make_feed(count=50):
+    entries = []
+    for i in range(count):
+        published = time.gmtime(1_700_000_000 + i * 3600)
+        summary = f"<p>Summary of article {i} about the Linux kernel, Rust and distributions.</p>" * 4
+        entries.append(FeedParserDict({
+            "title": f"Article {i}: kernel release notes and distribution news",
+            "link": f"https://example.com/articles/{i}",
+            "underlying_url": f"https://example.com/articles/{i}",
+            "published": time.strftime('%a, %d %b %Y %H:%M:%S GMT', published),
+            "published_parsed": published,
+            "summary": summary,
+            "html_content": summary,
+            "content": [{"type": "text/html", "value": summary}],
+            "tags": [{"term": "linux", "scheme": None, "label": None}],
+        }))
+    return RssFeed(entries, top_articles=[{"title": "Top", "url": "https://example.com/top"}])
+
+
+def test_round_trip_preserves_entries():
+    feed = make_feed()
+    feed.entries[0]["duplicate_of"] = "https://example.com/original"
+    feed.entries[1]["fetched_at"] = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+    data = encode_feed(feed)
+    assert data.startswith(MAGIC) and data[len(MAGIC)] == FORMAT_VERSION
+    decoded = decode_feed(data)
+
+    assert isinstance(decoded, RssFeed)
+    assert decoded.top_articles == feed.top_articles
+    assert len(decoded.entries) == len(feed.entries)
+    for original, restored in zip(feed.entries, decoded.entries):
+        assert restored == original
+        assert isinstance(restored["published_parsed"], time.struct_time)
+    # Attribute access used by the templates keeps working
+    assert decoded.entries[0].link == feed.entries[0].link
+    assert decoded.entries[1]["fetched_at"] == feed.entries[1]["fetched_at"]
+
+
+def test_smaller_than_pickle():
+    feed = make_feed()
+    assert len(encode_feed(feed)) < len(pickle.dumps(feed)) / 3
+
+
+def test_legacy_pickle_still_decodes():
+    feed = make_feed(3)
+    decoded = decode_feed(pickle.dumps(feed))
+    assert [e["link"] for e in decoded.entries] == [e["link"] for e in feed.entries]
+
+
+def test_zlib_fallback(monkeypatch):
+    monkeypatch.setattr(feed_codec, "zstd", None)
+    data = encode_feed(make_feed(3))
+    assert data[len(MAGIC) + 1] == feed_codec.CODEC_ZLIB
+    assert len(decode_feed(data).entries) == 3
+
+
+@pytest.mark.parametrize("data", [
+    pickle.dumps({"not": "a feed"}),
+    b"garbage that is not a pickle",
+    MAGIC,
+    MAGIC + bytes((FORMAT_VERSION + 1, feed_codec.CODEC_ZLIB)) + b"x",
+    MAGIC + bytes((FORMAT_VERSION, 99)) + b"x",
+    MAGIC + bytes((FORMAT_VERSION, feed_codec.CODEC_ZLIB)) + b"not compressed",
+])
+def test_bad_data_raises_format_error(data):
+    with pytest.raises(FeedFormatError):
+        decode_feed(data)
+
+
+def test_unsupported_values_refuse_to_encode():
+    feed = make_feed(1)
+    feed.entries[0]["bad"] = object()
+    with pytest.raises(TypeError):
+        encode_feed(feed)
+
+
+if __name__ == "__main__":
+    feed = make_feed(100)
+    legacy, current = pickle.dumps(feed), encode_feed(feed)
+    rounds = 200
+    start = time.perf_counter()
+    for _ in range(rounds):
+        pickle.loads(legacy)
+    legacy_time = (time.perf_counter() - start) / rounds
+    start = time.perf_counter()
+    for _ in range(rounds):
+        decode_feed(current)
+    current_time = (time.perf_counter() - start) / rounds
+    print(f"pickle: {len(legacy)} bytes, {legacy_time * 1000:.2f} ms decode")
+    print(f"codec:  {len(current)} bytes, {current_time * 1000:.2f} ms decode")
@@ -0,0 +1,189 @@
+"""
+test_feed_history.py
+
+Tests for FeedHistory refresh scheduling and the precomputed next-due expiry checks.
+"""
+
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Add the parent directory to Python path when running tests directly
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from FeedHistory import FeedConfig, FeedHistory
+from models import DiskCacheWrapper
+
+
+@pytest.fixture
+def tmp_dir():
+    """Provide a temporary directory for history files and caches."""
+    with tempfile.TemporaryDirectory() as directory:
+        yield Path(directory)
+
+
+def test_update_fetch_returns_next_due(tmp_dir):
+    history = FeedHistory(tmp_dir / "feed_history-test")
+    before = datetime.now(FeedConfig.TZ)
+    next_due = history.update_fetch("https://example.com/feed", 3)
+    history.flush()
+
+    assert before + FeedConfig.MIN_INTERVAL <= next_due
+    assert next_due <= datetime.now(FeedConfig.TZ) + FeedConfig.MAX_INTERVAL
+
+
+def test_get_expired_uses_next_due(tmp_dir):
+    history = FeedHistory(tmp_dir / "feed_history-test")
+    cache = DiskCacheWrapper(str(tmp_dir / "cache"))
+    now = datetime.now(FeedConfig.TZ)
+
+    cache.set_last_fetch("due", now, next_due=now - timedelta(seconds=1))
+    cache.set_last_fetch("fresh", now, next_due=now + timedelta(hours=1))
+
+    expired = cache.get_expired(["due", "fresh", "never"], history=history)
+    assert expired == {"due", "never"}
+    assert cache.has_feed_expired("due", history=history)
+    assert not cache.has_feed_expired("fresh", history=history)
+
+
+def test_get_expired_falls_back_without_next_due(tmp_dir):
+    history = FeedHistory(tmp_dir / "feed_history-test")
+    cache = DiskCacheWrapper(str(tmp_dir / "cache"))
+    now = datetime.now(FeedConfig.TZ)
+
+    cache.set_last_fetch("fresh", now, next_due=now + timedelta(hours=1))
+    # A forced refresh stores an old timestamp without a next-due time
+    cache.set_last_fetch("fresh", now - timedelta(days=7))
+    cache.set_last_fetch("recent", now)
+
+    assert cache.get_expired(["fresh", "recent"], history=history) == {"fresh"}
+
+    cache.clear_last_fetch("recent")
+    assert cache.has_feed_expired("recent", history=history)
+
+
+def test_updates_are_journaled_and_replayed(tmp_dir):
+    history = FeedHistory(tmp_dir / "feed_history-test")
+    history.update_fetch("https://example.com/a", 2)
+    history.update_fetch("https://example.com/b", 0)
+    history.reset_history("https://example.com/b")
+    history.flush()
+
+    assert history.journal_file.exists()
+    assert not history.data_file.exists()
+
+    reloaded = FeedHistory(tmp_dir / "feed_history-test")
+    assert set(reloaded.data) == {"https://example.com/a"}
+    assert reloaded.data["https://example.com/a"]["recent"] == history.data["https://example.com/a"]["recent"]
+
+
+def test_journal_compacts_into_snapshot(tmp_dir, monkeypatch):
+    monkeypatch.setattr(FeedConfig, "COMPACT_THRESHOLD", 3)
+    history = FeedHistory(tmp_dir / "feed_history-test")
+    for i in range(3):
+        history.update_fetch(f"https://example.com/{i}", i)
+    history.flush()
+
+    assert history.data_file.exists()
+    assert history.journal_file.read_text() == ""
+
+    # Replaying a stale journal over a snapshot that already contains it is a no-op
+    history.update_fetch("https://example.com/0", 5)
+    history.flush()
+    journal = history.journal_file.read_text()
+    history.journal_file.write_text(journal + journal)
+
+    reloaded = FeedHistory(tmp_dir / "feed_history-test")
+    assert len(reloaded.data["https://example.com/0"]["recent"]) == 2
+    assert reloaded.data["https://example.com/2"]["recent"] == history.data["https://example.com/2"]["recent"]
+
+
+def test_event_log_survives_compaction_and_rotation(tmp_dir, monkeypatch):
+    monkeypatch.setattr(FeedConfig, "COMPACT_THRESHOLD", 2)
+    history = FeedHistory(tmp_dir / "feed_history-test")
+    for i in range(5):
+        history.update_fetch(f"https://example.com/{i}", 1, published=[1000.0 + i])
+        history.flush()
+    history.reset_history("https://example.com/0")
+    history.flush()
+
+    assert history.journal_file.read_text() == ""
+    reader = FeedHistory(tmp_dir / "feed_history-test", read_only=True)
+    assert [event["published"] for event in reader.read_events()] == [[1000.0 + i] for i in range(5)]
+
+    # A full log is rotated once; the previous generation stays readable
+    monkeypatch.setattr(FeedConfig, "EVENTS_MAX_BYTES", 1)
+    history.update_fetch("https://example.com/5", 1, published=[1005.0])
+    history.flush()
+    assert len(list(reader.read_events())) == 6
+    history.update_fetch("https://example.com/6", 1, published=[1006.0])
+    history.flush()
+    assert [event["published"] for event in reader.read_events()] == [[1005.0], [1006.0]]
+
+
+def test_read_only_history_never_writes(tmp_dir, monkeypatch):
+    monkeypatch.setattr(FeedConfig, "COMPACT_THRESHOLD", 1)
+    history = FeedHistory(tmp_dir / "feed_history-test")
+    history.update_fetch("https://example.com/a", 2)
+    history.update_fetch("https://example.com/b", 1)
+    history.flush()
+    history.journal_file.write_text('{"url": "https://example.com/a", "time": "2025-01-01T00:00:00+00:00", "new": 1}\n')
+    files = {path: path.read_text() for path in (history.data_file, history.journal_file)}
+
+    reader = FeedHistory(tmp_dir / "feed_history-test", read_only=True)
+    reader.update_fetch("https://example.com/c", 4)
+    reader.flush()
+
+    assert "https://example.com/b" in reader.data
+    assert {path: path.read_text() for path in files} == files
+
+
+def test_rate_model_schedules_busy_feeds_sooner(tmp_dir, monkeypatch):
+    monkeypatch.setattr(FeedConfig, "USE_RATE_MODEL", True)
+    history = FeedHistory(tmp_dir / "feed_history-test")
+    now = datetime.now(FeedConfig.TZ)
+    start = now.timestamp() - 14 * 86400
+
+    # One feed publishes hourly, the other twice a week but never near this hour
+    history.update_fetch("busy", 336, published=[start + 3600 * i for i in range(336)])
+    history.update_fetch("quiet", 4, published=[start + 3600 * (84 * i + 36) for i in range(4)])
+    history.flush()
+
+    busy_due = history.get_next_due("busy", now)
+    quiet_due = history.get_next_due("quiet", now)
+    assert now + FeedConfig.MIN_INTERVAL <= busy_due < quiet_due <= now + FeedConfig.MAX_INTERVAL
+
+    # Publish times are journaled so the model survives a restart
+    reloaded = FeedHistory(tmp_dir / "feed_history-test")
+    assert reloaded.data["busy"]["publish_counts"] == history.data["busy"]["publish_counts"]
+
+
+def test_fetch_budget_limits_and_prioritizes(tmp_dir):
+    import diskcache
+    from fetch_budget import FetchBudget, prioritize
+
+    budget = FetchBudget(diskcache.Cache(str(tmp_dir / "shared")), fetches_per_minute=0.001, burst=3)
+    assert budget.acquire(5) == 3
+    assert budget.acquire(1) == 0
+    budget.consume(2)
+    assert budget.acquire(1) == 0
+
+    # More expected articles wins; prominence breaks ties
+    order = prioritize(["c", "b", "a"], [0.0, 0.0, 5.0], ["b", "c"])
+    assert order == ["a", "b", "c"]
+
+
+def test_expected_new_prefers_active_feeds(tmp_dir):
+    history = FeedHistory(tmp_dir / "feed_history-test")
+    now = datetime.now(FeedConfig.TZ)
+    history.update_fetch("active", 3)
+    history.update_fetch("idle", 0)
+    history.flush()
+
+    last_fetches = {"active": now - timedelta(hours=2), "idle": now - timedelta(hours=2), "new": None}
+    active, idle, new = history.get_expected_new(["active", "idle", "new"], last_fetches)
+    assert new == float("inf")
+    assert active > idle
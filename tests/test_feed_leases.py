@@ -0,0 +1,101 @@
+"""
+test_feed_leases.py
+
+Tests for the per-feed lease table that lets processes fetch feeds independently.
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import diskcache
+import pytest
+
+# Add the parent directory to Python path when running tests directly
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from feed_leases import FeedLeaseTable, new_owner_id
+
+FEED_A = "https://example.com/a.xml"
+FEED_B = "https://example.com/b.xml"
+
+
+@pytest.fixture
+def leases():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = diskcache.Cache(directory)
+        yield FeedLeaseTable(cache, lease_seconds=60)
+        cache.close()
+
+
+def test_claim_skips_feeds_held_by_others(leases):
+    first, second = new_owner_id(), new_owner_id()
+    assert leases.claim([FEED_A], first) == [FEED_A]
+    assert leases.claim([FEED_A, FEED_B], second) == [FEED_B]
+    assert leases.held() == {FEED_A: first, FEED_B: second}
+
+    # Claiming again as the same owner renews instead of failing
+    assert leases.claim([FEED_A], first) == [FEED_A]
+
+
+def test_release_only_drops_own_leases(leases):
+    first, second = new_owner_id(), new_owner_id()
+    leases.claim([FEED_A], first)
+    leases.release([FEED_A], second)
+    assert FEED_A in leases.held([FEED_A])
+
+    leases.release([FEED_A], first)
+    assert leases.held([FEED_A]) == {}
+    assert leases.claim([FEED_A], second) == [FEED_A]
+
+
+def test_expired_leases_can_be_taken_over(leases):
+    leases.lease_seconds = 0.1
+    leases.claim([FEED_A], new_owner_id())
+    time.sleep(0.2)
+    assert leases.held() == {}
+    assert leases.claim([FEED_A], new_owner_id()) == [FEED_A]
+
+
+def test_lease_context_manager(leases):
+    with leases.lease(FEED_A) as leased:
+        assert leased
+        with leases.lease(FEED_A) as nested:
+            assert not nested
+        with leases.lease(FEED_B) as other:
+            assert other
+    assert leases.held() == {}
+
+
+def test_wait_released_returns_when_holder_finishes(leases):
+    owner = new_owner_id()
+    leases.claim([FEED_A], owner)
+    timer = threading.Timer(0.2, leases.release, args=([FEED_A], owner))
+    timer.start()
+    try:
+        assert leases.wait_released([FEED_A], timeout=5)
+        assert leases.wait_released([FEED_B], timeout=0)
+    finally:
+        timer.cancel()
+
+    leases.claim([FEED_B], owner)
+    assert not leases.wait_released([FEED_B], timeout=0.1)
+
+
+def test_concurrent_claims_grant_each_feed_once(leases):
+    urls = [f"https://example.com/{i}.xml" for i in range(20)]
+    results = []
+
+    def worker():
+        results.append(leases.claim(urls, new_owner_id()))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    granted = [url for claimed in results for url in claimed]
+    assert sorted(granted) == sorted(urls)
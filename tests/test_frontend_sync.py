@@ -0,0 +1,98 @@
+"""
+test_frontend_sync.py
+
+Tests for read-only front-ends: fetch paths are disabled, and feeds and rendered
+fragments arrive only through the version-checked object-store sync.
+"""
+
+import hashlib
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Add the parent directory to Python path when running tests directly
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import feed_bundle
+import frontend_sync
+import workers
+from models import DiskCacheWrapper
+
+
+class FakeStore:
+    """In-memory stand-in for publish_bytes / fetch_bytes_if_changed."""
+
+    def __init__(self):
+        self.objects = {}
+        self.downloads = 0
+
+    def publish_bytes(self, data, key):
+        self.objects[key] = data
+
+    def fetch_bytes_if_changed(self, key, known_hash=None):
+        data = self.objects.get(key)
+        if data is None:
+            return None, None
+        metadata = {"hash": hashlib.md5(data).hexdigest()}
+        if metadata["hash"] == known_hash:
+            return None, metadata
+        self.downloads += 1
+        return data, metadata
+
+
+@pytest.fixture
+def env(monkeypatch):
+    store = FakeStore()
+    for module in (frontend_sync, feed_bundle):
+        monkeypatch.setattr(module, "publish_bytes", store.publish_bytes)
+        monkeypatch.setattr(module, "fetch_bytes_if_changed", store.fetch_bytes_if_changed)
+    with tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as site_dir:
+        cache = DiskCacheWrapper(cache_dir)
+        monkeypatch.setattr(frontend_sync, "g_c", cache)
+        monkeypatch.setattr(feed_bundle, "g_c", cache)
+        monkeypatch.setattr(frontend_sync, "PATH", site_dir)
+        yield store, Path(site_dir)
+
+
+def test_fragments_publish_once_and_sync_when_changed(env):
+    store, site_dir = env
+    fragment = site_dir / frontend_sync.ABOVE_HTML_FILE
+    fragment.write_text("<p>v1</p>")
+
+    assert frontend_sync.publish_fragments() == 1
+    assert frontend_sync.publish_fragments() == 0  # unchanged, not re-uploaded
+
+    fragment.unlink()
+    assert frontend_sync.sync_fragments() == 1
+    assert fragment.read_text() == "<p>v1</p>"
+    assert frontend_sync.sync_fragments() == 0
+    assert store.downloads == 1
+
+    store.objects[frontend_sync._fragment_key(frontend_sync.ABOVE_HTML_FILE)] = b"<p>v2</p>"
+    assert frontend_sync.sync_fragments() == 1
+    assert fragment.read_text() == "<p>v2</p>"
+
+
+def test_sync_frontend_is_rate_limited_across_calls(env, monkeypatch):
+    calls = []
+    monkeypatch.setattr(frontend_sync, "sync_feed_bundle", lambda: calls.append("sync") or 0)
+
+    assert frontend_sync.sync_frontend(interval=3600) is True
+    assert frontend_sync.sync_frontend(interval=3600) is False
+    assert frontend_sync.sync_frontend(interval=0) is True
+    assert calls == ["sync", "sync"]
+
+
+def test_read_only_frontend_never_fetches(monkeypatch):
+    fetched = []
+    monkeypatch.setattr(workers, "is_read_only", lambda: True)
+    monkeypatch.setattr(workers, "process_urls_in_parallel", lambda urls, description: fetched.extend(urls))
+    monkeypatch.setattr(workers.threading, "Thread", lambda *args, **kwargs: pytest.fail("refresh started"))
+
+    workers.fetch_urls_parallel(["https://example.com/feed.xml"])
+    workers.load_url_worker("https://example.com/feed.xml")
+    workers.fetch_urls_thread()
+
+    assert fetched == []
@@ -0,0 +1,90 @@
+"""
+test_html_parsing.py
+
+Tests for the pluggable HTML parsing backends: every installed backend must
+extract the same posts and image candidates as BeautifulSoup, and selectors a
+fast backend rejects fall back to BeautifulSoup.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the parent directory to Python path when running tests directly
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import browser_fetch
+import html_parsing
+import image_fetch
+from app_config import FetchConfig
+
+PAGE = """<!DOCTYPE html>
+<html><head>
+<meta property="og:image" content="/images/lead.jpg">
+<script type="application/ld+json">{"@type": "NewsArticle", "image": ["https://cdn.example.com/a.png"]}</script>
+</head><body>
+<article class="item"><h2 class="title"><a href="/2025/one">First story <b>here</b></a></h2></article>
+<article class="item"><h2 class="title"><a href="https://example.com/2025/two">Second story</a></h2></article>
+<article class="item"><h2 class="title"><a href="/about">About</a></h2></article>
+<img src="/photo.jpg" width="800" height="600px" alt="A long description of the photo" hidden>
+<img srcset="/small.jpg 320w, /large.jpg 1280w">
+<img src="data:image/png;base64,xyz" data-src="https://example.com/lazy.webp">
+</body></html>"""
+
+CONFIG = FetchConfig(post_container="article.item", title_selector="h2.title a", link_selector="h2.title a")
+
+BACKENDS = html_parsing.available_backends()
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, monkeypatch):
+    monkeypatch.setattr(html_parsing, "HTML_PARSER_BACKEND", request.param)
+    return request.param
+
+
+def test_posts_match_beautifulsoup(backend):
+    entries = browser_fetch._extract_posts_from_html(PAGE, CONFIG, "https://example.com/")
+
+    assert [(entry["title"], entry["link"]) for entry in entries] == [
+        ("First story here", "https://example.com/2025/one"),
+        ("Second story", "https://example.com/2025/two"),
+    ]
+
+
+def test_image_candidates_match_beautifulsoup(backend):
+    candidates = image_fetch.parse_images_requests(PAGE, "https://example.com/story")
+
+    urls = [url for url, _ in candidates]
+    assert urls == [
+        "https://example.com/images/lead.jpg",
+        "https://cdn.example.com/a.png",
+        "https://example.com/photo.jpg",
+        "https://example.com/large.jpg",
+        "https://example.com/lazy.webp",
+    ]
+    assert candidates[2][1] == {'width': 800, 'height': 600, 'score': 800 * 600 * 1.2}
+
+
+def test_valueless_attribute_reads_as_empty_string(backend):
+    parser = html_parsing.get_html_parser()
+    link = parser.find_element(parser.parse('<p><a href class="x">Link</a></p>'), "a")
+
+    assert parser.get_attribute(link, "href") == ""
+    assert parser.get_attribute(link, "title") is None
+    assert parser.get_attributes(link)["href"] == ""
+
+def test_unsupported_selector_falls_back_to_beautifulsoup(backend):
+    config = FetchConfig(post_container="article:-soup-contains('story')",
+                         title_selector="h2.title a", link_selector="h2.title a")
+
+    entries = browser_fetch._extract_posts_from_html(PAGE, config, "https://example.com/")
+
+    assert len(entries) == 2
+
+
+def test_unknown_backend_uses_fastest_installed():
+    parser = html_parsing.get_html_parser("no-such-parser")
+
+    assert parser.name == BACKENDS[0]
+    assert html_parsing.get_fallback_parser().name == "beautifulsoup"
@@ -0,0 +1,109 @@
+"""
+test_leader_election.py
+
+Tests for ObjectStorageLock on the local directory store and for fetch leader
+election: one leader at a time, and bounded failover when the leader stops renewing.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+# Add the parent directory to Python path when running tests directly
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ObjectStorageLock import LocalLockStore, ObjectStorageLock
+import leader_election
+from leader_election import LeaderElection
+
+LEASE = 0.5
+SKEW = 0.1
+
+
+@pytest.fixture
+def store():
+    with tempfile.TemporaryDirectory() as root:
+        yield LocalLockStore(root)
+
+
+def make_lock(store, owner_id=None):
+    return ObjectStorageLock("test-leader", store=store, owner_id=owner_id)
+
+
+def test_lock_is_exclusive_and_released(store):
+    first, second = make_lock(store), make_lock(store)
+
+    assert first.acquire(timeout_seconds=30)
+    assert not second.acquire(timeout_seconds=30)
+    assert first.renew(30)
+    assert not second.renew(30)
+
+    assert first.release()
+    assert second.acquire(timeout_seconds=30)
+    assert second.fencing_token > first.fencing_token
+
+
+def test_expired_lock_is_taken_over_with_higher_token(store):
+    first, second = make_lock(store), make_lock(store)
+    assert first.acquire(timeout_seconds=0.2)
+    time.sleep(0.25)
+
+    assert second.acquire(timeout_seconds=30)
+    assert second.fencing_token > first.fencing_token
+    assert not first.renew(30)  # a stale holder cannot extend someone else's lock
+    assert not first.release()  # nor release it
+    assert not make_lock(store).acquire(timeout_seconds=30)
+
+
+def test_same_owner_reclaims_its_lock_after_restart(store):
+    assert make_lock(store, owner_id="node-a").acquire(timeout_seconds=30)
+
+    assert not make_lock(store, owner_id="node-b").acquire(timeout_seconds=30)
+    assert make_lock(store, owner_id="node-a").acquire(timeout_seconds=30)
+
+
+def test_single_leader_and_bounded_failover(store):
+    node_a = LeaderElection(make_lock(store, "node-a"), LEASE, skew_seconds=SKEW)
+    node_b = LeaderElection(make_lock(store, "node-b"), LEASE, skew_seconds=SKEW)
+
+    assert node_a.step()
+    assert not node_b.step()
+    assert node_a.step()  # renewal keeps leadership
+
+    # Node A stops renewing: it steps down on its own before its lease expires...
+    time.sleep(LEASE - SKEW)
+    assert not node_a.is_leader()
+
+    # ...and node B takes over once the lease has expired
+    assert not node_b.step()
+    time.sleep(SKEW + 0.05)
+    assert node_b.step()
+
+    # Node A comes back and finds it lost the lease
+    assert not node_a.step()
+    assert node_b.step()
+
+
+def test_resign_hands_over_immediately(store):
+    node_a = LeaderElection(make_lock(store, "node-a"), 30)
+    node_b = LeaderElection(make_lock(store, "node-b"), 30)
+
+    assert node_a.step()
+    node_a.resign()
+    assert not node_a.is_leader()
+    assert node_b.step()
+
+
+def test_nodes_sharing_a_publisher_id_elect_one_leader(monkeypatch):
+    with tempfile.TemporaryDirectory() as root:
+        monkeypatch.setattr(leader_election, "LEADER_STORE_PATH", root)
+        monkeypatch.setattr(leader_election, "LEADER_LEASE_SECONDS", 30)
+        node_a = leader_election._make_election(server_id="node-a")
+        node_b = leader_election._make_election(server_id="node-b")
+
+        assert node_a.step()
+        assert not node_b.step()
+        assert node_a.lock.owner_id != node_b.lock.owner_id
@@ -0,0 +1,155 @@
+"""
+test_lwn_fetcher.py
+
+Simulates months of LWN.net fetches to check that LwnFetcher keeps the paywall
+release behavior of the original unbounded implementation while its cached
+state stays bounded.
+"""
+
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add the parent directory to Python path when running tests directly
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import workers
+from models import DiskCacheWrapper
+from shared import TZ
+
+FEED_SIZE = 30
+ARTICLES_PER_DAY = 3
+DAYS = 180
+
+
+class FakeClock:
+    """Replaces workers.datetime so LwnFetcher sees simulated time."""
+
+    current = None
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+    @staticmethod
+    def fromtimestamp(ts, tz=None):
+        return datetime.fromtimestamp(ts, tz)
+
+
+class FakeEntry(SimpleNamespace):
+    """Feedparser entry stand-in supporting both attribute and get() access."""
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+
+def make_feed(articles, now):
+    """Build a feedparser-like result holding the newest FEED_SIZE published articles."""
+    visible = [a for a in articles if a["published"] <= now][-FEED_SIZE:]
+    entries = []
+    for article in reversed(visible):
+        # LWN keeps the [$] marker while the article is subscriber-only
+        locked = article["locked"] and now - article["published"] < timedelta(days=10)
+        entries.append(FakeEntry(
+            link=article["link"],
+            title=("[$] " if locked else "") + article["title"],
+            published_parsed=time.localtime(article["published"].timestamp()),
+        ))
+    return SimpleNamespace(entries=entries)
+
+
+def legacy_fetch(state, res, now):
+    """The original implementation with an unbounded displayed set, for comparison."""
+    pending, displayed = state
+    ready = []
+    for entry in res.entries:
+        link, title = entry.link, entry.get("title", "")
+        pub = datetime.fromtimestamp(time.mktime(entry.published_parsed), tz=TZ)
+        if title.startswith("[$]"):
+            if link not in pending and link not in displayed:
+                pending[link] = {"title": title, "published": pub}
+        elif link not in displayed:
+            ready.append({"link": link, "title": title, "published": pub})
+            displayed.add(link)
+            pending.pop(link, None)
+    for link, info in list(pending.items()):
+        if now - info["published"] >= timedelta(days=15):
+            title = info["title"][3:].strip() if info["title"].startswith("[$]") else info["title"]
+            ready.append({"link": link, "title": title, "published": now})
+            displayed.add(link)
+            pending.pop(link)
+    ready.sort(key=lambda x: x["published"])
+    return ready
+
+
+@pytest.fixture
+def lwn_env(monkeypatch):
+    """Point LwnFetcher at a private cache, a fake feed and a fake clock."""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = DiskCacheWrapper(directory)
+        monkeypatch.setattr(workers, "g_c", cache)
+        monkeypatch.setattr(workers, "datetime", FakeClock)
+        yield cache
+
+
+def test_months_of_fetches_match_legacy_and_stay_bounded(lwn_env, monkeypatch):
+    start = datetime(2025, 1, 1, tzinfo=TZ)
+    articles = []
+    for day in range(DAYS):
+        for i in range(ARTICLES_PER_DAY):
+            articles.append({
+                "link": f"https://lwn.net/Articles/{day * ARTICLES_PER_DAY + i}/",
+                "title": f"Article {day}-{i}",
+                "published": start + timedelta(days=day, hours=8 * i),
+                "locked": i == 0,
+            })
+
+    fetcher = workers.LwnFetcher()
+    legacy_state = ({}, set())
+    shown = {}
+    max_displayed = 0
+
+    now = start
+    while now < start + timedelta(days=DAYS):
+        res = make_feed(articles, now)
+        FakeClock.current = now
+        monkeypatch.setattr(workers.feedparser, "parse", lambda *args, **kwargs: res)
+
+        ready = fetcher.fetch("https://lwn.net/headlines/rss", None)
+        expected = legacy_fetch(legacy_state, res, now)
+        assert [(r["link"], r["title"]) for r in ready] == [(r["link"], r["title"]) for r in expected]
+
+        for item in ready:
+            assert item["link"] not in shown
+            shown[item["link"]] = now
+
+        max_displayed = max(max_displayed, len(lwn_env.get("lwn_displayed_at")))
+        now += timedelta(hours=6)
+
+    # Locked articles are only shown once the paywall window has passed
+    for article in articles:
+        if article["locked"] and article["link"] in shown:
+            assert shown[article["link"]] - article["published"] >= timedelta(days=15)
+
+    # The legacy set grew with every article; the new state is bounded by the retention window
+    assert len(legacy_state[1]) > 400
+    assert max_displayed <= ARTICLES_PER_DAY * (workers.LwnFetcher.DISPLAYED_RETENTION_DAYS + 1) + FEED_SIZE
+
+
+def test_legacy_displayed_set_is_migrated(lwn_env, monkeypatch):
+    now = datetime(2025, 6, 1, tzinfo=TZ)
+    article = {"link": "https://lwn.net/Articles/1/", "title": "Old news", "published": now - timedelta(days=1), "locked": False}
+    lwn_env.put("lwn_displayed", {article["link"]})
+
+    res = make_feed([article], now)
+    FakeClock.current = now
+    monkeypatch.setattr(workers.feedparser, "parse", lambda *args, **kwargs: res)
+
+    assert workers.LwnFetcher().fetch("https://lwn.net/headlines/rss", None) == []
+    assert lwn_env.get("lwn_displayed") is None
+    assert article["link"] in lwn_env.get("lwn_displayed_at")
@@ -0,0 +1,139 @@
+"""
+test_object_storage_lock.py
+
+Tests for ObjectStorageLock acquisition through conditional writes, the
+unconditional fallback, and how the libcloud store maps provider responses.
+"""
+
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add the parent directory to Python path when running tests directly
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import ObjectStorageLock as osl
+import object_storage_config as oss_config
+from ObjectStorageLock import LibcloudLockStore, LocalLockStore, ObjectStorageLock
+
+
+@pytest.fixture
+def root():
+    with tempfile.TemporaryDirectory() as directory:
+        yield directory
+
+
+class CountingStore:
+    """Wraps a store and counts the round trips made through it."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.supports_conditional_writes = inner.supports_conditional_writes
+        self.calls = 0
+
+    def read(self, name):
+        self.calls += 1
+        return self.inner.read(name)
+
+    def write(self, name, data):
+        self.calls += 1
+        self.inner.write(name, data)
+
+    def write_if(self, name, data, etag):
+        self.calls += 1
+        return self.inner.write_if(name, data, etag)
+
+
+def test_conditional_acquire_saves_a_round_trip(root):
+    conditional = CountingStore(LocalLockStore(root))
+    assert ObjectStorageLock("a", store=conditional).acquire(timeout_seconds=30)
+    assert conditional.calls == 2  # read + conditional write
+
+    fallback = CountingStore(LocalLockStore(root, conditional_writes=False))
+    assert ObjectStorageLock("b", store=fallback).acquire(timeout_seconds=30)
+    assert fallback.calls == 3  # read + write + verifying read
+
+
+def test_stale_etag_loses(root):
+    store = LocalLockStore(root)
+    assert store.write_if("obj", b"one", None)
+    assert not store.write_if("obj", b"two", None)
+
+    _, etag = store.read("obj")
+    assert store.write_if("obj", b"two", etag)
+    assert not store.write_if("obj", b"three", etag)
+    assert store.read("obj")[0] == b"two"
+
+
+@pytest.mark.parametrize("conditional", [True, False])
+def test_renew_and_release_respect_ownership(root, conditional):
+    store = LocalLockStore(root, conditional_writes=conditional)
+    first, second = ObjectStorageLock("x", store=store), ObjectStorageLock("x", store=store)
+
+    assert first.acquire(timeout_seconds=30)
+    assert not second.acquire(timeout_seconds=30)
+    assert first.renew(30)
+    assert first.release()
+    assert second.acquire(timeout_seconds=30)
+
+
+def test_concurrent_conditional_acquires_have_one_winner(root):
+    store = LocalLockStore(root)
+    contenders = 8
+    for round_number in range(20):
+        locks = [ObjectStorageLock(f"race-{round_number}", store=store) for _ in range(contenders)]
+        barrier = threading.Barrier(contenders)
+        winners = []
+
+        def contend(lock):
+            barrier.wait()
+            if lock.acquire(timeout_seconds=30):
+                winners.append(lock)
+
+        threads = [threading.Thread(target=contend, args=(lock,)) for lock in locks]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(winners) == 1
+
+
+def test_store_without_conditional_support_falls_back(root):
+    class RejectingStore(LocalLockStore):
+        def write_if(self, name, data, etag):
+            self.supports_conditional_writes = False
+            raise NotImplementedError("no conditional writes")
+
+    store = RejectingStore(root)
+    lock = ObjectStorageLock("fallback", store=store)
+    assert lock.acquire(timeout_seconds=30)
+    assert not store.supports_conditional_writes
+    assert lock.renew(30)
+
+
+@pytest.mark.parametrize("status, outcome", [(412, False), (409, False), (501, NotImplementedError)])
+def test_libcloud_store_maps_conditional_responses(monkeypatch, status, outcome):
+    def upload(**kwargs):
+        assert kwargs["headers"] == {"If-None-Match": "*"}
+        raise oss_config.LibcloudError(f"Unexpected status code, status_code={status}")
+
+    monkeypatch.setattr(oss_config, "_storage_driver", SimpleNamespace(upload_object_via_stream=upload), raising=False)
+    store = LibcloudLockStore(conditional_writes=True)
+
+    if outcome is NotImplementedError:
+        with pytest.raises(NotImplementedError):
+            store.write_if("obj", b"data", None)
+        assert not store.supports_conditional_writes
+    else:
+        assert store.write_if("obj", b"data", None) is outcome
+        assert store.supports_conditional_writes
+
+
+def test_http_status_from_error_attributes_and_message():
+    assert osl._http_status(SimpleNamespace(http_code=412)) == 412
+    assert osl._http_status(Exception("Unexpected status code, status_code=409")) == 409
+    assert osl._http_status(Exception("connection reset")) is None
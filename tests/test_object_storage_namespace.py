@@ -0,0 +1,39 @@
+"""
+test_object_storage_namespace.py
+
+Tests for object naming in the cross-server object-store namespace.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the parent directory to Python path when running tests directly
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import object_storage_config as oss_config
+
+
+def test_legacy_layout_without_namespace(monkeypatch):
+    monkeypatch.setattr(oss_config, "STORAGE_NAMESPACE", "")
+    name = oss_config.generate_shared_object_name("https://example.com/feed", oss_config.SERVER_ID)
+    # Unchanged from the per-host layout used before namespaces existed
+    legacy = f"{oss_config.STORAGE_SYNC_PATH}bytes/{oss_config.SERVER_ID}/{oss_config.generate_object_name('https://example.com/feed', 'data')}"
+    assert name == legacy
+
+
+def test_legacy_layout_uses_publisher_throughout(monkeypatch):
+    monkeypatch.setattr(oss_config, "STORAGE_NAMESPACE", "")
+    name = oss_config.generate_shared_object_name("https://example.com/feed", "fetch-1")
+    assert oss_config.SERVER_ID not in name.replace("fetch-1", "")
+
+
+def test_shared_namespace_is_independent_of_local_host(monkeypatch):
+    monkeypatch.setattr(oss_config, "STORAGE_NAMESPACE", "prod")
+    on_fetch_node = oss_config.generate_shared_object_name("https://example.com/feed", "fetch-1")
+
+    monkeypatch.setattr(oss_config, "SERVER_ID", "frontend")
+    on_front_end = oss_config.generate_shared_object_name("https://example.com/feed", "fetch-1")
+
+    assert on_fetch_node == on_front_end
+    assert on_fetch_node.startswith(f"{oss_config.STORAGE_SYNC_PATH}shared/prod/fetch-1/")
+    assert oss_config.generate_shared_object_name("https://example.com/feed", "fetch-2") != on_fetch_node
@@ -0,0 +1,151 @@
+"""
+test_reddit_batch.py
+
+Tests for batched Reddit API fetching: the due subreddits sharing a sort are
+fetched in one multireddit listing, split back per feed, and stored with their
+fetch times in the same pass, with a per-feed listing only when the batch could
+not hold every new post.
+"""
+
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add the parent directory to Python path when running tests directly
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import Reddit
+import workers
+from feed_leases import FeedLeaseTable
+from models import DiskCacheWrapper
+
+
+def make_submission(subreddit, number):
+    return SimpleNamespace(
+        title=f"{subreddit} post {number}", author=SimpleNamespace(name="someone"),
+        permalink=f"/r/{subreddit}/comments/{number}/", name=f"t3_{subreddit.lower()}{number}",
+        selftext="", selftext_html=None, is_self=False, url=f"https://example.com/{subreddit}/{number}",
+        created_utc=time.time() - number, score=1, num_comments=0, thumbnail="self",
+        domain="example.com", subreddit=SimpleNamespace(display_name=subreddit))
+
+
+class FakeReddit:
+    """Serves listings for single subreddits and a+b multireddits, counting calls."""
+
+    def __init__(self, posts):
+        self.posts = posts  # subreddit -> number of posts
+        self.calls = []
+
+    def subreddit(self, name):
+        def listing(limit):
+            self.calls.append(name)
+            merged = [make_submission(sub, n) for sub in name.split("+") for n in range(self.posts[sub])]
+            merged.sort(key=lambda s: -s.created_utc)
+            return iter(merged[:limit])
+        return SimpleNamespace(hot=listing, new=listing, rising=listing, controversial=listing, top=listing)
+
+
+URLS = [
+    "https://www.reddit.com/r/linux/new/.rss",
+    "https://www.reddit.com/r/Python/new/.rss",
+    "https://www.reddit.com/r/Grok/new/.rss",
+]
+
+
+@pytest.fixture
+def reddit(monkeypatch):
+    fake = FakeReddit({"linux": 30, "Python": 30, "Grok": 30})
+    monkeypatch.setattr(Reddit, "get_valid_reddit_client", lambda: fake)
+    with tempfile.TemporaryDirectory() as report_dir:
+        monkeypatch.setattr(Reddit, "g_c", DiskCacheWrapper(report_dir))
+        yield fake
+
+
+def test_one_listing_serves_every_feed(reddit):
+    results = Reddit.fetch_reddit_batch(URLS)
+
+    assert reddit.calls == ["linux+Python+Grok"]
+    assert set(results) == set(URLS)
+    for url in URLS:
+        subreddit, _ = Reddit.parse_reddit_url(url)
+        assert len(results[url]["entries"]) == Reddit.DEFAULT_FEED_LIMIT
+        assert {entry["reddit_subreddit"] for entry in results[url]["entries"]} == {subreddit}
+        assert results[url]["feed"]["title"] == f"r/{subreddit} - new"
+
+    # Posts are marked seen per feed, so the next listing yields nothing new
+    results = Reddit.fetch_reddit_batch(URLS)
+    assert all(result["entries"] == [] for result in results.values())
+    assert reddit.calls == ["linux+Python+Grok"] * 2
+
+
+def test_crowded_out_subreddit_falls_back_until_seen(reddit):
+    reddit.posts["Grok"] = 0  # the batch holds nothing for it
+    assert URLS[2] not in Reddit.fetch_reddit_batch(URLS)
+
+    reddit.posts["Grok"] = 3
+    assert len(Reddit.fetch_reddit_feed_as_feedparser(URLS[2])["entries"]) == 3
+
+    # An incomplete share is served once it reaches a post the feed has seen
+    reddit.posts["linux"] = 300
+    results = Reddit.fetch_reddit_batch(URLS)
+    assert results[URLS[2]]["entries"] == []
+    assert reddit.calls == ["linux+Python+Grok", "Grok", "linux+Python+Grok"]
+
+
+class FakeHistory:
+    """Gives each feed a fixed refresh interval on the simulated clock."""
+
+    def __init__(self, intervals, clock):
+        self.intervals = intervals
+        self.clock = clock
+
+    def update_fetch(self, url, new_count, published=None):
+        return datetime.fromtimestamp(self.clock[0] + self.intervals[url])
+
+
+def test_staggered_schedule_batches_only_due_feeds(reddit, monkeypatch):
+    hour = 3600
+    names = ["linux", "Python", "Grok", "rust", "golang", "kernel"]
+    urls = [f"https://www.reddit.com/r/{name}/new/.rss" for name in names]
+    intervals = dict(zip(urls, [1 * hour, 2 * hour, 3 * hour, 4 * hour, 6 * hour, 12 * hour]))
+    reddit.posts.update({name: 30 for name in names})
+    clock = [1_700_000_000.0]
+
+    monkeypatch.setattr(workers, "ENABLE_REDDIT_API_FETCH", True)
+    monkeypatch.setattr(workers, "ENABLE_REDDIT_BATCH_FETCH", True)
+    monkeypatch.setattr(workers, "ENABLE_OBJECT_STORE_FEEDS", False)
+    monkeypatch.setattr(workers, "is_read_only", lambda: False)
+    monkeypatch.setattr(workers, "ALL_URLS", {url: SimpleNamespace(site_url=url) for url in urls})
+    monkeypatch.setattr(workers, "history", FakeHistory(intervals, clock))
+    with tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as lease_dir:
+        cache = DiskCacheWrapper(cache_dir)
+        monkeypatch.setattr(workers, "g_c", cache)
+        monkeypatch.setattr(workers, "feed_leases", FeedLeaseTable(DiskCacheWrapper(lease_dir).cache, 60))
+
+        fetched = 0
+        for _ in range(24):
+            due = sorted(cache.get_expired(urls, now=clock[0]))
+            calls_before = len(reddit.calls)
+            remaining = workers.fetch_reddit_feeds_batched(due)
+            if len(due) < 2:
+                # A lone due feed is left to its own listing
+                assert remaining == due and len(reddit.calls) == calls_before
+                cache.set_last_fetch(due[0], datetime.now(), next_due=datetime.fromtimestamp(clock[0] + hour))
+            else:
+                # One listing holding exactly the due subreddits, stored in the same pass
+                assert remaining == []
+                assert len(reddit.calls) == calls_before + 1
+                assert sorted(reddit.calls[-1].split("+")) == sorted(url.split("/")[4] for url in due)
+                assert not cache.get_expired(due, now=clock[0])
+                assert all(cache.get(url).entries for url in due)
+                fetched += len(due)
+            clock[0] += hour + 1
+
+    # Refreshing all six feeds every tick would be 24 listings of 6 subreddits
+    assert len(reddit.calls) == 16
+    assert fetched == sum(24 * hour // interval for interval in intervals.values()) - 8
@@ -0,0 +1,50 @@
+"""
+test_reddit_seen_ids.py
+
+Tests for the bounded per-feed ring of seen Reddit submission IDs.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Add the parent directory to Python path when running tests directly
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import Reddit
+from models import DiskCacheWrapper
+
+FEED = "https://www.reddit.com/r/linux/new/.rss"
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = DiskCacheWrapper(cache_dir)
+        monkeypatch.setattr(Reddit, "g_c", cache)
+        yield cache
+
+
+def test_ring_keeps_only_the_newest_ids(cache):
+    for batch in range(30):
+        Reddit._mark_reddit_ids_seen(FEED, [f"t3_{batch * 10 + i:x}" for i in range(10)])
+
+    seen = Reddit._get_seen_reddit_ids(FEED)
+    assert len(seen) == Reddit.SEEN_IDS_MAX
+    assert Reddit._is_seen(f"t3_{299:x}", seen)
+    assert not Reddit._is_seen(f"t3_{0:x}", seen)
+    assert len(cache.get(f"reddit_seen_ids:{FEED}")) == Reddit.SEEN_IDS_MAX * 8
+
+
+def test_legacy_sets_and_foreign_ids(cache):
+    cache.put(f"reddit_seen_ids:{FEED}", {"t3_abc12", "https://example.com/not-an-id"})
+
+    seen = Reddit._get_seen_reddit_ids(FEED)
+    assert Reddit._is_seen("t3_abc12", seen)
+    assert not Reddit._is_seen("t3_abc13", seen)
+    assert not Reddit._is_seen("https://example.com/not-an-id", seen)
+
+    Reddit._mark_reddit_ids_seen(FEED, ["t3_abc13", "t3_abc12"])
+    assert Reddit._get_seen_reddit_ids(FEED) == {int("abc12", 36), int("abc13", 36)}
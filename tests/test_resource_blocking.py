@@ -0,0 +1,74 @@
+"""
+test_resource_blocking.py
+
+Tests for the resource-blocking policy of headless fetches: which subresource
+requests are aborted, the URL patterns sent to Chrome, and the Playwright route.
+"""
+
+import sys
+from fnmatch import fnmatchcase
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the parent directory to Python path when running tests directly
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import browser_fetch
+from app_config import FetchConfig
+
+
+def test_default_policy_blocks_heavy_resources_and_trackers():
+    config = FetchConfig(needs_selenium=True)
+
+    for resource_type in ("image", "font", "media", "stylesheet"):
+        assert browser_fetch.should_block_request(config, resource_type, "https://example.com/x")
+    assert browser_fetch.should_block_request(config, "script", "https://www.google-analytics.com/analytics.js")
+    assert browser_fetch.should_block_request(config, "xhr", "https://securepubads.g.doubleclick.net/ad")
+
+    assert not browser_fetch.should_block_request(config, "document", "https://example.com/")
+    assert not browser_fetch.should_block_request(config, "script", "https://example.com/app.js")
+    assert not browser_fetch.should_block_request(config, "script", "https://notdoubleclick.net/app.js")
+
+
+def test_sites_can_opt_out():
+    config = FetchConfig(needs_selenium=True, blocked_resource_types=(), block_trackers=False)
+
+    assert not browser_fetch.should_block_request(config, "image", "https://example.com/a.png")
+    assert not browser_fetch.should_block_request(config, "script", "https://www.googletagmanager.com/gtm.js")
+    assert browser_fetch.get_blocked_url_patterns(config) == []
+
+
+def test_chrome_patterns_cover_types_and_hosts():
+    patterns = browser_fetch.get_blocked_url_patterns(FetchConfig(blocked_resource_types=("font",)))
+
+    assert "*.woff2*" in patterns and "*.css*" not in patterns
+    assert "*://doubleclick.net/*" in patterns and "*://*.doubleclick.net/*" in patterns
+
+
+def test_chrome_patterns_block_the_same_hosts_as_playwright():
+    config = FetchConfig(needs_selenium=True, blocked_resource_types=())
+    patterns = browser_fetch.get_blocked_url_patterns(config)
+
+    for url in ("https://doubleclick.net/ad", "https://securepubads.g.doubleclick.net/ad",
+                "https://notdoubleclick.net/app.js", "https://example.com/?ref=doubleclick.net/x",
+                "https://www.google-analytics.com/analytics.js", "https://example.com/app.js"):
+        # setBlockedURLs patterns: '*' matches any run of characters
+        chrome_blocks = any(fnmatchcase(url, pattern) for pattern in patterns)
+        assert chrome_blocks == browser_fetch.should_block_request(config, "script", url), url
+
+
+def test_playwright_route_aborts_blocked_requests():
+    routes = []
+    context = SimpleNamespace(unroute=lambda pattern: None,
+                              route=lambda pattern, handler: routes.append(handler))
+    wrapper = browser_fetch.PlaywrightBrowserWrapper(None, context, False, "UA")
+    wrapper.block_resources(FetchConfig(needs_selenium=True))
+
+    outcomes = []
+    for resource_type, url in (("image", "https://example.com/a.png"), ("document", "https://example.com/")):
+        route = SimpleNamespace(request=SimpleNamespace(resource_type=resource_type, url=url),
+                                abort=lambda: outcomes.append("abort"),
+                                continue_=lambda: outcomes.append("continue"))
+        routes[0](route)
+
+    assert outcomes == ["abort", "continue"]
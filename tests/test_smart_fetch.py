@@ -0,0 +1,110 @@
+"""
+test_smart_fetch.py
+
+Tests for smart_fetch revalidation: cached bytes are served without a request
+while fresh, revalidated with one metadata request afterwards, and downloaded
+again only when the object's ETag changes.
+"""
+
+import hashlib
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from cacheout import Cache
+
+# Add the parent directory to Python path when running tests directly
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import object_storage_config as oss_config
+import object_storage_sync
+from models import DiskCacheWrapper
+
+
+class FakeBucket:
+    """Stands in for the metadata lookup and the storage driver's download."""
+
+    def __init__(self):
+        self.objects = {}
+        self.metadata_requests = 0
+        self.downloads = 0
+
+    def get_object(self, name):
+        self.metadata_requests += 1
+        data = self.objects.get(name)
+        if data is None:
+            return None
+        return SimpleNamespace(name=name, size=len(data), hash=hashlib.md5(data).hexdigest(),
+                               extra={'last_modified': 'Sat, 01 Jan 2025 00:00:00 GMT'})
+
+    def download_object_as_stream(self, obj, buffer):
+        self.downloads += 1
+        buffer.write(self.objects[obj.name])
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    bucket = FakeBucket()
+    monkeypatch.setattr(object_storage_sync, "_get_object", bucket.get_object)
+    monkeypatch.setattr(oss_config, "_storage_driver", bucket, raising=False)
+    monkeypatch.setattr(object_storage_sync, "g_cm", Cache())
+    monkeypatch.setattr(object_storage_sync, "_smart_fetch_stats",
+                        {'fresh': 0, 'revalidated': 0, 'misses': 0, 'not_found': 0})
+    with tempfile.TemporaryDirectory() as directory:
+        monkeypatch.setattr(object_storage_sync, "g_cs", DiskCacheWrapper(directory))
+        yield bucket
+
+
+def put(bucket, key, data):
+    bucket.objects[object_storage_sync._bytes_object_name(key)] = data
+
+
+def test_fresh_copy_needs_no_request(bucket):
+    put(bucket, "feed", b"v1")
+
+    assert object_storage_sync.smart_fetch("feed", cache_expiry=300)[0] == b"v1"
+    assert object_storage_sync.smart_fetch("feed", cache_expiry=300)[0] == b"v1"
+
+    assert bucket.metadata_requests == 1
+    assert bucket.downloads == 1
+    stats = object_storage_sync.get_smart_fetch_stats()
+    assert (stats['fresh'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+
+
+def test_unchanged_object_is_revalidated_without_download(bucket):
+    put(bucket, "feed", b"v1")
+    object_storage_sync.smart_fetch("feed", cache_expiry=0)
+
+    content, metadata = object_storage_sync.smart_fetch("feed", cache_expiry=0)
+
+    assert content == b"v1"
+    assert metadata['hash'] == hashlib.md5(b"v1").hexdigest()
+    assert bucket.metadata_requests == 2
+    assert bucket.downloads == 1
+    assert object_storage_sync.get_smart_fetch_stats()['revalidated'] == 1
+
+
+def test_changed_object_is_downloaded_again(bucket):
+    put(bucket, "feed", b"v1")
+    object_storage_sync.smart_fetch("feed", cache_expiry=0)
+    put(bucket, "feed", b"v2")
+
+    assert object_storage_sync.smart_fetch("feed", cache_expiry=0)[0] == b"v2"
+    assert bucket.downloads == 2
+
+
+def test_shared_cache_serves_other_processes(bucket, monkeypatch):
+    put(bucket, "feed", b"v1")
+    object_storage_sync.smart_fetch("feed", cache_expiry=0)
+
+    # A new process starts with an empty memory cache but shares the disk cache
+    monkeypatch.setattr(object_storage_sync, "g_cm", Cache())
+    assert object_storage_sync.smart_fetch("feed", cache_expiry=0)[0] == b"v1"
+    assert bucket.downloads == 1
+
+
+def test_missing_object(bucket):
+    assert object_storage_sync.smart_fetch("missing") == (None, None)
+    assert object_storage_sync.get_smart_fetch_stats()['not_found'] == 1
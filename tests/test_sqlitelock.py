@@ -6,6 +6,8 @@ import uuid
 import tempfile
 from contextlib import contextmanager
 from SqliteLock import DiskcacheSqliteLock
+from FcntlLock import FcntlLock
+from models import LockHeartbeat
 from filelock import FileLock
 
 def clear_cache(cache):
@@ -177,6 +179,105 @@ def test_lock_cleanup():
     lock.release()
 
 
+def test_diskcache_lock_renew():
+    """Test that renewing extends a held lock past its original timeout."""
+    cache = diskcache.Cache('test_cache')
+    clear_cache(cache)
+    lock1 = DiskcacheSqliteLock('test_lock', cache)
+    lock2 = DiskcacheSqliteLock('test_lock', cache)
+
+    assert lock1.acquire(timeout_seconds=1)
+    time.sleep(0.6)
+    assert lock1.renew(timeout_seconds=1)
+    time.sleep(0.6)
+    # Past the original timeout, but the renewal keeps it ours
+    assert lock1.locked()
+    assert not lock2.acquire(timeout_seconds=0)
+    assert lock1.release()
+
+    # A lock that was never acquired cannot be renewed
+    assert not lock2.renew(timeout_seconds=1)
+
+
+def test_diskcache_lock_heartbeat():
+    """Test that a heartbeat keeps a short lock alive during long work."""
+    cache = diskcache.Cache('test_cache')
+    clear_cache(cache)
+    lock1 = DiskcacheSqliteLock('test_lock', cache)
+    lock2 = DiskcacheSqliteLock('test_lock', cache)
+
+    assert lock1.acquire(timeout_seconds=1)
+    with LockHeartbeat(lambda: lock1.renew(1), interval=0.3):
+        time.sleep(2)
+        assert not lock2.acquire(timeout_seconds=0)
+    assert lock1.release()
+
+
+def test_fcntl_lock_basic():
+    with tempfile.TemporaryDirectory() as lock_dir:
+        lock1 = FcntlLock('test_lock', lock_dir)
+        lock2 = FcntlLock('test_lock', lock_dir)
+        assert lock1.acquire()
+        assert lock1.locked()
+        # Conflicts with another instance even in the same process
+        assert not lock2.acquire(wait=False)
+        assert not lock2.locked()
+        assert lock1.renew(timeout_seconds=5)
+        assert lock1.release()
+        assert not lock1.locked()
+        assert not lock1.release()
+        assert lock2.acquire()
+        assert lock2.release()
+
+
+def test_fcntl_lock_wait_blocks_until_release():
+    with tempfile.TemporaryDirectory() as lock_dir:
+        lock1 = FcntlLock('test_lock', lock_dir)
+        lock2 = FcntlLock('test_lock', lock_dir)
+        assert lock1.acquire()
+        threading.Timer(0.5, lock1.release).start()
+
+        start = time.monotonic()
+        assert lock2.acquire(timeout_seconds=5, wait=True)
+        assert 0.4 < time.monotonic() - start < 2
+        assert lock2.release()
+
+
+def test_fcntl_lock_wait_timeout_leaves_lock_usable():
+    with tempfile.TemporaryDirectory() as lock_dir:
+        lock1 = FcntlLock('test_lock', lock_dir)
+        lock2 = FcntlLock('test_lock', lock_dir)
+        lock3 = FcntlLock('test_lock', lock_dir)
+        assert lock1.acquire()
+        assert not lock2.acquire(timeout_seconds=0.2, wait=True)
+        assert lock1.release()
+
+        # The abandoned waiter must not keep the lock once it gets it
+        assert lock3.acquire(timeout_seconds=2, wait=True)
+        assert lock3.release()
+
+
+def test_fcntl_lock_context_manager():
+    with tempfile.TemporaryDirectory() as lock_dir:
+        with FcntlLock('name/with:odd chars', lock_dir) as lock:
+            assert lock.locked()
+            assert not FcntlLock('name/with:odd chars', lock_dir).acquire()
+        lock = FcntlLock('name/with:odd chars', lock_dir)
+        assert lock.acquire()
+        assert lock.release()
+
+
+def test_fcntl_lock_failed_try_closes_file():
+    with tempfile.TemporaryDirectory() as lock_dir:
+        holder = FcntlLock('test_lock', lock_dir)
+        assert holder.acquire()
+        open_fds = len(os.listdir('/proc/self/fd'))
+        for _ in range(100):
+            assert not FcntlLock('test_lock', lock_dir).acquire(wait=False)
+        assert len(os.listdir('/proc/self/fd')) == open_fds
+        assert holder.release()
+
+
 if __name__ == '__main__':
     # Add the parent directory to Python path when running tests directly
     import sys
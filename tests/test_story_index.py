@@ -0,0 +1,107 @@
+"""
+test_story_index.py
+
+Tests for the SimHash headline index used to cluster the same story across feeds.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import diskcache
+
+# Add the parent directory to Python path when running tests directly
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from story_index import STORY_BAND_PREFIX, STORY_KEY_PREFIX, MAX_AGE_SECONDS, CachedStoryIndex, StoryIndex, collapse_duplicates, hamming, mark_duplicates, simhash
+
+TITLE = "Linus Torvalds Releases Linux 6.12 With Real-Time Support Merged"
+
+
+def test_near_identical_titles_have_close_fingerprints():
+    variants = [
+        "Linus Torvalds releases Linux 6.12 with real-time support merged",
+        "Linus Torvalds Releases Linux 6.12, With Real-Time Support Merged!",
+        "Linus Torvalds Releases Linux 6.12 with Real Time Support Merged",
+    ]
+    for variant in variants:
+        assert hamming(simhash(TITLE), simhash(variant)) <= 3
+
+    unrelated = simhash("Firefox 130 adds on-device translation for web pages")
+    assert hamming(simhash(TITLE), unrelated) > 3
+
+
+def test_short_titles_are_not_fingerprinted():
+    assert simhash("Linux 6.12") is None
+    assert StoryIndex().add("https://a/1", "Linux 6.12", "feed-a") is None
+
+
+def test_duplicates_point_at_first_copy_from_another_feed():
+    index = StoryIndex()
+    assert index.add("https://lwn.net/1", TITLE, "lwn", now=100) is None
+    assert index.add("https://slashdot.org/1", TITLE.upper(), "slashdot", now=200) == "https://lwn.net/1"
+    assert index.add("https://reddit.com/1", TITLE + "!", "reddit", now=300) == "https://lwn.net/1"
+
+    # Refetching a known link keeps its cluster without rescanning
+    assert index.add("https://slashdot.org/1", TITLE, "slashdot", now=400) == "https://lwn.net/1"
+    assert index.add("https://lwn.net/1", TITLE, "lwn", now=400) is None
+
+    # The same feed repeating a headline is not a cross-feed duplicate
+    assert index.add("https://lwn.net/2", TITLE, "lwn", now=500) is None
+
+
+def test_same_link_in_another_feed_is_a_duplicate():
+    index = StoryIndex()
+    assert index.add("https://lwn.net/1", TITLE, "lwn", now=100) is None
+    assert index.add("https://lwn.net/1", TITLE, "lxer", now=200) == "https://lwn.net/1"
+    # The feed that carried it first still sees it as the first copy
+    assert index.add("https://lwn.net/1", TITLE, "lwn", now=300) is None
+
+def test_prune_forgets_old_stories():
+    index = StoryIndex()
+    index.add("https://lwn.net/1", TITLE, "lwn", now=0)
+    index.prune(now=MAX_AGE_SECONDS + 1)
+    assert not index.entries and not index.bands
+    assert index.add("https://slashdot.org/1", TITLE, "slashdot", now=MAX_AGE_SECONDS + 2) is None
+
+
+def test_mark_duplicates_persists_index_in_cache():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = diskcache.Cache(directory)
+        first = [{"link": "https://lwn.net/1", "title": TITLE}]
+        second = [{"link": "https://slashdot.org/1", "title": TITLE.lower()},
+                  {"link": "https://slashdot.org/2", "title": "GNOME 47 ships with accent colors and a new file chooser"}]
+
+        mark_duplicates(cache, "lwn", first)
+        mark_duplicates(cache, "slashdot", second)
+
+        assert "duplicate_of" not in first[0]
+        assert second[0]["duplicate_of"] == "https://lwn.net/1"
+        assert "duplicate_of" not in second[1]
+        stories = [key for key in cache if key.startswith(STORY_KEY_PREFIX)]
+        assert len(stories) == 3
+        _, expire_time = cache.get(stories[0], expire_time=True)
+        assert expire_time is not None
+        cache.close()
+
+
+def test_cached_index_skips_expired_stories():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = diskcache.Cache(directory)
+        index = CachedStoryIndex(cache)
+        assert index.add("https://lwn.net/1", TITLE, "lwn", now=0) is None
+
+        assert index.add("https://slashdot.org/1", TITLE, "slashdot", now=MAX_AGE_SECONDS + 1) is None
+        assert index.add("https://reddit.com/1", TITLE, "reddit", now=MAX_AGE_SECONDS + 2) == "https://slashdot.org/1"
+        # Writing a band drops the members that expired
+        assert len(cache.get(f"{STORY_BAND_PREFIX}0:{simhash(TITLE) & 0xFFFF}")) == 2
+        cache.close()
+
+
+def test_collapse_duplicates_keeps_first_article():
+    articles = [
+        {"title": TITLE, "url": "https://lwn.net/1"},
+        {"title": "GNOME 47 ships with accent colors and a new file chooser", "url": "https://gnome.org/1"},
+        {"title": TITLE.lower(), "url": "https://slashdot.org/1"},
+    ]
+    assert [a["url"] for a in collapse_duplicates(articles)] == ["https://lwn.net/1", "https://gnome.org/1"]
@@ -0,0 +1,260 @@
+"""
+test_tor_fetch.py
+
+Tests for in-process Tor fetching through a SOCKS5 proxy. A small local SOCKS5
+server and HTTP server stand in for the Tor daemon and Reddit, so the tests
+check real proxying and connection reuse without network access.
+"""
+
+import socket
+import struct
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add the parent directory to Python path when running tests directly
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import Tor
+import workers
+
+FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>r/linux</title>
+<entry><title>Kernel 7.0 released</title><link href="https://example.com/a"/><id>a</id><updated>2025-01-01T00:00:00Z</updated></entry>
+<entry><title>Caf\xc3\xa9 driver merged</title><link href="https://example.com/b"/><id>b</id><updated>2025-01-01T00:00:00Z</updated></entry>
+</feed>"""
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.server.user_agents.append(self.headers.get("User-Agent"))
+        body = FEED if self.path != "/huge" else b"x" * (Tor.MAX_FEED_BYTES + 1)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/atom+xml; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class Socks5Server:
+    """Minimal SOCKS5 CONNECT proxy supporting no-auth and username/password auth."""
+
+    def __init__(self):
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self.listener.getsockname()[1]
+        self.connections = 0
+        self.usernames = []
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"socks5h://127.0.0.1:{self.port}"
+
+    def _serve(self):
+        while True:
+            try:
+                client, _ = self.listener.accept()
+            except OSError:
+                return
+            self.connections += 1
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._handle, args=(client,), daemon=True).start()
+
+    @staticmethod
+    def _recv(sock, n):
+        data = b""
+        while len(data) < n:
+            chunk = sock.recv(n - len(data))
+            if not chunk:
+                raise ConnectionError("client closed")
+            data += chunk
+        return data
+
+    def _handle(self, client):
+        try:
+            _, count = self._recv(client, 2)
+            methods = self._recv(client, count)
+            if 2 in methods:
+                client.sendall(b"\x05\x02")
+                _, ulen = self._recv(client, 2)
+                username = self._recv(client, ulen)
+                plen = self._recv(client, 1)[0]
+                self._recv(client, plen)
+                self.usernames.append(username.decode())
+                client.sendall(b"\x01\x00")
+            else:
+                client.sendall(b"\x05\x00")
+            _, _, _, atyp = self._recv(client, 4)
+            if atyp == 3:
+                host = self._recv(client, self._recv(client, 1)[0]).decode()
+            else:
+                host = socket.inet_ntoa(self._recv(client, 4))
+            port = struct.unpack(">H", self._recv(client, 2))[0]
+            upstream = socket.create_connection(("127.0.0.1" if host == "localhost" else host, port))
+            upstream.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client.sendall(b"\x05\x00\x00\x01\x00\x00\x00\x00\x00\x00")
+        except (OSError, ConnectionError):
+            client.close()
+            return
+        threading.Thread(target=self._pipe, args=(upstream, client), daemon=True).start()
+        self._pipe(client, upstream)
+
+    @staticmethod
+    def _pipe(source, target):
+        try:
+            while True:
+                data = source.recv(65536)
+                if not data:
+                    break
+                target.sendall(data)
+        except OSError:
+            pass
+        finally:
+            for sock in (source, target):
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    def close(self):
+        self.listener.close()
+
+
+@pytest.fixture
+def servers():
+    http_server = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+    http_server.user_agents = []
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+    proxy = Socks5Server()
+    yield f"http://localhost:{http_server.server_address[1]}", http_server, proxy
+    Tor._reset_tor_sessions()
+    http_server.shutdown()
+    proxy.close()
+
+
+pytestmark = pytest.mark.skipif(not Tor.SOCKS_AVAILABLE, reason="PySocks is not installed")
+
+
+def test_fetch_parses_feed_once_through_proxy(servers):
+    base, http_server, proxy = servers
+
+    result = Tor.fetch_via_socks(f"{base}/r/linux/.rss", "TestAgent/1.0", proxy=proxy.url)
+
+    assert [entry.title for entry in result.entries] == ["Kernel 7.0 released", "Café driver merged"]
+    assert http_server.user_agents == ["TestAgent/1.0"]
+    assert proxy.connections == 1
+
+
+def test_session_is_reused_until_circuit_reset(servers):
+    base, _, proxy = servers
+
+    for _ in range(3):
+        assert Tor.fetch_via_socks(f"{base}/r/linux/.rss", "TestAgent/1.0", proxy=proxy.url)
+    assert proxy.connections == 1  # one SOCKS handshake for all three fetches
+
+    Tor._reset_tor_sessions(proxy.url)
+    assert Tor.fetch_via_socks(f"{base}/r/linux/.rss", "TestAgent/1.0", proxy=proxy.url)
+    assert proxy.connections == 2
+
+
+def test_oversized_and_unparseable_responses_fail(servers, monkeypatch):
+    base, _, proxy = servers
+    monkeypatch.setattr(Tor, "_cached_tor_result", lambda url: None)
+
+    assert Tor.fetch_via_socks(f"{base}/huge", "TestAgent/1.0", proxy=proxy.url) is None
+    assert Tor.parse_feed_bytes(b"<html>not a feed</html>") is None
+
+
+def test_pool_circuits_are_isolated_and_rotate_alone(servers):
+    base, _, proxy = servers
+    pool = Tor.TorCircuitPool(2, [proxy.port])
+
+    with pool.circuit() as first, pool.circuit() as second:
+        assert first is not second
+        for circuit in (first, second):
+            assert Tor.fetch_via_socks(f"{base}/r/linux/.rss", circuit.user_agent, proxy=circuit.proxy)
+        first.record_failure()
+        assert Tor.fetch_via_socks(f"{base}/r/linux/.rss", first.user_agent, proxy=first.proxy)
+        assert Tor.fetch_via_socks(f"{base}/r/linux/.rss", second.user_agent, proxy=second.proxy)
+
+    # A new username puts the rotated circuit on a new connection; the other keeps its own
+    assert proxy.usernames == ["circuit0-0", "circuit1-0", "circuit0-1"]
+    assert [c["generation"] for c in pool.stats()] == [1, 0]
+
+
+def test_fetches_run_concurrently_on_separate_circuits(monkeypatch):
+    pool = Tor.TorCircuitPool(2, [9050])
+    barrier = threading.Barrier(2, timeout=5)
+    proxies = []
+
+    def fetch(url, user_agent, proxy):
+        proxies.append(proxy)
+        barrier.wait()  # both fetches must be in flight at once
+        return {"entries": [{"title": url}]}
+
+    monkeypatch.setattr(Tor, "fetch_via_http", fetch)
+    monkeypatch.setattr(Tor.g_cs, "get", lambda key: "http")
+    monkeypatch.setattr(Tor.g_cs, "put", lambda *args, **kwargs: None)
+
+    results = []
+    threads = [threading.Thread(target=lambda u=u: results.append(Tor.fetch_via_tor(u, u, pool=pool)))
+               for u in ("https://reddit.com/r/a/.rss", "https://reddit.com/r/b/.rss")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 2 and all(r["entries"] for r in results)
+    assert len(set(proxies)) == 2
+
+
+
+def test_reddit_feeds_of_one_refresh_use_every_circuit(monkeypatch):
+    pool = Tor.TorCircuitPool(2, [9050])
+    barrier = threading.Barrier(2, timeout=5)
+    proxies = []
+
+    def fetch(url, user_agent, proxy):
+        proxies.append(proxy)
+        barrier.wait()  # feeds on the same domain must still overlap
+        return {"entries": [{"title": url}]}
+
+    monkeypatch.setattr(Tor, "fetch_via_http", fetch)
+    monkeypatch.setattr(Tor.g_cs, "get", lambda key: "http")
+    monkeypatch.setattr(Tor.g_cs, "put", lambda *args, **kwargs: None)
+    monkeypatch.setattr(Tor, "tor_circuits", pool)
+    monkeypatch.setattr(workers, "tor_circuits", pool)
+    monkeypatch.setattr(workers, "USE_TOR", True)
+    monkeypatch.setattr(workers, "ENABLE_REDDIT_API_FETCH", False)
+    monkeypatch.setattr(workers, "DEBUG", False)
+    monkeypatch.setattr(workers, "load_url_worker",
+                        lambda url: workers.RedditFetcher().fetch(url, SimpleNamespace(site_url=url)))
+
+    workers.process_urls_in_parallel([f"https://www.reddit.com/r/{name}/.rss" for name in "abcd"])
+
+    assert len(proxies) == 4 and len(set(proxies)) == 2
+    assert not barrier.broken
+
+
+def test_failed_fetch_rotates_only_its_circuit(monkeypatch):
+    pool = Tor.TorCircuitPool(2, [9050])
+    outcomes = iter([None, {"entries": [{"title": "ok"}]}])
+    monkeypatch.setattr(Tor, "fetch_via_http", lambda url, user_agent, proxy: next(outcomes))
+    monkeypatch.setattr(Tor, "fetch_site_posts", lambda site_url, user_agent: None)
+    monkeypatch.setattr(Tor.g_cs, "get", lambda key: "http")
+    monkeypatch.setattr(Tor.g_cs, "put", lambda *args, **kwargs: None)
+
+    result = Tor.fetch_via_tor("https://reddit.com/r/a/.rss", "https://reddit.com/r/a", pool=pool)
+
+    assert result["entries"]
+    assert [(c["generation"], c["failures"]) for c in pool.stats()] == [(1, 0), (0, 0)]
@@ -19,6 +19,7 @@ License: See LICENSE file
 
 # Standard library imports
 from datetime import datetime, timedelta
+import calendar
 import concurrent.futures
 import itertools
 import os
@@ -28,7 +29,6 @@ import threading
 from timeit import default_timer as timer
 from urllib.parse import urlparse
 from collections import defaultdict
-import pickle
 from abc import ABC, abstractmethod
 import socket
 import sqlite3
@@ -42,20 +42,29 @@ from selenium.common.exceptions import WebDriverException
 
 # Local application imports
 from feedfilter import merge_entries
+from fetch_budget import prioritize
+from feed_leases import new_owner_id
+from story_index import mark_duplicates
+from feed_codec import encode_feed, decode_feed, FeedFormatError
+from feed_bundle import publish_feed_bundle, sync_feed_bundle
+from frontend_sync import publish_fragments
+from leader_election import is_read_only
+from models import LockHeartbeat
 from browser_fetch import fetch_site_posts
 from shared import (
     ALL_URLS, EXPIRE_WEEK, EXPIRE_YEARS, MAX_ITEMS, TZ,
     USER_AGENT, RssFeed, g_c, g_cs, g_cm, get_lock, GLOBAL_FETCH_MODE_LOCK_KEY,
     ENABLE_OBJECT_STORE_FEEDS, OBJECT_STORE_FEED_TIMEOUT,
-    ENABLE_OBJECT_STORE_FEED_PUBLISH, g_logger, history, WORKER_PROXYING,
+    ENABLE_OBJECT_STORE_FEED_PUBLISH, ENABLE_LEADER_ELECTION, g_logger, history, WORKER_PROXYING,
     PROXY_SERVER, PROXY_USERNAME, PROXY_PASSWORD,
-    ENABLE_REDDIT_API_FETCH
+    ENABLE_REDDIT_API_FETCH, ENABLE_REDDIT_BATCH_FETCH, SITE_URLS, fetch_budget, feed_leases,
+    FEED_LEASE_SECONDS
 )
-from Tor import fetch_via_tor
+from Tor import fetch_via_tor, tor_circuits
 from app_config import DEBUG, USE_TOR
-from Reddit import fetch_reddit_feed_as_feedparser
+from Reddit import fetch_reddit_feed_as_feedparser, fetch_reddit_batch
 from object_storage_config import StorageOperationError, LibcloudError
-from object_storage_sync import smart_fetch, publish_bytes
+from object_storage_sync import smart_fetch, publish_bytes, get_smart_fetch_stats
 
 # =============================================================================
 # GLOBAL CONSTANTS AND CONFIGURATION
@@ -119,13 +128,30 @@ class DefaultFetcher(FetcherStrategy):
         return list(itertools.islice(new_entries, MAX_ITEMS))
 
 class LwnFetcher(FetcherStrategy):
-    """Strategy for handling the unique paywall logic of LWN.net feeds."""
+    """
+    Strategy for handling the unique paywall logic of LWN.net feeds.
+
+    Subscriber-only ("[$]") articles are held in `lwn_pending` until they become
+    free. Displayed links are kept in `lwn_displayed_at` as link -> display time and
+    forgotten once they are old and have left the feed, so the cached state stays
+    bounded by the feed window instead of growing forever.
+    """
+
+    # Subscriber-only articles become free this long after publication
+    PAYWALL_DAYS = 15
+
+    # How long a displayed link is remembered after it was displayed, unless still in the feed
+    DISPLAYED_RETENTION_DAYS = 30
 
     def fetch(self, url, rss_info):
+        now = datetime.now(TZ)
         pending = g_c.get("lwn_pending") or {}
-        displayed = g_c.get("lwn_displayed") or set()
+        displayed = g_c.get("lwn_displayed_at")
+        if displayed is None:
+            # Migrate the legacy unbounded set of links
+            displayed = dict.fromkeys(g_c.get("lwn_displayed") or (), now.timestamp())
+            g_c.delete("lwn_displayed")
         res = feedparser.parse(url, agent=USER_AGENT)
-        now = datetime.now(TZ)
         ready = []
         
         for entry in res.entries:
@@ -140,24 +166,28 @@ class LwnFetcher(FetcherStrategy):
             else:
                 if link not in displayed:
                     ready.append({'link': link, 'title': title, 'html_content': '', 'published': pub, 'published_parsed': entry.published_parsed})
-                    displayed.add(link)
+                    displayed[link] = now.timestamp()
                     pending.pop(link, None)
         
         for link, info in list(pending.items()):
-            if now - info['published'] >= timedelta(days=15):
+            if now - info['published'] >= timedelta(days=self.PAYWALL_DAYS):
                 title = info['title']
                 if title.startswith("[$]"):
                     title = title[3:].strip()
                 
-                import time
                 ready.append({'link': link, 'title': title, 'html_content': '', 'published': now})
-                displayed.add(link)
+                displayed[link] = now.timestamp()
                 pending.pop(link)
                 g_logger.info(f"[LWN] Article now available for free: {info['title']} ({link}) at {now.isoformat()}")
+
+        # Links still in the feed must be remembered, or they would be displayed again
+        feed_links = {entry.link for entry in res.entries}
+        cutoff = now.timestamp() - self.DISPLAYED_RETENTION_DAYS * 86400
+        displayed = {link: shown for link, shown in displayed.items() if shown >= cutoff or link in feed_links}
         
         ready.sort(key=lambda x: x['published'])
         g_c.put("lwn_pending", pending)
-        g_c.put("lwn_displayed", displayed)
+        g_c.put("lwn_displayed_at", displayed)
         return ready
 
 class RedditFetcher(FetcherStrategy):
@@ -236,7 +266,7 @@ def load_url_worker(url):
     Background worker to fetch and process a single RSS feed URL.
     
     This function handles the complete lifecycle of RSS feed processing:
-    - Acquires thread-safe locks to prevent duplicate fetching
+    - Leases the feed so no other process fetches it at the same time
     - Attempts object storage retrieval first (if enabled)
     - Falls back to standard RSS parsing if needed
     - Processes and filters feed entries
@@ -250,13 +280,16 @@ def load_url_worker(url):
     Returns:
         None: Results are stored in the global cache
     """
+    if is_read_only():
+        g_logger.warning(f"Read-only node, not fetching {url}.")
+        return
+
     rss_info = ALL_URLS[url]
-    lock_key = f"feed_fetch:{url}"
 
-    # Use distributed locking to ensure only one process fetches this URL at a time
-    with get_lock(lock_key, owner_prefix=f"feed_worker_{os.getpid()}") as lock:
-        if not lock.locked():
-            g_logger.warning(f"Could not acquire lock for {url}, another process is fetching.")
+    # Lease the feed so only one process fetches this URL at a time
+    with feed_leases.lease(url) as leased:
+        if not leased:
+            g_logger.info(f"{url} is leased by another process, which is already fetching it.")
             return
 
         start = timer()
@@ -265,105 +298,126 @@ def load_url_worker(url):
             content, _ = smart_fetch(url, cache_expiry=OBJECT_STORE_FEED_TIMEOUT)
             if content:
                 try:
-                    rssfeed = pickle.loads(content)
-                    if isinstance(rssfeed, RssFeed):
-                        g_c.put(url, rssfeed, timeout=EXPIRE_WEEK)
-                        g_c.set_last_fetch(url, datetime.now(TZ), timeout=EXPIRE_WEEK)
-                        g_logger.info(f"Successfully fetched processed feed from object store: {url}")
-                        return
-                except (pickle.UnpicklingError, TypeError) as e:
+                    rssfeed = decode_feed(content)
+                    fetch_time = datetime.now(TZ)
+                    g_c.put(url, rssfeed, timeout=EXPIRE_WEEK)
+                    g_c.set_last_fetch(url, fetch_time, timeout=EXPIRE_WEEK,
+                                       next_due=history.get_next_due(url, fetch_time))
+                    g_logger.info(f"Successfully fetched processed feed from object store: {url}")
+                    return
+                except FeedFormatError as e:
                     g_logger.error(f"Error parsing object store feed for {url}: {e}")
 
         fetcher = get_fetcher(url)
         new_entries = fetcher.fetch(url, rss_info)
+        _store_feed(url, rss_info, new_entries, start)
 
-        if not new_entries:
-            g_logger.warning(f"No entries found for {url}.")
-            # Continue processing - let the rest of the function handle empty entries
+def _store_feed(url, rss_info, new_entries, start):
+    """
+    Merge freshly fetched entries into a feed and store it with its fetch time.
 
-        for entry in new_entries:
-            entry['underlying_url'] = entry.get('origin_link', entry.get('link', ''))
-            if 'content' in entry and entry['content']:
-                entry['html_content'] = entry['content'][0].get('value', '')
-            else:
-                entry['html_content'] = entry.get('summary', '')
-
-            if not entry.get('published_parsed'):
-                import time
-                entry['published_parsed'] = time.gmtime()
-                entry['published'] = time.strftime('%a, %d %b %Y %H:%M:%S GMT', entry['published_parsed'])
-
-            if "reddit" in url:
-                if "reddit" not in entry.get('underlying_url', ''):
-                    entry['link'] = entry['underlying_url']
-                else:
-                    links = LINK_REGEX.findall(entry.get('html_content', ''))
-                    links = [lnk for lnk in links if 'reddit.com' not in lnk]
-                    if links:
-                        entry['link'] = links[0]
-
-        old_feed = g_c.get(url)
-        new_count = len(new_entries)
-        if old_feed and old_feed.entries:
-            new_count = len(set(e.get('link') for e in new_entries) - set(e.get('link') for e in old_feed.entries))
-            entries = merge_entries(new_entries, old_feed.entries)
+    Called with the feed's lease held, for feeds fetched one by one and for the
+    Reddit feeds of a batch.
+
+    Args:
+        url (str): The RSS feed URL
+        rss_info: The feed's RssInfo
+        new_entries (list): Entries just fetched, newest first
+        start (float): timer() value when the fetch started, for logging
+    """
+    if not new_entries:
+        g_logger.warning(f"No entries found for {url}.")
+        # Continue processing - let the rest of the function handle empty entries
+
+    for entry in new_entries:
+        entry['underlying_url'] = entry.get('origin_link', entry.get('link', ''))
+        if 'content' in entry and entry['content']:
+            entry['html_content'] = entry['content'][0].get('value', '')
         else:
-            entries = new_entries
+            entry['html_content'] = entry.get('summary', '')
 
-        entries = list(itertools.islice(entries, MAX_ITEMS))
-        history.update_fetch(url, new_count)
+        if not entry.get('published_parsed'):
+            import time
+            entry['published_parsed'] = time.gmtime()
+            entry['published'] = time.strftime('%a, %d %b %Y %H:%M:%S GMT', entry['published_parsed'])
 
-        top_articles = []
-        if old_feed and old_feed.entries:
-            previous_top_5 = set(e['link'] for e in old_feed.entries[:5])
-            current_top_5 = set(e['link'] for e in entries[:5])
-            if previous_top_5 == current_top_5:
-                top_articles = old_feed.top_articles
+        if "reddit" in url:
+            if "reddit" not in entry.get('underlying_url', ''):
+                entry['link'] = entry['underlying_url']
+            else:
+                links = LINK_REGEX.findall(entry.get('html_content', ''))
+                links = [lnk for lnk in links if 'reddit.com' not in lnk]
+                if links:
+                    entry['link'] = links[0]
+
+    old_feed = g_c.get(url)
+    new_count = len(new_entries)
+    fresh_entries = new_entries
+    if old_feed and old_feed.entries:
+        old_links = set(e.get('link') for e in old_feed.entries)
+        fresh_entries = [e for e in new_entries if e.get('link') not in old_links]
+        new_count = len(set(e.get('link') for e in fresh_entries))
+        entries = merge_entries(new_entries, old_feed.entries)
+    else:
+        entries = new_entries
 
-        rssfeed = RssFeed(entries, top_articles=top_articles)
+    entries = list(itertools.islice(entries, MAX_ITEMS))
+    mark_duplicates(g_c.cache, url, entries)
+    published = [calendar.timegm(e['published_parsed']) for e in fresh_entries if e.get('published_parsed')]
+    next_due = history.update_fetch(url, new_count, published=published)
 
-        if ENABLE_OBJECT_STORE_FEED_PUBLISH:
-            try:
-                feed_data = pickle.dumps(rssfeed)
-                publish_bytes(feed_data, url)
-                g_logger.info(f"Successfully published feed to object store: {url}")
-            except (pickle.PicklingError, ValueError, StorageOperationError, LibcloudError) as e:
-                g_logger.error(f"Error publishing feed to object store for {url}: {e}")
+    top_articles = []
+    if old_feed and old_feed.entries:
+        previous_top_5 = set(e['link'] for e in old_feed.entries[:5])
+        current_top_5 = set(e['link'] for e in entries[:5])
+        if previous_top_5 == current_top_5:
+            top_articles = old_feed.top_articles
 
-        g_c.put(url, rssfeed, timeout=EXPIRE_WEEK)
-        g_c.set_last_fetch(url, datetime.now(TZ), timeout=EXPIRE_WEEK)
+    rssfeed = RssFeed(entries, top_articles=top_articles)
 
-        if len(entries) > 2:
-            g_cm.delete(rss_info.site_url)
-            
-        end = timer()
-        g_logger.info(f"Parsing from: {url}, in {end - start:f}. New articles: {new_count}")
+    if ENABLE_OBJECT_STORE_FEED_PUBLISH:
+        try:
+            feed_data = encode_feed(rssfeed)
+            publish_bytes(feed_data, url)
+            g_logger.info(f"Successfully published feed to object store: {url} ({len(feed_data)} bytes)")
+        except (TypeError, ValueError, StorageOperationError, LibcloudError) as e:
+            g_logger.error(f"Error publishing feed to object store for {url}: {e}")
+
+    g_c.put(url, rssfeed, timeout=EXPIRE_WEEK)
+    g_c.set_last_fetch(url, datetime.now(TZ), timeout=EXPIRE_WEEK, next_due=next_due)
+
+    if len(entries) > 2:
+        g_cm.delete(rss_info.site_url)
+        
+    end = timer()
+    g_logger.info(f"Parsing from: {url}, in {end - start:f}. New articles: {new_count}")
 
 # =============================================================================
 # LOCKING AND THREADING UTILITIES
 # =============================================================================
 
-def _acquire_fetch_lock():
+def _acquire_cycle_flag():
     """
-    Acquire the global fetch lock with timeout.
-    
+    Mark a background refresh cycle as running, without waiting.
+
+    The flag only keeps two refresh cycles from scanning for expired feeds at the
+    same time; it does not stop other processes from fetching feeds, which is
+    governed by the per-feed leases.
+
     Returns:
-        SqliteLock or None: The acquired lock object, or None if acquisition failed
+        SqliteLock or None: The acquired flag, or None if a cycle is already running
     """
     lock = get_lock(GLOBAL_FETCH_MODE_LOCK_KEY, owner_prefix=f"fetch_mode_{os.getpid()}")
-    if lock.acquire(timeout_seconds=60, wait=True):
-        g_logger.info("Acquired global fetch lock.")
+    if lock.acquire(timeout_seconds=FEED_LEASE_SECONDS, wait=False):
         return lock
-    else:
-        g_logger.warning("Failed to acquire global fetch lock after waiting.")
-        return None
+    return None
 
 def _check_fetch_lock_available():
     """
-    Check if fetch lock is available without acquiring it.
+    Check if no background refresh cycle is running, without starting one.
     
     Returns:
-        bool: True if lock is available, False otherwise
+        bool: True if no refresh cycle is running, False otherwise
     """
     check_lock = get_lock(GLOBAL_FETCH_MODE_LOCK_KEY, owner_prefix=f"fetch_check_{os.getpid()}")
     if check_lock.acquire(wait=False):
@@ -412,6 +466,41 @@ def process_domain_urls(urls):
             import traceback
             g_logger.error(f'Full traceback: {traceback.format_exc()}')
 
+def fetch_reddit_feeds_batched(urls):
+    """
+    Fetch the Reddit feeds among due urls in multireddit listings and store them.
+
+    Feeds the batch serves are stored with their fetch time like any other fetch,
+    under their leases; the rest are left to load_url_worker.
+
+    Args:
+        urls (list): Feeds due for a refresh
+
+    Returns:
+        list: The URLs still to be fetched one by one
+    """
+    if not (ENABLE_REDDIT_API_FETCH and ENABLE_REDDIT_BATCH_FETCH) or ENABLE_OBJECT_STORE_FEEDS or is_read_only():
+        return urls
+    reddit_urls = [url for url in urls if "reddit" in url]
+    if len(reddit_urls) < 2:
+        return urls
+
+    owner = new_owner_id("reddit_batch")
+    leased = feed_leases.claim(reddit_urls, owner)
+    served = {}
+    try:
+        start = timer()
+        served = fetch_reddit_batch(leased)
+        for url, result in served.items():
+            entries = list(itertools.islice(result.get('entries', []), MAX_ITEMS))
+            _store_feed(url, ALL_URLS[url], entries, start)
+    finally:
+        feed_leases.release(leased, owner)
+
+    if served:
+        g_logger.info(f"Fetched {len(served)} of {len(reddit_urls)} due Reddit feeds in batched listings.")
+    return [url for url in urls if url not in served]
+
 def process_urls_in_parallel(urls, description="processing"):
     """
     Process URLs in parallel while ensuring no domain gets multiple simultaneous requests.
@@ -419,19 +508,33 @@ def process_urls_in_parallel(urls, description="processing"):
     This function implements intelligent parallel processing that:
     - Groups URLs by domain to prevent server overload
     - Processes different domains in parallel
-    - Processes URLs from the same domain sequentially
+    - Processes URLs from the same domain sequentially, except Reddit feeds
+      fetched over Tor, which run one group per circuit
     - Uses thread pools for efficient resource management
+
+    Browser-rendered sites on different domains render concurrently: in pooled
+    browsers, or as pages of one browser with USE_ASYNC_PLAYWRIGHT.
     
     Args:
         urls (list): List of URLs to process
         description (str): Description of the operation for logging purposes
     """
+    # Due Reddit feeds sharing a sort are fetched together first
+    urls = fetch_reddit_feeds_batched(urls)
+
     # Group URLs by domain for intelligent parallel processing
     domain_to_urls = defaultdict(list)
     for url in urls:
         domain = get_domain(url)
         domain_to_urls[domain].append(url)
 
+    # Each Tor circuit is its own client to Reddit, so give every circuit a group
+    if USE_TOR and not ENABLE_REDDIT_API_FETCH and "reddit.com" in domain_to_urls:
+        reddit_urls = domain_to_urls.pop("reddit.com")
+        circuits = len(tor_circuits.circuits)
+        for i in range(min(circuits, len(reddit_urls))):
+            domain_to_urls[f"reddit.com#{i}"] = reddit_urls[i::circuits]
+
     g_logger.info(f"{description.capitalize()} {len(urls)} URLs with domain-based parallel processing...")
     
     # Process each domain's URLs sequentially, but different domains in parallel
@@ -459,24 +562,30 @@ def process_urls_in_parallel(urls, description="processing"):
 
 def fetch_urls_parallel(urls):
     """
-    Fetch multiple URLs in parallel with proper locking and domain management.
+    Fetch multiple URLs in parallel with per-feed leases and domain management.
     
-    This is the main entry point for parallel URL fetching. It ensures
-    thread safety and efficient resource usage.
+    This is the main entry point for fetching feeds a request is waiting on. Feeds
+    nobody holds are fetched right away; feeds leased by another process are
+    waited for, since that process is already fetching them.
     
     Args:
         urls (list): List of URLs to fetch in parallel
     """
-    lock = _acquire_fetch_lock()
-    if not lock:
-        g_logger.warning("Aborting parallel fetch due to inability to acquire global lock.")
+    if is_read_only():
+        g_logger.info(f"Read-only node, not fetching {len(urls)} feeds; they arrive with the next sync.")
         return
 
-    try:
-        process_urls_in_parallel(urls, "fetching")
-    finally:
-        lock.release()
-        g_logger.info("Released global fetch lock.")
+    held = feed_leases.held(urls)
+    free_urls = [url for url in urls if url not in held]
+
+    # Someone is waiting on these feeds, so fetch them now but charge the host budget
+    fetch_budget.consume(len(free_urls))
+    if free_urls:
+        process_urls_in_parallel(free_urls, "fetching")
+
+    # Bound the wait so a page request is never stuck behind a slow fetch
+    if held and not feed_leases.wait_released(list(held), timeout=60):
+        g_logger.warning(f"Gave up waiting for {len(held)} feeds leased by other processes.")
 
 def refresh_thread():
     """
@@ -484,53 +593,77 @@ def refresh_thread():
     
     This function:
     - Checks all configured RSS feeds for expiration
-    - Identifies feeds that need refreshing
-    - Processes them in parallel with domain-based throttling
-    - Maintains proper locking throughout the operation
+    - Syncs the object-store feed bundle first, when enabled
+    - Skips feeds another process holds a lease on
+    - Processes the rest in parallel with domain-based throttling
+    - Publishes the refreshed feeds as a bundle, and the headline fragments, when enabled
+    - Marks the cycle as running so overlapping triggers don't duplicate it
     """
-    lock = _acquire_fetch_lock()
+    lock = _acquire_cycle_flag()
     if not lock:
-        g_logger.warning("Aborting refresh thread due to inability to acquire global lock.")
+        g_logger.info("Another refresh cycle is running, skipping this one.")
         return
 
     try:
-        # Collect URLs that need refreshing
-        urls_to_refresh = []
+        # Pull feeds another server already processed before deciding what is expired
+        if ENABLE_OBJECT_STORE_FEEDS:
+            sync_feed_bundle()
 
-        all_urls = list(ALL_URLS.keys())
-        last_fetch_cache = g_c.get_all_last_fetches(all_urls)
-        
-        for url, rss_info in ALL_URLS.items():
-            if rss_info.logo_url != "Custom.png":
-                
-                last_fetch = last_fetch_cache.get(url)
-                
-                # Only check expiration if we have a feed or if we're checking a non-custom site
-                if g_c.has_feed_expired(url, last_fetch):
-                    urls_to_refresh.append(url)
+        # Collect URLs that need refreshing, skipping custom sites and feeds being fetched
+        all_urls = [url for url, rss_info in ALL_URLS.items() if rss_info.logo_url != "Custom.png"]
+        last_fetches = g_c.get_all_last_fetches(all_urls)
+        expired = g_c.get_expired(all_urls, last_fetches=last_fetches)
+        held = feed_leases.held(expired)
+        urls_to_refresh = [url for url in all_urls if url in expired and url not in held]
 
         if not urls_to_refresh:
             g_logger.info("No feeds need refreshing in this cycle.")
             return
 
-        process_urls_in_parallel(urls_to_refresh, "refreshing")
+        # Spend the host-wide fetch budget on the most valuable feeds first; the rest
+        # stay expired and are picked up by a later refresh
+        granted = fetch_budget.acquire(len(urls_to_refresh))
+        if granted < len(urls_to_refresh):
+            g_logger.info(f"Fetch budget allows {granted} of {len(urls_to_refresh)} expired feeds this cycle.")
+            expected_new = history.get_expected_new(urls_to_refresh, last_fetches)
+            urls_to_refresh = prioritize(urls_to_refresh, expected_new, SITE_URLS)[:granted]
+
+        if not urls_to_refresh:
+            return
+
+        with LockHeartbeat(lambda: lock.renew(FEED_LEASE_SECONDS), FEED_LEASE_SECONDS / 3, name="refresh cycle flag"):
+            process_urls_in_parallel(urls_to_refresh, "refreshing")
+
+        # An elected leader always publishes, since its followers read nothing else
+        if ENABLE_OBJECT_STORE_FEED_PUBLISH or ENABLE_LEADER_ELECTION:
+            publish_feed_bundle(all_urls)
+            publish_fragments()
     finally:
         lock.release()
-        g_logger.info("Released global fetch lock after refresh.")
+        g_logger.info("Refresh cycle finished.")
+        if ENABLE_OBJECT_STORE_FEEDS:
+            stats = get_smart_fetch_stats()
+            g_logger.info(f"Object store cache: {stats['fresh']} fresh, {stats['revalidated']} revalidated, "
+                          f"{stats['misses']} downloaded, hit rate {stats['hit_rate']:.0%}.")
 
 def fetch_urls_thread():
     """
     Start a background thread to refresh RSS feeds.
     
     This function implements a safety check to prevent multiple refresh
-    operations from running simultaneously. It only starts a new refresh
-    thread if no other fetch/refresh operation is currently running.
+    cycles from running simultaneously. It only starts a new refresh
+    thread if no other refresh cycle is currently running. Read-only front-ends
+    and election followers never refresh; their feeds come from the front-end
+    sync loop.
     """
+    if is_read_only():
+        return
+
     if not _check_fetch_lock_available():
-        g_logger.info("Fetch/refresh operation already in progress. Skipping background refresh trigger.")
+        g_logger.info("Refresh cycle already in progress. Skipping background refresh trigger.")
         return
 
-    g_logger.info("No fetch operation running. Starting background refresh thread...")
+    g_logger.info("No refresh cycle running. Starting background refresh thread...")
     t = threading.Thread(target=refresh_thread, args=())
     t.daemon = True
     t.start()
\ No newline at end of file